@@ -1,5 +1,8 @@
 from django.contrib import admin
-from .models import Aluno, Mensalidade, Pagamento
+from django.utils import timezone
+
+from .cobranca import gerar_mensalidades
+from .models import Aluno, CaixaDiario, ExportJob, Lembrete, Mensalidade, Pagamento
 
 
 @admin.register(Aluno)
@@ -7,15 +10,66 @@ class AlunoAdmin(admin.ModelAdmin):
     list_display = ("nome", "responsavel", "ativo")
     list_filter = ("ativo",)
     search_fields = ("nome", "responsavel")
+    actions = ("gerar_mensalidades_ano_atual", "gerar_mensalidades_proximo_ano")
+
+    def _gerar_mensalidades(self, request, queryset, ano):
+        resultado = gerar_mensalidades(ano, alunos=queryset.filter(ativo=True))
+        self.message_user(
+            request,
+            f"{ano}: {resultado['criadas']} mensalidade(s) criada(s), "
+            f"{resultado['ignoradas']} já existia(m), "
+            f"{resultado['sem_valor']} aluno(s) sem valor/vencimento."
+        )
+
+    @admin.action(description="Gerar mensalidades do ano atual")
+    def gerar_mensalidades_ano_atual(self, request, queryset):
+        self._gerar_mensalidades(request, queryset, timezone.now().year)
+
+    @admin.action(description="Gerar mensalidades do próximo ano")
+    def gerar_mensalidades_proximo_ano(self, request, queryset):
+        self._gerar_mensalidades(request, queryset, timezone.now().year + 1)
 
 
 @admin.register(Mensalidade)
 class MensalidadeAdmin(admin.ModelAdmin):
-    list_display = ("aluno", "valor", "vencimento")
+    list_display = ("aluno", "valor", "total_pago", "em_aberto", "vencimento")
     list_filter = ("vencimento",)
+    list_select_related = ("aluno",)
+    readonly_fields = ("total_pago",)
 
 
 @admin.register(Pagamento)
 class PagamentoAdmin(admin.ModelAdmin):
     list_display = ("mensalidade", "valor", "forma", "data_pagamento")
     list_filter = ("forma",)
+    list_select_related = ("mensalidade__aluno",)
+
+
+@admin.register(CaixaDiario)
+class CaixaDiarioAdmin(admin.ModelAdmin):
+    list_display = ("data", "forma", "quantidade", "total")
+    list_filter = ("forma",)
+    date_hierarchy = "data"
+
+    # Mantido pelos sinais de Pagamento e pelo comando rebuild_caixa
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(ExportJob)
+class ExportJobAdmin(admin.ModelAdmin):
+    list_display = ("id", "tipo", "status", "processados", "total", "criado_por", "criado_em")
+    list_filter = ("tipo", "status")
+    readonly_fields = ("arquivo", "erro", "concluido_em")
+
+
+@admin.register(Lembrete)
+class LembreteAdmin(admin.ModelAdmin):
+    list_display = ("aluno", "tipo", "data", "destinatario", "status", "enviado_em")
+    list_filter = ("tipo", "status")
+    list_select_related = ("aluno",)
+    date_hierarchy = "data"
+    readonly_fields = ("criado_em", "enviado_em", "enviado_por")
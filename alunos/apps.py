@@ -0,0 +1,19 @@
+from django.apps import AppConfig
+from django.db.models.signals import post_migrate
+
+
+def _instalar_indice_busca(sender, using, **kwargs):
+    from django.db import connections
+    from .busca import instalar_indice_busca
+
+    instalar_indice_busca(connections[using])
+
+
+class AlunosConfig(AppConfig):
+    default_auto_field = "django.db.models.BigAutoField"
+    name = "alunos"
+
+    def ready(self):
+        from . import signals  # noqa: F401
+
+        post_migrate.connect(_instalar_indice_busca, sender=self)
@@ -0,0 +1,351 @@
+import platform
+import random
+import statistics
+import subprocess
+import time
+import tracemalloc
+from datetime import date, timedelta
+from decimal import Decimal
+
+import django
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.signals import request_finished
+from django.db import close_old_connections, connection, transaction
+from django.db.models import Count
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+
+from .cache import invalidar_painel
+from . import views
+from .cobranca import data_vencimento
+from .models import Aluno, CaixaDiario, Mensalidade, Pagamento
+
+
+# ==================================================
+# DADOS SINTÉTICOS (seed_benchmark)
+# ==================================================
+#
+# Mesma semente, mesma data e mesmo número de alunos geram sempre os
+# mesmos dados, para comparar medições entre versões.
+
+# Marca em observacoes: permite apagar só os alunos gerados
+MARCA = "[seed_benchmark]"
+
+LOTE_ALUNOS = 200
+
+NOMES = (
+    "Ana", "Beatriz", "Bruno", "Carla", "Davi", "Eduarda", "Enzo", "Gabriel",
+    "Helena", "Isabela", "João", "Júlia", "Laura", "Lucas", "Manuela", "Maria",
+    "Miguel", "Nicolas", "Pedro", "Rafael", "Samuel", "Sofia", "Valentina", "Heitor",
+)
+SOBRENOMES = (
+    "Silva", "Santos", "Oliveira", "Souza", "Lima", "Pereira", "Ferreira",
+    "Costa", "Rodrigues", "Almeida", "Nascimento", "Araújo", "Melo", "Barbosa",
+    "Cavalcanti", "Albuquerque", "Gonçalves", "Ribeiro",
+)
+RESPONSAVEIS = (
+    "Adriana", "Cláudia", "Fernanda", "Patrícia", "Juliana", "Roberto",
+    "Marcos", "Luciana", "Renata", "Carlos", "Simone", "André",
+)
+VALORES = (Decimal("150.00"), Decimal("180.00"), Decimal("200.00"), Decimal("250.00"))
+DIAS_VENCIMENTO = (5, 10, 15, 20)
+DIAS_AULA = ("Segunda e Quarta", "Terça e Quinta", "Sexta", "Sábado")
+HORARIOS = ("08:00 às 09:00", "14:00 às 15:00", "15:00 às 16:00", "16:00 às 17:00")
+
+# Contas usadas pelo teste de carga (load_test)
+USUARIOS = {"admin": "bench_admin", "funcionaria": "bench_funcionaria"}
+
+# Proporção de cada forma de pagamento
+PESOS_FORMAS = {"PIX": 60, "DINHEIRO": 25, "CARTAO": 15}
+
+
+def _aluno(rng, numero, hoje):
+    nome = f"{rng.choice(NOMES)} {rng.choice(SOBRENOMES)} {rng.choice(SOBRENOMES)}"
+    sobrenome = nome.split()[-1]
+    atipico = rng.random() < 0.1
+
+    aluno = Aluno(
+        nome=nome,
+        responsavel=f"{rng.choice(RESPONSAVEIS)} {sobrenome}",
+        telefone=f"81 9{rng.randint(8000, 9999)}-{numero % 10000:04d}",
+        # Aniversários espalhados pelo ano todo
+        data_nascimento=date(hoje.year - rng.randint(4, 15), 1, 1) + timedelta(days=rng.randrange(365)),
+        atipico=atipico,
+        tipo_atipico="TEA" if atipico else None,
+        dia_aula=rng.choice(DIAS_AULA),
+        horario_aula=rng.choice(HORARIOS),
+        ativo=rng.random() < 0.9,
+        valor_mensalidade=rng.choice(VALORES),
+        dia_vencimento=rng.choice(DIAS_VENCIMENTO),
+        observacoes=MARCA,
+    )
+    aluno.preencher_campos_derivados()
+    return aluno
+
+
+def _parcelas(rng, mensalidade, hoje):
+    """Pagamentos de uma mensalidade: quitada, parcial ou em aberto."""
+    atrasada = mensalidade.vencimento < hoje - timedelta(days=30)
+    sorteio = rng.random()
+
+    if mensalidade.vencimento > hoje or sorteio > (0.97 if atrasada else 0.6):
+        return []
+
+    valor = mensalidade.valor
+    if sorteio > (0.92 if atrasada else 0.5):
+        valor = (valor * Decimal(rng.choice(("0.3", "0.5", "0.7")))).quantize(Decimal("0.01"))
+
+    partes = [valor]
+    if rng.random() < 0.2:
+        metade = (valor / 2).quantize(Decimal("0.01"))
+        partes = [metade, valor - metade]
+
+    formas = list(PESOS_FORMAS)
+    pesos = list(PESOS_FORMAS.values())
+
+    return [
+        Pagamento(
+            mensalidade=mensalidade,
+            valor=parte,
+            forma=rng.choices(formas, pesos)[0],
+            data_pagamento=min(hoje, mensalidade.vencimento + timedelta(days=rng.randint(-5, 10))),
+        )
+        for parte in partes
+    ]
+
+
+def _gravar_lote(rng, alunos, hoje, anos):
+    Aluno.objects.bulk_create(alunos)
+
+    ano_inicial = hoje.year - anos + 1
+    mensalidades = []
+
+    for aluno in alunos:
+        # Parte dos alunos entrou no meio do período
+        inicio = 1 if rng.random() < 0.3 else rng.randrange(1, anos * 12 + 1)
+
+        for indice in range(inicio - 1, (anos - 1) * 12 + hoje.month):
+            ano, mes = ano_inicial + indice // 12, indice % 12 + 1
+            mensalidades.append(Mensalidade(
+                aluno=aluno,
+                valor=aluno.valor_mensalidade,
+                vencimento=data_vencimento(ano, mes, aluno.dia_vencimento),
+            ))
+
+    pagamentos = []
+    for mensalidade in mensalidades:
+        parcelas = _parcelas(rng, mensalidade, hoje)
+        # total_pago é mantido pelos sinais, que o bulk_create não dispara
+        mensalidade.total_pago = sum((p.valor for p in parcelas), Decimal("0"))
+        pagamentos += parcelas
+
+    Mensalidade.objects.bulk_create(mensalidades, batch_size=1000)
+    Pagamento.objects.bulk_create(pagamentos, batch_size=1000)
+
+    return len(mensalidades), len(pagamentos)
+
+
+def semear(total_alunos, anos=10, semente=42, hoje=None):
+    """
+    Grava total_alunos alunos com `anos` anos de mensalidades e
+    pagamentos. Devolve {"alunos", "mensalidades", "pagamentos"}.
+    """
+    hoje = hoje or date.today()
+    rng = random.Random(semente)
+    resultado = {"alunos": 0, "mensalidades": 0, "pagamentos": 0}
+
+    with transaction.atomic():
+        for inicio in range(0, total_alunos, LOTE_ALUNOS):
+            alunos = [
+                _aluno(rng, numero, hoje)
+                for numero in range(inicio, min(inicio + LOTE_ALUNOS, total_alunos))
+            ]
+            mensalidades, pagamentos = _gravar_lote(rng, alunos, hoje, anos)
+
+            resultado["alunos"] += len(alunos)
+            resultado["mensalidades"] += mensalidades
+            resultado["pagamentos"] += pagamentos
+
+        CaixaDiario.reconstruir(date(hoje.year - anos, 12, 1), hoje)
+        invalidar_painel()
+
+    return resultado
+
+
+def criar_usuarios(senha):
+    """Cria (ou redefine a senha de) uma conta de dona e uma de funcionária."""
+    User = get_user_model()
+
+    for papel, username in USUARIOS.items():
+        usuario, _ = User.objects.get_or_create(username=username)
+        usuario.is_staff = True
+        usuario.is_superuser = papel == "admin"
+        usuario.set_password(senha)
+        usuario.save()
+
+
+def limpar():
+    """Apaga os alunos gerados (e, em cascata, mensalidades e pagamentos)."""
+    with transaction.atomic():
+        removidos, _ = Aluno.objects.filter(observacoes=MARCA).delete()
+        CaixaDiario.reconstruir()
+        invalidar_painel()
+
+    return removidos
+
+
+# ==================================================
+# MEDIÇÃO DAS VIEWS (run_benchmark)
+# ==================================================
+def _views_medidas(aluno_id, usuarios, hoje):
+    """(nome, view, args, parâmetros GET, usuário) de cada medição."""
+    exportacao = {"inicio": (hoje - timedelta(days=90)).isoformat(), "fim": hoje.isoformat()}
+
+    return [
+        ("lista_alunos", views.lista_alunos, (), {}, usuarios["funcionaria"]),
+        ("aluno_detalhe", views.aluno_detalhe, (aluno_id,), {}, usuarios["funcionaria"]),
+        ("relatorio_caixa (admin)", views.relatorio_caixa, (), {}, usuarios["admin"]),
+        ("relatorio_caixa (funcionária)", views.relatorio_caixa, (), {}, usuarios["funcionaria"]),
+        ("exportar_caixa_excel", views.exportar_caixa_excel, (), exportacao, usuarios["admin"]),
+        ("exportar_caixa_pdf", views.exportar_caixa_pdf, (), exportacao, usuarios["admin"]),
+    ]
+
+
+class _Medidor:
+    def __init__(self):
+        self.factory = RequestFactory()
+        self.sessoes = {}
+
+    def chamar(self, view, args, params, usuario):
+        request = self.factory.get("/", params)
+        request.user = usuario
+        # Papéis ficam na sessão desde a primeira chamada, como numa navegação normal
+        request.session = self.sessoes.setdefault(usuario.pk, {})
+
+        response = view(request, *args)
+
+        if response.status_code != 200:
+            raise RuntimeError(f"{view.__name__} respondeu {response.status_code}.")
+
+        # Consome o corpo (exportações são FileResponse)
+        tamanho = len(b"".join(response)) if response.streaming else len(response.content)
+        response.close()
+        return tamanho
+
+    def medir(self, view, args, params, usuario, repeticoes):
+        # Primeira chamada fora da conta (imports, templates compilados)
+        self.chamar(view, args, params, usuario)
+
+        tempos = []
+        for _ in range(repeticoes):
+            inicio = time.perf_counter()
+            tamanho = self.chamar(view, args, params, usuario)
+            tempos.append((time.perf_counter() - inicio) * 1000)
+
+        with CaptureQueriesContext(connection) as consultas:
+            self.chamar(view, args, params, usuario)
+
+        # tracemalloc deixa o código mais lento: medido numa chamada à parte
+        tracemalloc.start()
+        try:
+            self.chamar(view, args, params, usuario)
+            _, pico = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        return {
+            "tempo_ms": {
+                "min": round(min(tempos), 2),
+                "mediana": round(statistics.median(tempos), 2),
+                "max": round(max(tempos), 2),
+            },
+            "consultas": len(consultas),
+            "memoria_pico_kb": round(pico / 1024),
+            "resposta_bytes": tamanho,
+        }
+
+
+class _Desfazer(Exception):
+    pass
+
+
+def _commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=settings.BASE_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def executar(tamanhos, repeticoes=5, anos=10, semente=42, hoje=None, progresso=None):
+    """Mede as views em cada tamanho; devolve o relatório (pronto para json.dump)."""
+    hoje = hoje or date.today()
+    resultados = []
+    # Dados que já estavam no banco entram na medição
+    base = {"alunos": Aluno.objects.count(), "pagamentos": Pagamento.objects.count()}
+
+    # response.close() fecharia a conexão no meio da transação (como no test client)
+    request_finished.disconnect(close_old_connections)
+    try:
+        for tamanho in tamanhos:
+            resultados.append(_medir_tamanho(tamanho, repeticoes, anos, semente, hoje, progresso))
+    finally:
+        request_finished.connect(close_old_connections)
+
+    return {
+        "commit": _commit(),
+        "data": hoje.isoformat(),
+        "python": platform.python_version(),
+        "django": django.get_version(),
+        "banco": connection.vendor,
+        "anos": anos,
+        "semente": semente,
+        "repeticoes": repeticoes,
+        "base": base,
+        "resultados": resultados,
+    }
+
+
+def _medir_tamanho(tamanho, repeticoes, anos, semente, hoje, progresso):
+    """Gera os dados de um tamanho, mede as views e desfaz tudo."""
+    resultado = None
+
+    try:
+        with transaction.atomic():
+            volume = semear(tamanho, anos=anos, semente=semente, hoje=hoje)
+
+            User = get_user_model()
+            usuarios = {
+                "admin": User.objects.create_superuser("run_benchmark_admin", password=None),
+                "funcionaria": User.objects.create_user(
+                    "run_benchmark_funcionaria", password=None, is_staff=True
+                ),
+            }
+
+            # Aluno com o maior histórico
+            aluno_id = (
+                Mensalidade.objects.values("aluno_id")
+                .annotate(total=Count("id"))
+                .order_by("-total", "aluno_id")
+                .values_list("aluno_id", flat=True)
+                .first()
+            )
+
+            medidor = _Medidor()
+            medicoes = {}
+
+            for nome, view, args, params, usuario in _views_medidas(aluno_id, usuarios, hoje):
+                medicoes[nome] = medidor.medir(view, args, params, usuario, repeticoes)
+
+                if progresso:
+                    progresso(tamanho, nome, medicoes[nome])
+
+            resultado = {"alunos": tamanho, "volume": volume, "views": medicoes}
+            raise _Desfazer
+    except _Desfazer:
+        pass
+
+    return resultado
@@ -0,0 +1,142 @@
+import re
+import unicodedata
+
+from django.db import connection
+from django.db.models.expressions import RawSQL
+
+
+# ==================================================
+# BUSCA DE ALUNOS (sem acento, indexada)
+# ==================================================
+#
+# Aluno.busca guarda nome, responsável e telefone já normalizados
+# ("Cássia Souza" -> "cassia souza"). Em cima dessa coluna:
+#   - SQLite: tabela FTS5 alunos_aluno_fts, mantida por triggers;
+#   - PostgreSQL: índice GIN com pg_trgm (LIKE '%termo%' usa o índice).
+# As duas estruturas são criadas na migração 0024.
+
+TABELA_FTS = "alunos_aluno_fts"
+
+LIMITE_SUGESTOES = 8
+
+
+def normalizar(texto):
+    if not texto:
+        return ""
+
+    texto = unicodedata.normalize("NFKD", str(texto))
+    texto = "".join(c for c in texto if not unicodedata.combining(c))
+    texto = re.sub(r"[^0-9a-z]+", " ", texto.lower())
+
+    return texto.strip()
+
+
+def texto_de_busca(aluno):
+    telefone = "".join(filter(str.isdigit, aluno.telefone or ""))
+
+    if len(telefone) > 11 and telefone.startswith("55"):
+        telefone = telefone[2:]
+
+    # Também indexa o número sem DDD, como a recepção costuma digitar
+    if len(telefone) >= 10:
+        telefone = f"{telefone} {telefone[2:]}"
+
+    return normalizar(f"{aluno.nome} {aluno.responsavel} {telefone}")
+
+
+def buscar_alunos(queryset, termo):
+    termos = normalizar(termo).split()
+
+    if not termos:
+        return queryset
+
+    if connection.vendor == "sqlite":
+        # Cada termo vira um prefixo ("cass"*); FTS5 faz o AND entre eles
+        consulta = " ".join(f'"{t}"*' for t in termos)
+        return queryset.filter(id__in=RawSQL(
+            f"SELECT rowid FROM {TABELA_FTS} WHERE {TABELA_FTS} MATCH %s",
+            [consulta]
+        ))
+
+    for t in termos:
+        queryset = queryset.filter(busca__contains=t)
+
+    return queryset
+
+
+# ==================================================
+# ÍNDICE (migração 0024 e post_migrate)
+# ==================================================
+_TRIGGERS_FTS = {
+    f"{TABELA_FTS}_ai": f"""
+        CREATE TRIGGER {TABELA_FTS}_ai AFTER INSERT ON alunos_aluno BEGIN
+            INSERT INTO {TABELA_FTS}(rowid, busca) VALUES (new.id, new.busca);
+        END
+    """,
+    f"{TABELA_FTS}_ad": f"""
+        CREATE TRIGGER {TABELA_FTS}_ad AFTER DELETE ON alunos_aluno BEGIN
+            INSERT INTO {TABELA_FTS}({TABELA_FTS}, rowid, busca)
+            VALUES ('delete', old.id, old.busca);
+        END
+    """,
+    f"{TABELA_FTS}_au": f"""
+        CREATE TRIGGER {TABELA_FTS}_au AFTER UPDATE OF busca ON alunos_aluno BEGIN
+            INSERT INTO {TABELA_FTS}({TABELA_FTS}, rowid, busca)
+            VALUES ('delete', old.id, old.busca);
+            INSERT INTO {TABELA_FTS}(rowid, busca) VALUES (new.id, new.busca);
+        END
+    """,
+}
+
+
+def instalar_indice_busca(conexao):
+    """
+    Cria (se faltar) o índice de busca do banco em uso.
+
+    No SQLite, migrações que recriam alunos_aluno apagam os triggers;
+    por isso isto também roda no post_migrate e reconstrói o FTS quando
+    algum trigger precisou ser recriado.
+    """
+    with conexao.cursor() as cursor:
+        colunas = [
+            c.name for c in conexao.introspection.get_table_description(cursor, "alunos_aluno")
+        ] if "alunos_aluno" in conexao.introspection.table_names(cursor) else []
+
+        if "busca" not in colunas:
+            return
+
+        if conexao.vendor == "sqlite":
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {TABELA_FTS} USING fts5("
+                "busca, content='alunos_aluno', content_rowid='id')"
+            )
+
+            cursor.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'trigger' AND tbl_name = 'alunos_aluno'"
+            )
+            existentes = {nome for (nome,) in cursor.fetchall()}
+            faltando = [nome for nome in _TRIGGERS_FTS if nome not in existentes]
+
+            for nome in faltando:
+                cursor.execute(_TRIGGERS_FTS[nome])
+
+            if faltando:
+                cursor.execute(f"INSERT INTO {TABELA_FTS}({TABELA_FTS}) VALUES ('rebuild')")
+
+        elif conexao.vendor == "postgresql":
+            cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+            cursor.execute(
+                "CREATE INDEX IF NOT EXISTS alunos_aluno_busca_trgm "
+                "ON alunos_aluno USING gin (busca gin_trgm_ops)"
+            )
+
+
+def remover_indice_busca(conexao):
+    with conexao.cursor() as cursor:
+        if conexao.vendor == "sqlite":
+            for nome in _TRIGGERS_FTS:
+                cursor.execute(f"DROP TRIGGER IF EXISTS {nome}")
+            cursor.execute(f"DROP TABLE IF EXISTS {TABELA_FTS}")
+
+        elif conexao.vendor == "postgresql":
+            cursor.execute("DROP INDEX IF EXISTS alunos_aluno_busca_trgm")
@@ -0,0 +1,93 @@
+import os
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+
+# ==================================================
+# CACHE DO PAINEL (relatorio_caixa)
+# ==================================================
+#
+# A chave inclui uma versão global: qualquer gravação em Aluno,
+# Mensalidade ou Pagamento incrementa a versão (ver signals.py) e as
+# entradas antigas simplesmente deixam de ser lidas até expirarem.
+#
+# Acertos e falhas ficam na memória de cada processo, como em metricas.py:
+# incr() do FileBasedCache não é atômico entre workers do gunicorn.
+
+CHAVE_VERSAO = "painel:versao"
+
+_contagem = Counter()
+_trava_contagem = threading.Lock()
+
+
+def _incrementar(chave):
+    # add() não sobrescreve; incr() falha se a chave sumiu (expirou/LRU)
+    cache.add(chave, 0, timeout=None)
+    try:
+        return cache.incr(chave)
+    except ValueError:
+        cache.set(chave, 1, timeout=None)
+        return 1
+
+
+def versao_painel():
+    versao = cache.get(CHAVE_VERSAO)
+
+    if versao is None:
+        # Se a chave sumiu (limpeza do cache), recomeça de um valor novo,
+        # nunca de um número já usado por entradas antigas ou ETags
+        cache.add(CHAVE_VERSAO, int(time.time() * 1000), timeout=None)
+        versao = cache.get(CHAVE_VERSAO)
+
+    return versao
+
+
+def _nova_versao():
+    versao_painel()
+    _incrementar(CHAVE_VERSAO)
+
+
+def invalidar_painel():
+    # Só depois do commit, para ninguém guardar dados velhos na versão nova
+    transaction.on_commit(_nova_versao)
+
+
+def _contar(nome):
+    with _trava_contagem:
+        _contagem[nome] += 1
+
+
+def contexto_painel(papel, hoje, gerar):
+    chave = f"painel:{versao_painel()}:{papel}:{hoje.isoformat()}"
+    contexto = cache.get(chave)
+
+    if contexto is not None:
+        _contar("acertos")
+        return contexto
+
+    _contar("falhas")
+
+    contexto = gerar()
+    cache.set(chave, contexto, timeout=settings.CACHE_PAINEL_TIMEOUT)
+
+    return contexto
+
+
+def estatisticas_painel():
+    """Acertos e falhas só deste processo (cada worker conta os seus)."""
+    with _trava_contagem:
+        acertos, falhas = _contagem["acertos"], _contagem["falhas"]
+    total = acertos + falhas
+
+    return {
+        "processo": os.getpid(),
+        "versao": versao_painel(),
+        "acertos": acertos,
+        "falhas": falhas,
+        "taxa_acerto": round(acertos / total, 4) if total else None,
+    }
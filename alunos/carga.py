@@ -0,0 +1,239 @@
+import http.cookiejar
+import math
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+
+from django.conf import settings
+
+from .benchmark import NOMES
+
+
+# ==================================================
+# TESTE DE CARGA (load_test)
+# ==================================================
+#
+# Usuários virtuais fazem login de verdade (sessão e CSRF) e repetem uma
+# mistura de telas da recepção e da dona contra um servidor já no ar.
+
+# Peso de cada ação por papel
+MIX = {
+    "funcionaria": {"lista": 30, "busca": 10, "detalhe": 30, "pagar": 10, "painel": 20},
+    "admin": {"painel": 50, "lista": 15, "detalhe": 25, "fechamento": 10},
+}
+
+TIMEOUT = 30
+
+
+class _Sessao:
+    """Navegador mínimo: cookies, CSRF e redirecionamentos."""
+
+    def __init__(self, url_base):
+        self.url_base = url_base.rstrip("/")
+        self.cookies = http.cookiejar.CookieJar()
+        self.opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(self.cookies))
+
+    def _csrf(self):
+        return next((c.value for c in self.cookies if c.name == settings.CSRF_COOKIE_NAME), "")
+
+    def abrir(self, caminho, dados=None):
+        """Devolve (status, caminho final); status 0 = falha de conexão."""
+        corpo = None
+        if dados is not None:
+            corpo = urllib.parse.urlencode({**dados, "csrfmiddlewaretoken": self._csrf()}).encode()
+
+        try:
+            with self.opener.open(self.url_base + caminho, corpo, timeout=TIMEOUT) as resposta:
+                resposta.read()
+                return resposta.status, urllib.parse.urlsplit(resposta.url).path
+        except urllib.error.HTTPError as erro:
+            return erro.code, caminho
+        except (urllib.error.URLError, OSError):
+            return 0, caminho
+
+    def login(self, username, senha):
+        self.abrir(settings.LOGIN_URL)
+        status, final = self.abrir(settings.LOGIN_URL, {"username": username, "password": senha})
+        return status == 200 and final != settings.LOGIN_URL
+
+
+class _UsuarioVirtual:
+    def __init__(self, papel, sessao, dados, rng, resultados):
+        self.papel = papel
+        self.sessao = sessao
+        self.dados = dados
+        self.rng = rng
+        self.resultados = resultados
+
+    def registrar(self, acao, caminho, dados=None):
+        inicio = time.perf_counter()
+        status, final = self.sessao.abrir(caminho, dados)
+        duracao = time.perf_counter() - inicio
+
+        # Voltar para o login no meio do teste também é erro
+        ok = 200 <= status < 400 and final != settings.LOGIN_URL
+        self.resultados.append((acao, duracao, ok))
+
+    def executar(self, acao):
+        if acao == "pagar":
+            mensalidade = self.dados.proxima_em_aberto()
+
+            if mensalidade is None:
+                acao = "detalhe"
+            else:
+                pk, saldo = mensalidade
+                self.registrar("pagar (formulário)", f"/mensalidade/{pk}/pagar/")
+                self.registrar("pagar", f"/mensalidade/{pk}/pagar/", {"valor": saldo, "forma": "PIX"})
+                return
+
+        if acao == "lista":
+            self.registrar(acao, "/alunos/")
+        elif acao == "busca":
+            self.registrar(acao, "/alunos/?" + urllib.parse.urlencode({"q": self.rng.choice(NOMES)}))
+        elif acao == "detalhe":
+            self.registrar(acao, f"/aluno/{self.rng.choice(self.dados.alunos)}/")
+        elif acao == "painel":
+            self.registrar(acao, "/")
+        elif acao == "fechamento":
+            self.registrar(acao, "/caixa/fechamento/")
+
+    def rodar(self, fim, pausa):
+        acoes = list(MIX[self.papel])
+        pesos = list(MIX[self.papel].values())
+
+        while time.monotonic() < fim:
+            self.executar(self.rng.choices(acoes, pesos)[0])
+
+            if pausa:
+                time.sleep(pausa)
+
+
+class DadosCarga:
+    """Alunos e mensalidades em aberto sorteados pelos usuários virtuais."""
+
+    def __init__(self, alunos, em_aberto):
+        if not alunos:
+            raise ValueError("Nenhum aluno no banco: rode seed_benchmark antes.")
+
+        self.alunos = alunos
+        self.em_aberto = list(em_aberto)
+        self.trava = threading.Lock()
+
+    def proxima_em_aberto(self):
+        # Cada mensalidade é paga uma vez só
+        with self.trava:
+            return self.em_aberto.pop() if self.em_aberto else None
+
+
+# -----------------------------------------------
+# Servidor local
+# -----------------------------------------------
+def _aguardar(host, porta, limite):
+    while time.monotonic() < limite:
+        try:
+            with socket.create_connection((host, porta), timeout=1):
+                return True
+        except OSError:
+            time.sleep(0.2)
+
+    return False
+
+
+def iniciar_gunicorn(porta, workers, espera=30):
+    """Sobe tia_cassia.wsgi no gunicorn (como no Render) e espera a porta abrir."""
+    processo = subprocess.Popen(
+        [
+            sys.executable, "-m", "gunicorn", "tia_cassia.wsgi:application",
+            "--bind", f"127.0.0.1:{porta}",
+            "--workers", str(workers),
+            "--log-level", "warning",
+        ],
+        cwd=settings.BASE_DIR,
+    )
+
+    if not _aguardar("127.0.0.1", porta, time.monotonic() + espera):
+        processo.terminate()
+        raise RuntimeError("O gunicorn não abriu a porta a tempo.")
+
+    return processo
+
+
+# -----------------------------------------------
+# Execução e relatório
+# -----------------------------------------------
+def _percentil(ordenados, p):
+    # Nearest-rank: o menor valor que cobre p% das amostras
+    return ordenados[max(0, math.ceil(p / 100 * len(ordenados)) - 1)]
+
+
+def _resumo(amostras, duracao):
+    tempos = sorted(t * 1000 for _, t, _ in amostras)
+    erros = sum(1 for _, _, ok in amostras if not ok)
+
+    if not tempos:
+        return {"requisicoes": 0, "erros": 0, "taxa_erro": None, "vazao_rps": 0, "latencia_ms": None}
+
+    return {
+        "requisicoes": len(tempos),
+        "erros": erros,
+        "taxa_erro": round(erros / len(tempos), 4),
+        "vazao_rps": round(len(tempos) / duracao, 2),
+        "latencia_ms": {
+            "p50": round(_percentil(tempos, 50), 1),
+            "p95": round(_percentil(tempos, 95), 1),
+            "p99": round(_percentil(tempos, 99), 1),
+            "max": round(tempos[-1], 1),
+        },
+    }
+
+
+def executar(url_base, usuarios, dados, concorrencia=10, proporcao_admin=0.2,
+             duracao=30, pausa=0, semente=42):
+    """
+    Roda `concorrencia` usuários virtuais por `duracao` segundos.
+
+    usuarios: {"admin": (username, senha), "funcionaria": (username, senha)}.
+    Devolve o relatório com o total e cada ação separada.
+    """
+    admins = round(concorrencia * proporcao_admin)
+    resultados = []
+    virtuais = []
+
+    for i in range(concorrencia):
+        papel = "admin" if i < admins else "funcionaria"
+        sessao = _Sessao(url_base)
+
+        if not sessao.login(*usuarios[papel]):
+            raise RuntimeError(f"Login de {usuarios[papel][0]} falhou em {url_base}.")
+
+        virtuais.append(_UsuarioVirtual(papel, sessao, dados, random.Random(semente + i), resultados))
+
+    inicio = time.monotonic()
+    fim = inicio + duracao
+    threads = [threading.Thread(target=v.rodar, args=(fim, pausa)) for v in virtuais]
+
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    decorrido = time.monotonic() - inicio
+
+    return {
+        "url": url_base,
+        "concorrencia": concorrencia,
+        "admins": admins,
+        "duracao_s": round(decorrido, 1),
+        "pausa_s": pausa,
+        "total": _resumo(resultados, decorrido),
+        "acoes": {
+            acao: _resumo([a for a in resultados if a[0] == acao], decorrido)
+            for acao in sorted({a[0] for a in resultados})
+        },
+    }
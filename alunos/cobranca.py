@@ -0,0 +1,114 @@
+import calendar
+from collections import defaultdict
+from datetime import date
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Case, DecimalField, F, Value, When
+
+from .cache import invalidar_painel
+from .models import Aluno, CaixaDiario, Mensalidade, Pagamento
+
+
+# ==================================================
+# GERAÇÃO DE MENSALIDADES EM LOTE
+# ==================================================
+LOTE = 1000
+
+
+def data_vencimento(ano, mes, dia):
+    # Dia 31 vira o último dia em meses mais curtos
+    return date(ano, mes, min(dia, calendar.monthrange(ano, mes)[1]))
+
+
+def gerar_mensalidades(ano, mes_inicial=1, mes_final=12, alunos=None):
+    """
+    Cria as mensalidades de ano/mes_inicial..mes_final para os alunos
+    informados (padrão: todos os ativos com valor configurado).
+
+    As já existentes são ignoradas pela restrição única (aluno, vencimento).
+    Devolve {"criadas", "ignoradas", "sem_valor"}.
+    """
+    if alunos is None:
+        alunos = Aluno.objects.filter(ativo=True)
+
+    alunos = list(
+        alunos.order_by("id").values_list("id", "valor_mensalidade", "dia_vencimento")
+    )
+
+    configurados = [(pk, valor, dia) for pk, valor, dia in alunos if valor and dia]
+    meses = range(mes_inicial, mes_final + 1)
+
+    periodo = Mensalidade.objects.filter(
+        aluno_id__in=[pk for pk, _, _ in configurados],
+        vencimento__range=(date(ano, mes_inicial, 1), data_vencimento(ano, mes_final, 31))
+    )
+
+    novas = [
+        Mensalidade(
+            aluno_id=pk,
+            valor=valor,
+            vencimento=data_vencimento(ano, mes, dia)
+        )
+        for pk, valor, dia in configurados
+        for mes in meses
+    ]
+
+    with transaction.atomic():
+        antes = periodo.count()
+        Mensalidade.objects.bulk_create(novas, batch_size=LOTE, ignore_conflicts=True)
+        criadas = periodo.count() - antes
+
+    if criadas:
+        invalidar_painel()
+
+    return {
+        "criadas": criadas,
+        "ignoradas": len(novas) - criadas,
+        "sem_valor": len(alunos) - len(configurados),
+    }
+
+
+# ==================================================
+# PAGAMENTOS EM LOTE
+# ==================================================
+def registrar_pagamentos(itens, data_pagamento):
+    """
+    Grava vários pagamentos de uma vez: itens é uma lista de
+    (mensalidade_id, valor, forma).
+
+    bulk_create não dispara os sinais de Pagamento, então total_pago e o
+    caixa diário são atualizados aqui, com um UPDATE por tabela/forma.
+    """
+    if not itens:
+        return []
+
+    pagamentos = [
+        Pagamento(mensalidade_id=mensalidade_id, valor=valor, forma=forma, data_pagamento=data_pagamento)
+        for mensalidade_id, valor, forma in itens
+    ]
+
+    por_mensalidade = defaultdict(Decimal)
+    por_forma = defaultdict(lambda: [0, Decimal("0")])
+
+    for pagamento in pagamentos:
+        por_mensalidade[pagamento.mensalidade_id] += pagamento.valor
+        por_forma[pagamento.forma][0] += 1
+        por_forma[pagamento.forma][1] += pagamento.valor
+
+    with transaction.atomic():
+        Pagamento.objects.bulk_create(pagamentos)
+
+        Mensalidade.objects.filter(pk__in=por_mensalidade).update(
+            total_pago=F("total_pago") + Case(
+                *[When(pk=pk, then=Value(soma)) for pk, soma in por_mensalidade.items()],
+                output_field=DecimalField(max_digits=10, decimal_places=2)
+            )
+        )
+
+        for forma, (quantidade, total) in por_forma.items():
+            CaixaDiario.somar(data_pagamento, forma, quantidade, total)
+
+    invalidar_painel()
+
+    return pagamentos
@@ -1,8 +1,17 @@
-from django.contrib.auth.decorators import user_passes_test
+from functools import wraps
+
+from django.contrib.auth.views import redirect_to_login
+
+from .papeis import tem_papel
+
 
 def grupo_required(*nomes_grupos):
-    def in_group(user):
-        if user.is_superuser:
-            return True
-        return user.groups.filter(name__in=nomes_grupos).exists()
-    return user_passes_test(in_group)
\ No newline at end of file
+    # Grupos vêm de papeis.py (request/sessão), sem consulta por acesso
+    def decorator(view):
+        @wraps(view)
+        def _view(request, *args, **kwargs):
+            if request.user.is_authenticated and tem_papel(request, *nomes_grupos):
+                return view(request, *args, **kwargs)
+            return redirect_to_login(request.get_full_path())
+        return _view
+    return decorator
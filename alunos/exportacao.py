@@ -0,0 +1,319 @@
+import csv
+import io
+import tempfile
+from collections import defaultdict
+from datetime import date
+from decimal import Decimal
+from itertools import islice
+
+from openpyxl import Workbook
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4
+from reportlab.pdfgen import canvas
+from reportlab.platypus import Table, TableStyle
+
+from .models import Pagamento
+
+
+# ==================================================
+# EXPORTAÇÃO DO FLUXO DE CAIXA
+# ==================================================
+CHUNK = 2000
+
+# Até 5 MB fica em memória; acima disso o arquivo vai para o disco
+LIMITE_MEMORIA = 5 * 1024 * 1024
+
+CONTENT_TYPE_EXCEL = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+
+def _data(valor):
+    try:
+        return date.fromisoformat(valor) if valor else None
+    except ValueError:
+        return None
+
+
+def ler_filtros(params):
+    """Filtros aceitos pelas exportações: inicio, fim, forma e aluno."""
+    formas = dict(Pagamento.FORMAS)
+    aluno = params.get("aluno", "")
+
+    return {
+        "inicio": _data(params.get("inicio")),
+        "fim": _data(params.get("fim")),
+        "forma": params.get("forma") if params.get("forma") in formas else None,
+        "aluno": int(aluno) if aluno.isdigit() else None,
+    }
+
+
+def filtrar_pagamentos(filtros):
+    pagamentos = Pagamento.objects.all()
+
+    if filtros.get("inicio"):
+        pagamentos = pagamentos.filter(data_pagamento__gte=filtros["inicio"])
+    if filtros.get("fim"):
+        pagamentos = pagamentos.filter(data_pagamento__lte=filtros["fim"])
+    if filtros.get("forma"):
+        pagamentos = pagamentos.filter(forma=filtros["forma"])
+    if filtros.get("aluno"):
+        pagamentos = pagamentos.filter(mensalidade__aluno_id=filtros["aluno"])
+
+    return pagamentos
+
+
+def linhas_pagamentos(pagamentos, progresso=None):
+    """
+    (data, aluno, forma, valor) já com o JOIN, lidos em blocos.
+    progresso(n), se informado, é chamado a cada bloco com o total lido.
+    """
+    linhas = (
+        pagamentos
+        .order_by("-data_pagamento", "-id")
+        .values_list("data_pagamento", "mensalidade__aluno__nome", "forma", "valor")
+        .iterator(chunk_size=CHUNK)
+    )
+
+    if progresso is None:
+        return linhas
+
+    return _contar(linhas, progresso)
+
+
+def _contar(linhas, progresso):
+    lidas = 0
+
+    for linha in linhas:
+        yield linha
+        lidas += 1
+
+        if lidas % CHUNK == 0:
+            progresso(lidas)
+
+    progresso(lidas)
+
+
+def arquivo_temporario():
+    return tempfile.SpooledTemporaryFile(max_size=LIMITE_MEMORIA)
+
+
+# -----------------------------------------------
+# CSV (streaming, para a contabilidade)
+# -----------------------------------------------
+CABECALHO_CSV = ["Data", "Aluno", "Responsável", "Forma", "Valor", "Mensalidade"]
+
+LINHAS_POR_ENVIO = 500
+
+
+def linhas_csv(pagamentos):
+    """
+    Gera o CSV em pedaços de LINHAS_POR_ENVIO linhas, direto do cursor
+    (iterator usa cursor no servidor no PostgreSQL).
+    Separador ";" e BOM para o Excel em português abrir certo.
+    """
+    buffer = io.StringIO()
+    escritor = csv.writer(buffer, delimiter=";")
+
+    buffer.write("\ufeff")
+    escritor.writerow(CABECALHO_CSV)
+
+    linhas = (
+        pagamentos
+        .order_by("data_pagamento", "id")
+        .values_list(
+            "data_pagamento",
+            "mensalidade__aluno__nome",
+            "mensalidade__aluno__responsavel",
+            "forma",
+            "valor",
+            "mensalidade__vencimento",
+        )
+        .iterator(chunk_size=CHUNK)
+    )
+
+    for i, (data_pagamento, aluno, responsavel, forma, valor, vencimento) in enumerate(linhas, 1):
+        escritor.writerow([
+            data_pagamento.strftime("%d/%m/%Y"),
+            aluno,
+            responsavel,
+            forma,
+            f"{valor:.2f}".replace(".", ","),
+            vencimento.strftime("%m/%Y"),
+        ])
+
+        if i % LINHAS_POR_ENVIO == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+    yield buffer.getvalue()
+
+
+# -----------------------------------------------
+# Excel
+# -----------------------------------------------
+def gerar_excel(pagamentos, destino, progresso=None):
+    # write_only grava as linhas direto no arquivo, sem montar a planilha em memória
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Fluxo de Caixa")
+
+    ws.column_dimensions["A"].width = 12
+    ws.column_dimensions["B"].width = 40
+    ws.column_dimensions["C"].width = 20
+    ws.column_dimensions["D"].width = 12
+
+    ws.append(["Data", "Aluno", "Forma de Pagamento", "Valor"])
+
+    for data_pagamento, aluno, forma, valor in linhas_pagamentos(pagamentos, progresso):
+        ws.append([
+            data_pagamento.strftime("%d/%m/%Y"),
+            aluno,
+            forma,
+            valor
+        ])
+
+    wb.save(destino)
+
+
+# -----------------------------------------------
+# PDF
+# -----------------------------------------------
+LINHAS_POR_PAGINA = 40
+MARGEM = 40
+
+ESTILO_TABELA = TableStyle([
+    ("FONT", (0, 0), (-1, -1), "Helvetica", 9),
+    ("FONT", (0, 0), (-1, 0), "Helvetica-Bold", 9),
+    ("FONT", (0, -1), (-1, -1), "Helvetica-Bold", 9),
+    ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#343a40")),
+    ("TEXTCOLOR", (0, 0), (-1, 0), colors.white),
+    ("BACKGROUND", (0, -1), (-1, -1), colors.HexColor("#e9ecef")),
+    ("ROWBACKGROUNDS", (0, 1), (-1, -2), [colors.white, colors.HexColor("#f8f9fa")]),
+    ("ALIGN", (-1, 0), (-1, -1), "RIGHT"),
+    ("LINEBELOW", (0, 0), (-1, -1), 0.25, colors.HexColor("#dee2e6")),
+])
+
+
+def _moeda(valor):
+    texto = f"{valor:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
+    return f"R$ {texto}"
+
+
+def _descrever_filtros(filtros):
+    partes = []
+
+    if filtros.get("inicio") or filtros.get("fim"):
+        inicio = filtros["inicio"].strftime("%d/%m/%Y") if filtros.get("inicio") else "início"
+        fim = filtros["fim"].strftime("%d/%m/%Y") if filtros.get("fim") else "hoje"
+        partes.append(f"Período: {inicio} a {fim}")
+    if filtros.get("forma"):
+        partes.append(f"Forma: {dict(Pagamento.FORMAS)[filtros['forma']]}")
+    if filtros.get("aluno"):
+        partes.append(f"Aluno nº {filtros['aluno']}")
+
+    return " | ".join(partes) or "Todos os pagamentos"
+
+
+def _desenhar_tabela(pdf, dados, larguras, topo):
+    tabela = Table(dados, colWidths=larguras)
+    tabela.setStyle(ESTILO_TABELA)
+    _, altura = tabela.wrapOn(pdf, sum(larguras), topo)
+    tabela.drawOn(pdf, MARGEM, topo - altura)
+
+    return topo - altura
+
+
+def _cabecalho(pdf, subtitulo, pagina):
+    largura, altura = A4
+
+    pdf.setFont("Helvetica-Bold", 16)
+    pdf.drawString(MARGEM, altura - MARGEM - 10, "Relatório Financeiro")
+
+    pdf.setFont("Helvetica", 9)
+    pdf.drawString(MARGEM, altura - MARGEM - 26, subtitulo)
+    pdf.drawRightString(largura - MARGEM, MARGEM - 15, f"Página {pagina}")
+
+    return altura - MARGEM - 40
+
+
+def gerar_pdf(pagamentos, destino, filtros=None, progresso=None):
+    """
+    Relatório paginado: cada página é uma tabela de até LINHAS_POR_PAGINA
+    pagamentos com subtotal, e a última traz o resumo por forma e por mês.
+    As linhas chegam em blocos do banco e cada página é descartada depois
+    de desenhada.
+    """
+    subtitulo = _descrever_filtros(filtros or {})
+    larguras = [70, 255, 90, 100]
+
+    por_forma = defaultdict(Decimal)
+    por_mes = defaultdict(Decimal)
+    total_geral = Decimal("0.00")
+    quantidade = 0
+
+    pdf = canvas.Canvas(destino, pagesize=A4, pageCompression=1)
+    pdf.setTitle("Relatório Financeiro")
+
+    linhas = linhas_pagamentos(pagamentos, progresso)
+    pagina = 0
+
+    while True:
+        bloco = list(islice(linhas, LINHAS_POR_PAGINA))
+        if not bloco and pagina:
+            break
+
+        pagina += 1
+        topo = _cabecalho(pdf, subtitulo, pagina)
+
+        dados = [["Data", "Aluno", "Forma", "Valor"]]
+        subtotal = Decimal("0.00")
+
+        for data_pagamento, aluno, forma, valor in bloco:
+            dados.append([data_pagamento.strftime("%d/%m/%Y"), aluno[:45], forma, _moeda(valor)])
+
+            subtotal += valor
+            por_forma[forma] += valor
+            por_mes[data_pagamento.strftime("%Y-%m")] += valor
+
+        total_geral += subtotal
+        quantidade += len(bloco)
+
+        dados.append(["", f"Subtotal da página ({len(bloco)})", "", _moeda(subtotal)])
+        _desenhar_tabela(pdf, dados, larguras, topo)
+
+        pdf.showPage()
+
+        if len(bloco) < LINHAS_POR_PAGINA:
+            break
+
+    # Resumo final
+    pagina += 1
+    topo = _cabecalho(pdf, subtitulo, pagina)
+
+    formas = dict(Pagamento.FORMAS)
+    resumo_forma = [["Forma de pagamento", "Total"]]
+    resumo_forma += [[formas.get(f, f), _moeda(v)] for f, v in sorted(por_forma.items())]
+    resumo_forma.append([f"Total geral ({quantidade} pagamentos)", _moeda(total_geral)])
+
+    topo = _desenhar_tabela(pdf, resumo_forma, [300, 215], topo) - 20
+
+    meses = sorted(por_mes.items())
+    por_pagina = LINHAS_POR_PAGINA - 2
+
+    for i in range(0, max(len(meses), 1), por_pagina):
+        resumo_mes = [["Mês", "Total"]]
+        resumo_mes += [
+            [f"{mes[5:]}/{mes[:4]}", _moeda(valor)]
+            for mes, valor in meses[i:i + por_pagina]
+        ]
+        resumo_mes.append(["Total geral", _moeda(total_geral)])
+
+        altura_estimada = 16 * len(resumo_mes)
+        if topo - altura_estimada < MARGEM:
+            pdf.showPage()
+            pagina += 1
+            topo = _cabecalho(pdf, subtitulo, pagina)
+
+        topo = _desenhar_tabela(pdf, resumo_mes, [300, 215], topo) - 20
+
+    pdf.showPage()
+    pdf.save()
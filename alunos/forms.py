@@ -1,8 +1,43 @@
 from django import forms
+from django.core.exceptions import ValidationError
+from django.forms.models import construct_instance
 from .models import Aluno, Mensalidade, Pagamento
 from decimal import Decimal, InvalidOperation
 
 
+# ==================================================
+# BASE
+# ==================================================
+class SemValidarRestricoesMixin:
+    """
+    ModelForm que não revalida as CheckConstraints do modelo, que custam
+    uma consulta por restrição a cada form. Para grades e importações, em
+    que os clean_* já cobrem as regras e o banco garante no INSERT.
+
+    Mesmo _post_clean do ModelForm, só com validate_constraints=False.
+    """
+
+    def _post_clean(self):
+        opts = self._meta
+
+        try:
+            self.instance = construct_instance(self, self.instance, opts.fields, opts.exclude)
+        except ValidationError as e:
+            self._update_errors(e)
+
+        try:
+            self.instance.full_clean(
+                exclude=self._get_validation_exclusions(),
+                validate_unique=False,
+                validate_constraints=False
+            )
+        except ValidationError as e:
+            self._update_errors(e)
+
+        if self._validate_unique:
+            self.validate_unique()
+
+
 # ==================================================
 # ALUNO
 # ==================================================
@@ -13,7 +48,9 @@ class AlunoForm(forms.ModelForm):
         widget=forms.TextInput(
             attrs={
                 "class": "form-control",
-                "id": "id_valor_mensalidade"
+                "id": "id_valor_mensalidade",
+                "data-mascara": "dinheiro",
+                "inputmode": "numeric"
             }
         )
     )
@@ -124,6 +161,23 @@ class MensalidadeForm(forms.ModelForm):
         except (InvalidOperation, ValueError):
             raise forms.ValidationError("Informe um valor válido.")
 
+    def clean_vencimento(self):
+        vencimento = self.cleaned_data.get("vencimento")
+
+        # "aluno" não é campo do formulário, então o ModelForm não valida a
+        # UniqueConstraint (aluno, vencimento); a view define o aluno antes.
+        if vencimento and self.instance.aluno_id:
+            repetida = (
+                Mensalidade.objects
+                .filter(aluno_id=self.instance.aluno_id, vencimento=vencimento)
+                .exclude(pk=self.instance.pk)
+                .exists()
+            )
+            if repetida:
+                raise forms.ValidationError("Este aluno já tem uma mensalidade com este vencimento.")
+
+        return vencimento
+
 
 # ==================================================
 # PAGAMENTO
@@ -152,4 +206,70 @@ class PagamentoForm(forms.ModelForm):
         try:
             return Decimal(valor)
         except (InvalidOperation, ValueError):
-            raise forms.ValidationError("Informe um valor válido.")
\ No newline at end of file
+            raise forms.ValidationError("Informe um valor válido.")
+
+# ==================================================
+# PAGAMENTOS EM LOTE (fechamento do dia)
+# ==================================================
+class PagamentoLoteForm(SemValidarRestricoesMixin, PagamentoForm):
+    """
+    Uma linha da grade: em branco = mensalidade não paga hoje.
+
+    Não revalida a CheckConstraint de Pagamento (uma consulta por linha
+    preenchida): clean_valor já exige valor > 0 e o banco garante no INSERT.
+    """
+
+    mensalidade = forms.IntegerField(widget=forms.HiddenInput)
+
+    # Texto, como em AlunoForm, para clean_valor aceitar "1.234,50"
+    valor = forms.CharField(
+        required=False,
+        widget=forms.TextInput(
+            attrs={
+                "class": "form-control form-control-sm",
+                "placeholder": "0,00",
+                "inputmode": "decimal"
+            }
+        )
+    )
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields["forma"].required = False
+        self.fields["forma"].widget.attrs["class"] = "form-select form-select-sm"
+
+    def clean_valor(self):
+        valor = super().clean_valor()
+
+        if not valor:
+            return None
+
+        if valor <= 0:
+            raise forms.ValidationError("O valor deve ser maior que zero.")
+
+        return valor
+
+    def clean(self):
+        dados = super().clean()
+
+        if dados.get("valor") and not dados.get("forma"):
+            self.add_error("forma", "Escolha a forma de pagamento.")
+
+        return dados
+
+    @property
+    def preenchido(self):
+        return bool(self.cleaned_data.get("valor"))
+
+
+PagamentoLoteFormSet = forms.formset_factory(PagamentoLoteForm, extra=0)
+
+
+class DataLoteForm(forms.Form):
+    data_pagamento = forms.DateField(
+        label="Data dos pagamentos",
+        widget=forms.DateInput(
+            attrs={"type": "date", "class": "form-control"},
+            format="%Y-%m-%d"
+        )
+    )
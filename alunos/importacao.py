@@ -0,0 +1,319 @@
+import codecs
+import csv
+import io
+import os
+import time
+from datetime import date, datetime
+from itertools import chain
+from zipfile import BadZipFile
+
+from django.conf import settings
+from django.db import transaction
+from openpyxl import load_workbook
+from openpyxl.utils.exceptions import InvalidFileException
+
+from .busca import normalizar
+from .cache import invalidar_painel
+from .forms import AlunoForm, SemValidarRestricoesMixin
+from .models import Aluno
+
+
+# ==================================================
+# IMPORTAÇÃO DE ALUNOS (XLSX / CSV)
+# ==================================================
+LOTE = 500
+
+# Quantos erros aparecem na tela; o relatório completo vai para o arquivo
+AMOSTRA_ERROS = 20
+
+PASTA_RELATORIOS = "importacoes"
+
+# Cabeçalho da planilha (sem acento, minúsculo) -> campo de AlunoForm
+COLUNAS = {
+    "nome": "nome",
+    "aluno": "nome",
+    "nome do aluno": "nome",
+    "responsavel": "responsavel",
+    "nome do responsavel": "responsavel",
+    "telefone": "telefone",
+    "whatsapp": "telefone",
+    "whatsapp do responsavel": "telefone",
+    "celular": "telefone",
+    "valor mensalidade": "valor_mensalidade",
+    "valor da mensalidade": "valor_mensalidade",
+    "mensalidade": "valor_mensalidade",
+    "valor": "valor_mensalidade",
+    "dia vencimento": "dia_vencimento",
+    "dia de vencimento": "dia_vencimento",
+    "vencimento": "dia_vencimento",
+    "data nascimento": "data_nascimento",
+    "data de nascimento": "data_nascimento",
+    "nascimento": "data_nascimento",
+    "atipico": "atipico",
+    "tipo atipico": "tipo_atipico",
+    "condicao": "tipo_atipico",
+    "dia aula": "dia_aula",
+    "dias de aula": "dia_aula",
+    "horario": "horario_aula",
+    "horario aula": "horario_aula",
+    "observacoes": "observacoes",
+    "obs": "observacoes",
+    "ativo": "ativo",
+}
+
+OBRIGATORIAS = ("nome", "responsavel")
+
+SIM = {"sim", "s", "x", "1", "true", "verdadeiro"}
+NAO = {"nao", "n", "0", "false", "falso"}
+
+# Valor quando a célula está vazia
+PADRAO_BOOLEANO = {"atipico": False, "ativo": True}
+
+
+class ErroImportacao(ValueError):
+    """Arquivo ilegível ou sem as colunas obrigatórias."""
+
+
+class _AlunoImportacaoForm(SemValidarRestricoesMixin, AlunoForm):
+    """
+    AlunoForm sem revalidar as CheckConstraints de Aluno com uma consulta
+    por restrição a cada linha: elas repetem os validadores dos campos
+    (valor >= 0, dia 1..31) e o banco continua garantindo no INSERT.
+    """
+
+
+# -----------------------------------------------
+# Leitura em fluxo
+# -----------------------------------------------
+def _linhas_xlsx(arquivo):
+    try:
+        planilha = load_workbook(arquivo, read_only=True, data_only=True)
+    except (BadZipFile, InvalidFileException, KeyError):
+        # KeyError: um .zip qualquer, sem as partes de uma planilha
+        raise ErroImportacao("Não foi possível ler o arquivo .xlsx; salve-o novamente pelo Excel.")
+
+    try:
+        yield from planilha.active.iter_rows(values_only=True)
+    finally:
+        planilha.close()
+
+
+def _codificacao(arquivo):
+    # CSV salvo pelo Excel em português costuma vir em cp1252
+    inicio = arquivo.read(64 * 1024)
+    arquivo.seek(0)
+
+    try:
+        codecs.getincrementaldecoder("utf-8")().decode(inicio, final=False)
+        return "utf-8-sig"
+    except UnicodeDecodeError:
+        return "cp1252"
+
+
+def _linhas_csv(arquivo):
+    texto = io.TextIOWrapper(arquivo, encoding=_codificacao(arquivo), newline="")
+
+    try:
+        primeira = texto.readline()
+        separador = ";" if primeira.count(";") >= primeira.count(",") else ","
+
+        yield from csv.reader(chain([primeira], texto), delimiter=separador)
+    finally:
+        # Não fecha o arquivo de quem chamou
+        texto.detach()
+
+
+def ler_planilha(arquivo, nome_arquivo):
+    """
+    Gera (número da linha, {campo: texto}, linha original) sem carregar
+    o arquivo inteiro. A primeira linha não vazia é o cabeçalho.
+    """
+    extensao = os.path.splitext(nome_arquivo)[1].lower()
+
+    if extensao in (".xlsx", ".xlsm"):
+        linhas = _linhas_xlsx(arquivo)
+    elif extensao == ".csv":
+        linhas = _linhas_csv(arquivo)
+    else:
+        raise ErroImportacao("Envie um arquivo .xlsx ou .csv.")
+
+    campos = None
+
+    for numero, linha in enumerate(linhas, 1):
+        valores = ["" if v is None else v for v in linha]
+
+        if not any(str(v).strip() for v in valores):
+            continue
+
+        if campos is None:
+            campos = [COLUNAS.get(normalizar(str(v).replace("_", " ")).strip()) for v in valores]
+
+            faltando = [c for c in OBRIGATORIAS if c not in campos]
+            if faltando:
+                raise ErroImportacao(f"Colunas obrigatórias ausentes: {', '.join(faltando)}.")
+
+            yield numero, None, valores
+            continue
+
+        dados = {
+            campo: valor
+            for campo, valor in zip(campos, valores)
+            if campo
+        }
+
+        yield numero, dados, valores
+
+
+# -----------------------------------------------
+# Conversão e validação (mesmas regras de AlunoForm)
+# -----------------------------------------------
+def _texto(valor):
+    if isinstance(valor, datetime):
+        return valor.date().isoformat()
+    if isinstance(valor, date):
+        return valor.isoformat()
+    if isinstance(valor, float) and valor.is_integer():
+        return str(int(valor))
+
+    return str(valor).strip()
+
+
+def _booleano(valor, padrao):
+    if isinstance(valor, bool):
+        return valor
+
+    texto = normalizar(_texto(valor)).strip()
+
+    if not texto:
+        return padrao
+    if texto in SIM:
+        return True
+    if texto in NAO:
+        return False
+
+    return None
+
+
+def validar_linha(dados):
+    """Devolve (aluno não salvo, None) ou (None, {campo: [erros]})."""
+    dados_form = {campo: _texto(valor) for campo, valor in dados.items()}
+    erros = {}
+
+    for campo, padrao in PADRAO_BOOLEANO.items():
+        valor = _booleano(dados.get(campo, ""), padrao)
+
+        if valor is None:
+            erros[campo] = ["Use Sim ou Não."]
+        else:
+            dados_form[campo] = valor
+
+    form = _AlunoImportacaoForm(dados_form)
+
+    if not form.is_valid():
+        erros.update(form.errors)
+
+    if erros:
+        return None, erros
+
+    aluno = form.save(commit=False)
+    aluno.preencher_campos_derivados()
+    return aluno, None
+
+
+def _chave(nome, responsavel):
+    return normalizar(nome or "").strip(), normalizar(responsavel or "").strip()
+
+
+# -----------------------------------------------
+# Importação
+# -----------------------------------------------
+def _gravar(lote):
+    with transaction.atomic():
+        Aluno.objects.bulk_create(lote)
+
+    lote.clear()
+
+
+def importar_planilha(arquivo, nome_arquivo, relatorio=None):
+    """
+    Valida e grava os alunos em lotes de LOTE.
+
+    Linhas com erro (ou já cadastradas pelo mesmo nome e responsável) não
+    são gravadas; se relatorio (arquivo texto) for informado, recebe um CSV
+    com o número da linha, os erros e os valores originais.
+    Devolve {"importados", "com_erro", "amostra"}.
+    """
+    existentes = {
+        _chave(nome, responsavel)
+        for nome, responsavel in Aluno.objects.values_list("nome", "responsavel").iterator()
+    }
+
+    escritor = None
+    if relatorio is not None:
+        escritor = csv.writer(relatorio, delimiter=";")
+        relatorio.write("\ufeff")
+
+    lote = []
+    importados = com_erro = 0
+    amostra = []
+
+    for numero, dados, valores in ler_planilha(arquivo, nome_arquivo):
+        if dados is None:
+            if escritor:
+                escritor.writerow(["Linha", "Erros", *valores])
+            continue
+
+        aluno, erros = validar_linha(dados)
+
+        if aluno is not None:
+            chave = _chave(aluno.nome, aluno.responsavel)
+
+            if chave in existentes:
+                aluno, erros = None, {"nome": ["Aluno já cadastrado com este responsável."]}
+            else:
+                existentes.add(chave)
+
+        if erros:
+            com_erro += 1
+            mensagem = "; ".join(f"{campo}: {' '.join(lista)}" for campo, lista in erros.items())
+
+            if len(amostra) < AMOSTRA_ERROS:
+                amostra.append((numero, mensagem))
+            if escritor:
+                escritor.writerow([numero, mensagem, *valores])
+            continue
+
+        lote.append(aluno)
+        importados += 1
+
+        if len(lote) >= LOTE:
+            _gravar(lote)
+
+    if lote:
+        _gravar(lote)
+
+    if importados:
+        invalidar_painel()
+
+    return {"importados": importados, "com_erro": com_erro, "amostra": amostra}
+
+
+# -----------------------------------------------
+# Relatórios de erro (para download na tela de importação)
+# -----------------------------------------------
+def pasta_relatorios():
+    pasta = os.path.join(settings.EXPORT_ROOT, PASTA_RELATORIOS)
+    os.makedirs(pasta, exist_ok=True)
+    return pasta
+
+
+def limpar_relatorios_antigos(dias=None):
+    dias = settings.EXPORT_RETENCAO_DIAS if dias is None else dias
+    limite = time.time() - dias * 86400
+    pasta = pasta_relatorios()
+
+    for nome in os.listdir(pasta):
+        caminho = os.path.join(pasta, nome)
+
+        if os.path.getmtime(caminho) < limite:
+            os.remove(caminho)
@@ -0,0 +1,155 @@
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .cache import versao_painel
+from .models import Aluno, Lembrete, Mensalidade
+
+logger = logging.getLogger(__name__)
+
+
+# ==================================================
+# CAIXA DE SAÍDA DE LEMBRETES
+# ==================================================
+DIAS_ANIVERSARIO = 7
+LEMBRETES_POR_PAGINA = 10
+LOTE = 500
+
+
+def _lembrete_vencimento(mensalidade):
+    aluno = mensalidade.aluno
+
+    return Lembrete(
+        tipo="VENCIMENTO",
+        aluno=aluno,
+        mensalidade=mensalidade,
+        data=mensalidade.vencimento,
+        destinatario=aluno.telefone_whatsapp or "",
+        mensagem=mensalidade.texto_lembrete_vencimento,
+        link=mensalidade.link_lembrete_vencimento() or "",
+    )
+
+
+def _lembrete_aniversario(aluno, hoje):
+    return Lembrete(
+        tipo="ANIVERSARIO",
+        aluno=aluno,
+        data=hoje + timedelta(days=aluno.dias_para_aniversario),
+        destinatario=aluno.telefone_whatsapp or "",
+        mensagem=aluno.texto_aniversario,
+        link=aluno.msg_aniversario_whatsapp or "",
+    )
+
+
+def gerar_lembretes(hoje=None):
+    """
+    Monta numa passada os lembretes de vencimento (DIAS_AVISO_VENCIMENTO)
+    e de aniversário (DIAS_ANIVERSARIO) a partir de hoje.
+
+    Rodar de novo no mesmo dia só atualiza texto e link dos existentes;
+    pendentes de dias anteriores são descartados, e também os da janela
+    que deixaram de valer (mensalidade paga, aniversário corrigido).
+    Devolve {"gerados", "atualizados", "descartados"}; gerados conta só
+    os lembretes novos.
+    """
+    hoje = hoje or timezone.now().date()
+
+    vencendo = Mensalidade.objects.vencendo(dias=settings.DIAS_AVISO_VENCIMENTO, hoje=hoje)
+    aniversariantes = (
+        Aluno.objects
+        .filter(ativo=True)
+        .aniversariantes(dias=DIAS_ANIVERSARIO, hoje=hoje)
+        .only("id", "nome", "telefone", "telefone_e164", "aniversario")
+    )
+
+    lembretes = [_lembrete_vencimento(m) for m in vencendo.iterator(chunk_size=LOTE)]
+    lembretes += [_lembrete_aniversario(a, hoje) for a in aniversariantes.iterator(chunk_size=LOTE)]
+
+    chaves = {(lembrete.tipo, lembrete.aluno_id, lembrete.data) for lembrete in lembretes}
+    janela = (
+        Q(tipo="VENCIMENTO", data__range=(hoje, hoje + timedelta(days=settings.DIAS_AVISO_VENCIMENTO)))
+        | Q(tipo="ANIVERSARIO", data__range=(hoje, hoje + timedelta(days=DIAS_ANIVERSARIO)))
+    )
+
+    with transaction.atomic():
+        descartados, _ = Lembrete.objects.filter(status="PENDENTE", data__lt=hoje).delete()
+
+        obsoletos = [
+            id
+            for id, *chave in Lembrete.objects.filter(janela, status="PENDENTE").values_list("id", "tipo", "aluno_id", "data")
+            if tuple(chave) not in chaves
+        ]
+        if obsoletos:
+            descartados += Lembrete.objects.filter(id__in=obsoletos).delete()[0]
+
+        # O upsert não diz quais linhas já existiam
+        existentes = set(
+            Lembrete.objects.filter(data__gte=hoje).values_list("tipo", "aluno_id", "data")
+        )
+        gerados = sum(
+            1 for lembrete in lembretes
+            if (lembrete.tipo, lembrete.aluno_id, lembrete.data) not in existentes
+        )
+
+        Lembrete.objects.bulk_create(
+            lembretes,
+            batch_size=LOTE,
+            update_conflicts=True,
+            unique_fields=["tipo", "aluno", "data"],
+            update_fields=["mensalidade", "destinatario", "mensagem", "link"],
+        )
+
+    return {"gerados": gerados, "atualizados": len(lembretes) - gerados, "descartados": descartados}
+
+
+def garantir_lembretes(hoje=None):
+    """
+    Gera os lembretes no painel, para o caso de build_lembretes não estar
+    agendado (LEMBRETES_AUTOMATICOS): uma vez por dia e de novo sempre que
+    Aluno, Mensalidade ou Pagamento mudam (a chave usa a versão do painel).
+    Se a geração falhar, o painel abre com os lembretes que já existem e a
+    próxima visita tenta outra vez.
+    """
+    hoje = hoje or timezone.now().date()
+
+    if not settings.LEMBRETES_AUTOMATICOS:
+        return
+
+    chave = f"lembretes:gerados:{versao_painel()}:{hoje.isoformat()}"
+
+    if cache.get(chave):
+        return
+
+    # Trava curta para duas visitas simultâneas não gerarem juntas
+    trava = f"{chave}:gerando"
+    if not cache.add(trava, True, 60):
+        return
+
+    try:
+        gerar_lembretes(hoje)
+        cache.set(chave, True, 2 * 86400)
+    except Exception:
+        logger.exception("Falha ao gerar os lembretes de %s", hoje)
+    finally:
+        cache.delete(trava)
+
+
+def pagina_lembretes(tipo, pagina=1, hoje=None, tamanho=LEMBRETES_POR_PAGINA):
+    """Devolve (itens, tem_proxima) sem COUNT: busca tamanho + 1 linhas."""
+    inicio = (max(pagina, 1) - 1) * tamanho
+    itens = list(Lembrete.objects.pendentes(tipo, hoje)[inicio:inicio + tamanho + 1])
+
+    return itens[:tamanho], len(itens) > tamanho
+
+
+def marcar_enviados(ids, usuario):
+    return Lembrete.objects.filter(id__in=ids, status="PENDENTE").update(
+        status="ENVIADO",
+        enviado_em=timezone.now(),
+        enviado_por=usuario
+    )
@@ -0,0 +1,32 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from alunos.lembretes import gerar_lembretes
+
+
+class Command(BaseCommand):
+    help = (
+        "Gera a caixa de saída de lembretes (vencimentos e aniversários) "
+        "lida pelos painéis. Agende uma vez por dia, de madrugada."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--data", help="Dia de referência (AAAA-MM-DD); padrão: hoje.")
+
+    def handle(self, *args, **options):
+        hoje = None
+
+        if options["data"]:
+            try:
+                hoje = date.fromisoformat(options["data"])
+            except ValueError:
+                raise CommandError("Use --data no formato AAAA-MM-DD.")
+
+        resultado = gerar_lembretes(hoje)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{resultado['gerados']} lembrete(s) gerado(s), "
+            f"{resultado['atualizados']} atualizado(s), "
+            f"{resultado['descartados']} pendente(s) antigo(s) descartado(s)."
+        ))
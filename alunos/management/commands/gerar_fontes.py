@@ -0,0 +1,110 @@
+import os
+import shutil
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+# Pasta (em static/) com o CSS, as fontes reduzidas e a licença
+DESTINO = os.path.join("vendor", "poppins")
+
+# Peso -> arquivo da família original (os mesmos pesos do antigo link do Google Fonts)
+PESOS = {
+    300: "Poppins-Light.ttf",
+    400: "Poppins-Regular.ttf",
+    600: "Poppins-SemiBold.ttf",
+}
+
+# Subconjunto "latin" do Google Fonts: cobre português, €, aspas e travessões
+FAIXA_LATIN = (
+    "U+0000-00FF,U+0131,U+0152-0153,U+02BB-02BC,U+02C6,U+02DA,U+02DC,U+0304,"
+    "U+0308,U+0329,U+2000-206F,U+20AC,U+2122,U+2191,U+2193,U+2212,U+2215,U+FEFF,U+FFFD"
+)
+
+LICENCAS = ("OFL.txt", "LICENSE", "LICENSE.txt")
+
+CSS_BASE = """\
+/*!
+ * Poppins {versao} (subconjunto latin gerado por manage.py gerar_fontes)
+ * Copyright 2020 The Poppins Project Authors (https://github.com/itfoundry/Poppins)
+ * License - SIL Open Font License 1.1 (ver ../LICENSE)
+ */
+{fontes}
+"""
+
+
+def _pontos(faixa):
+    pontos = set()
+
+    for trecho in faixa.split(","):
+        inicio, _, fim = trecho.removeprefix("U+").partition("-")
+        pontos.update(range(int(inicio, 16), int(fim or inicio, 16) + 1))
+
+    return sorted(pontos)
+
+
+class Command(BaseCommand):
+    help = (
+        "Gera static/vendor/poppins com a Poppins 300/400/600 reduzida ao "
+        "subconjunto latin (WOFF2) e o CSS com os @font-face. Precisa do "
+        "fonttools e do brotli (só em desenvolvimento)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "origem",
+            help="Pasta com os .ttf da Poppins (Poppins-Light.ttf, Poppins-Regular.ttf...)."
+        )
+
+    def handle(self, *args, **options):
+        try:
+            from fontTools import subset
+        except ImportError:
+            raise CommandError("Instale o fonttools e o brotli: pip install fonttools brotli")
+
+        origem = options["origem"]
+        faltando = [nome for nome in PESOS.values() if not os.path.exists(os.path.join(origem, nome))]
+
+        if faltando:
+            raise CommandError(f"Arquivos não encontrados em {origem}: {', '.join(faltando)}")
+
+        destino = os.path.join(settings.BASE_DIR, "static", DESTINO)
+        os.makedirs(os.path.join(destino, "css"), exist_ok=True)
+        os.makedirs(os.path.join(destino, "webfonts"), exist_ok=True)
+
+        pontos = _pontos(FAIXA_LATIN)
+        fontes = []
+
+        for peso, nome in PESOS.items():
+            opcoes = subset.Options()
+            opcoes.flavor = "woff2"
+
+            fonte_original = subset.load_font(os.path.join(origem, nome), opcoes)
+            versao = f"{fonte_original['head'].fontRevision:.3f}"
+
+            subconjunto = subset.Subsetter(opcoes)
+            subconjunto.populate(unicodes=pontos)
+            subconjunto.subset(fonte_original)
+            subset.save_font(fonte_original, os.path.join(destino, "webfonts", f"poppins-{peso}.woff2"), opcoes)
+
+            fontes.append(
+                f'@font-face{{font-family:"Poppins";font-style:normal;font-weight:{peso};'
+                f'font-display:swap;src:url(../webfonts/poppins-{peso}.woff2) format("woff2");'
+                f'unicode-range:{FAIXA_LATIN.replace(",", ", ")}}}'
+            )
+
+        with open(os.path.join(destino, "css", "poppins.css"), "w", encoding="utf-8") as arquivo:
+            arquivo.write(CSS_BASE.format(versao=versao, fontes="\n".join(fontes)))
+
+        # A OFL pede que a licença acompanhe as fontes
+        for pasta in (origem, os.path.dirname(os.path.abspath(origem))):
+            licenca = next((os.path.join(pasta, n) for n in LICENCAS if os.path.exists(os.path.join(pasta, n))), None)
+            if licenca:
+                shutil.copyfile(licenca, os.path.join(destino, "LICENSE"))
+                break
+        else:
+            self.stderr.write("Licença (OFL.txt) não encontrada; copie-a para static/" + os.path.join(DESTINO, "LICENSE"))
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Poppins {versao} ({', '.join(map(str, PESOS))}) em static/{DESTINO}."
+        ))
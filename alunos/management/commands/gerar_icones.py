@@ -0,0 +1,138 @@
+import os
+import re
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+# Pasta (em static/) com o CSS e as fontes reduzidas
+DESTINO = os.path.join("vendor", "fontawesome")
+
+# Classes fa-* que são estilo/tamanho, não ícone
+CLASSES_DE_ESTILO = {"fa-solid", "fa-regular", "fa-brands", "fa-fw", "fa-lg", "fa-spin"}
+
+ICONE_NO_TEMPLATE = re.compile(r"\bfa-[a-z0-9-]+")
+
+# .fa-person-swimming:before,.fa-swimmer:before{content:"\f5c4"}
+REGRA_ICONE = re.compile(r'([^{}]+)\{content:"\\([0-9a-f]+)";?\}')
+SELETOR_ICONE = re.compile(r"\.(fa-[a-z0-9-]+)::?before")
+
+FONTES = {
+    "fa-solid-900": ("Font Awesome 6 Free", 900),
+    "fa-brands-400": ("Font Awesome 6 Brands", 400),
+}
+
+CSS_BASE = """\
+/*!
+ * Font Awesome Free {versao} (subconjunto gerado por manage.py gerar_icones)
+ * License - https://fontawesome.com/license/free (Icons: CC BY 4.0, Fonts: SIL OFL 1.1, Code: MIT License)
+ */
+{fontes}
+.fa,.fas,.fa-solid,.fab,.fa-brands{{-moz-osx-font-smoothing:grayscale;-webkit-font-smoothing:antialiased;display:var(--fa-display,inline-block);font-style:normal;font-variant:normal;line-height:1;text-rendering:auto}}
+.fa,.fas,.fa-solid{{font-family:"Font Awesome 6 Free";font-weight:900}}
+.fab,.fa-brands{{font-family:"Font Awesome 6 Brands";font-weight:400}}
+.fa-fw{{text-align:center;width:1.25em}}
+.fa-lg{{font-size:1.25em;line-height:.05em;vertical-align:-.075em}}
+{icones}
+"""
+
+
+def _arquivos_para_varrer():
+    pastas = [*settings.TEMPLATES[0]["DIRS"], *settings.STATICFILES_DIRS]
+
+    for pasta in pastas:
+        for raiz, _, arquivos in os.walk(pasta):
+            # Não lê o próprio CSS gerado nem as bibliotecas de terceiros
+            if os.path.join("static", "vendor") in raiz:
+                continue
+
+            for nome in arquivos:
+                if nome.endswith((".html", ".js")):
+                    yield os.path.join(raiz, nome)
+
+
+def icones_usados():
+    usados = set()
+
+    for caminho in _arquivos_para_varrer():
+        with open(caminho, encoding="utf-8") as arquivo:
+            usados.update(ICONE_NO_TEMPLATE.findall(arquivo.read()))
+
+    return usados - CLASSES_DE_ESTILO
+
+
+class Command(BaseCommand):
+    help = (
+        "Gera static/vendor/fontawesome com só os ícones usados nos templates "
+        "(CSS mínimo e fontes WOFF2 reduzidas). Rode de novo ao usar um ícone "
+        "novo. Precisa do fonttools e do brotli (só em desenvolvimento)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "origem",
+            help="Pasta do Font Awesome Free 6 (com css/all.css e webfonts/*.ttf)."
+        )
+
+    def handle(self, *args, **options):
+        try:
+            from fontTools import subset
+        except ImportError:
+            raise CommandError("Instale o fonttools e o brotli: pip install fonttools brotli")
+
+        origem = options["origem"]
+
+        try:
+            with open(os.path.join(origem, "css", "all.css"), encoding="utf-8") as arquivo:
+                css = arquivo.read()
+        except OSError as erro:
+            raise CommandError(f"Não foi possível ler o CSS do Font Awesome: {erro}")
+
+        versao = re.search(r"Font Awesome Free ([\d.]+)", css)
+        versao = versao.group(1) if versao else "6"
+
+        codigos = {}
+        for seletores, codigo in REGRA_ICONE.findall(css.replace("\n", "").replace(" ", "")):
+            for nome in SELETOR_ICONE.findall(seletores):
+                codigos[nome] = codigo
+
+        usados = icones_usados()
+        desconhecidos = sorted(usados - codigos.keys())
+
+        if desconhecidos:
+            raise CommandError(f"Ícones que não existem no Font Awesome {versao}: {', '.join(desconhecidos)}")
+
+        destino = os.path.join(settings.BASE_DIR, "static", DESTINO)
+        os.makedirs(os.path.join(destino, "css"), exist_ok=True)
+        os.makedirs(os.path.join(destino, "webfonts"), exist_ok=True)
+
+        pontos = sorted({int(codigos[nome], 16) for nome in usados})
+        fontes = []
+
+        for fonte, (familia, peso) in FONTES.items():
+            opcoes = subset.Options()
+            opcoes.flavor = "woff2"
+            opcoes.layout_features = []
+            opcoes.name_IDs = ["*"]
+
+            fonte_original = subset.load_font(os.path.join(origem, "webfonts", f"{fonte}.ttf"), opcoes)
+            subconjunto = subset.Subsetter(opcoes)
+            subconjunto.populate(unicodes=pontos)
+            subconjunto.subset(fonte_original)
+            subset.save_font(fonte_original, os.path.join(destino, "webfonts", f"{fonte}.woff2"), opcoes)
+
+            fontes.append(
+                f'@font-face{{font-family:"{familia}";font-style:normal;font-weight:{peso};'
+                f'font-display:block;src:url(../webfonts/{fonte}.woff2) format("woff2")}}'
+            )
+
+        icones = "\n".join(
+            f'.{nome}:before{{content:"\\{codigos[nome]}"}}' for nome in sorted(usados)
+        )
+
+        with open(os.path.join(destino, "css", "icones.css"), "w", encoding="utf-8") as arquivo:
+            arquivo.write(CSS_BASE.format(versao=versao, fontes="\n".join(fontes), icones=icones))
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{len(usados)} ícone(s) do Font Awesome {versao} em static/{DESTINO}."
+        ))
@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from alunos.cobranca import gerar_mensalidades
+from alunos.models import Aluno
+
+
+class Command(BaseCommand):
+    help = (
+        "Gera as mensalidades de um ano (ou de um intervalo de meses) para "
+        "todos os alunos ativos. Mensalidades já existentes são mantidas."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--ano", type=int, default=timezone.now().year)
+        parser.add_argument("--mes-inicial", type=int, default=1)
+        parser.add_argument("--mes-final", type=int, default=12)
+        parser.add_argument(
+            "--aluno",
+            type=int,
+            action="append",
+            help="Gera só para o aluno informado (pode repetir)."
+        )
+
+    def handle(self, *args, **options):
+        mes_inicial, mes_final = options["mes_inicial"], options["mes_final"]
+
+        if not 1 <= mes_inicial <= mes_final <= 12:
+            raise CommandError("Meses devem estar entre 1 e 12, com --mes-inicial <= --mes-final.")
+
+        alunos = None
+        if options["aluno"]:
+            alunos = Aluno.objects.filter(id__in=options["aluno"])
+
+        resultado = gerar_mensalidades(options["ano"], mes_inicial, mes_final, alunos)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{resultado['criadas']} mensalidade(s) criada(s), "
+            f"{resultado['ignoradas']} já existia(m), "
+            f"{resultado['sem_valor']} aluno(s) sem valor/vencimento configurado."
+        ))
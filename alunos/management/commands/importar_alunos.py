@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from alunos.importacao import ErroImportacao, importar_planilha
+
+
+class Command(BaseCommand):
+    help = (
+        "Importa alunos de uma planilha .xlsx ou .csv (cabeçalho na primeira "
+        "linha), com as mesmas validações do cadastro. Linhas com erro não "
+        "são gravadas e podem ser listadas em um relatório CSV."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("arquivo")
+        parser.add_argument(
+            "--relatorio",
+            help="Caminho do CSV com as linhas recusadas e o motivo."
+        )
+
+    def handle(self, *args, **options):
+        relatorio = open(options["relatorio"], "w", encoding="utf-8", newline="") if options["relatorio"] else None
+
+        try:
+            with open(options["arquivo"], "rb") as arquivo:
+                resultado = importar_planilha(arquivo, options["arquivo"], relatorio)
+        except (ErroImportacao, OSError) as erro:
+            raise CommandError(str(erro))
+        finally:
+            if relatorio:
+                relatorio.close()
+
+        for numero, mensagem in resultado["amostra"]:
+            self.stderr.write(f"Linha {numero}: {mensagem}")
+
+        if resultado["com_erro"] > len(resultado["amostra"]):
+            self.stderr.write("...")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{resultado['importados']} aluno(s) importado(s), "
+            f"{resultado['com_erro']} linha(s) recusada(s)."
+        ))
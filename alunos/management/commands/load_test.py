@@ -0,0 +1,112 @@
+import importlib.util
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import F
+
+from alunos.benchmark import USUARIOS
+from alunos.carga import DadosCarga, executar, iniciar_gunicorn
+from alunos.models import Aluno, Mensalidade
+
+
+class Command(BaseCommand):
+    help = (
+        "Teste de carga: usuários virtuais (funcionária e dona) fazem login "
+        "e repetem lista, detalhe, pagamento e painel em paralelo contra um "
+        "servidor local. Mostra vazão, latência p50/p95/p99 e taxa de erro. "
+        "Grava pagamentos de verdade: use um banco descartável "
+        "(seed_benchmark --senha ...)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--url", default="http://127.0.0.1:8000")
+        parser.add_argument(
+            "--iniciar",
+            action="store_true",
+            help="Sobe o gunicorn (tia_cassia.wsgi) na porta de --url e derruba no final."
+        )
+        parser.add_argument("--workers", type=int, default=2, help="Workers do gunicorn com --iniciar.")
+        parser.add_argument("--concorrencia", type=int, default=10, help="Usuários simultâneos.")
+        parser.add_argument("--proporcao-admin", type=float, default=0.2)
+        parser.add_argument("--duracao", type=int, default=30, help="Segundos de teste.")
+        parser.add_argument(
+            "--pausa",
+            type=float,
+            default=0,
+            help="Segundos de espera entre as ações de cada usuário."
+        )
+        parser.add_argument("--senha", default="benchmark")
+        parser.add_argument("--semente", type=int, default=42)
+        parser.add_argument("--saida", help="Grava o relatório em JSON neste arquivo.")
+
+    def handle(self, *args, **options):
+        if options["concorrencia"] < 1 or options["duracao"] < 1:
+            raise CommandError("Use --concorrencia e --duracao maiores que zero.")
+
+        try:
+            dados = DadosCarga(
+                list(Aluno.objects.order_by("?").values_list("id", flat=True)[:500]),
+                Mensalidade.objects.filter(total_pago__lt=F("valor"))
+                .order_by("?")
+                .annotate(saldo=F("valor") - F("total_pago"))
+                .values_list("id", "saldo")[:2000],
+            )
+        except ValueError as erro:
+            raise CommandError(erro)
+
+        servidor = None
+        if options["iniciar"]:
+            if importlib.util.find_spec("gunicorn") is None:
+                raise CommandError("gunicorn não está instalado (pip install -r requirements.txt).")
+
+            porta = int(options["url"].rsplit(":", 1)[-1].strip("/"))
+            try:
+                servidor = iniciar_gunicorn(porta, options["workers"])
+            except RuntimeError as erro:
+                raise CommandError(erro)
+
+        usuarios = {papel: (username, options["senha"]) for papel, username in USUARIOS.items()}
+
+        try:
+            relatorio = executar(
+                options["url"],
+                usuarios,
+                dados,
+                concorrencia=options["concorrencia"],
+                proporcao_admin=options["proporcao_admin"],
+                duracao=options["duracao"],
+                pausa=options["pausa"],
+                semente=options["semente"],
+            )
+        except RuntimeError as erro:
+            raise CommandError(erro)
+        finally:
+            if servidor:
+                servidor.terminate()
+                servidor.wait()
+
+        if options["iniciar"]:
+            relatorio["workers"] = options["workers"]
+
+        self.mostrar(relatorio)
+
+        if options["saida"]:
+            with open(options["saida"], "w", encoding="utf-8") as arquivo:
+                json.dump(relatorio, arquivo, indent=2, ensure_ascii=False, sort_keys=True)
+
+    def mostrar(self, relatorio):
+        self.stdout.write(
+            f"{relatorio['concorrencia']} usuário(s) ({relatorio['admins']} admin) "
+            f"por {relatorio['duracao_s']} s em {relatorio['url']}"
+        )
+        self.stdout.write(f"{'ação':<20} {'req':>7} {'req/s':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'erros':>7}")
+
+        linhas = [*relatorio["acoes"].items(), ("TOTAL", relatorio["total"])]
+
+        for acao, resumo in linhas:
+            latencia = resumo["latencia_ms"] or {"p50": 0, "p95": 0, "p99": 0}
+            self.stdout.write(
+                f"{acao:<20} {resumo['requisicoes']:>7} {resumo['vazao_rps']:>8} "
+                f"{latencia['p50']:>8} {latencia['p95']:>8} {latencia['p99']:>8} "
+                f"{(resumo['taxa_erro'] or 0):>7.1%}"
+            )
@@ -0,0 +1,37 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from alunos.cache import invalidar_painel
+from alunos.models import CaixaDiario
+
+
+def _data(valor):
+    try:
+        return date.fromisoformat(valor)
+    except ValueError:
+        raise CommandError(f"Data inválida: {valor} (use AAAA-MM-DD).")
+
+
+class Command(BaseCommand):
+    help = (
+        "Recalcula a tabela CaixaDiario (total por dia e forma de pagamento) "
+        "a partir dos pagamentos. Sem datas, recalcula todo o histórico."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--inicio", type=_data, help="Primeiro dia (AAAA-MM-DD).")
+        parser.add_argument("--fim", type=_data, help="Último dia (AAAA-MM-DD).")
+
+    def handle(self, *args, **options):
+        inicio, fim = options["inicio"], options["fim"]
+
+        if inicio and fim and inicio > fim:
+            raise CommandError("--inicio deve ser anterior a --fim.")
+
+        removidas, criadas = CaixaDiario.reconstruir(inicio, fim)
+        invalidar_painel()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Caixa recalculado: {removidas} linha(s) removida(s), {criadas} criada(s)."
+        ))
@@ -0,0 +1,79 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import DecimalField, F, Sum, Value
+from django.db.models.functions import Coalesce
+
+from alunos.cache import invalidar_painel
+from alunos.models import Mensalidade
+
+
+class Command(BaseCommand):
+    help = (
+        "Confere o total_pago gravado em cada mensalidade com a soma real "
+        "dos pagamentos e, com --corrigir, regrava os valores divergentes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--corrigir",
+            action="store_true",
+            help="Regrava o total_pago das mensalidades divergentes."
+        )
+        parser.add_argument(
+            "--lote",
+            type=int,
+            default=500,
+            help="Quantidade de mensalidades por bulk_update (padrão: 500)."
+        )
+
+    def handle(self, *args, **options):
+        divergentes = (
+            Mensalidade.objects
+            .annotate(
+                soma=Coalesce(
+                    Sum("pagamentos__valor"),
+                    Value(0),
+                    output_field=DecimalField(max_digits=10, decimal_places=2)
+                )
+            )
+            .exclude(total_pago=F("soma"))
+            .only("id", "total_pago")
+            .order_by("id")
+        )
+
+        corrigir = options["corrigir"]
+        lote = []
+        total = 0
+
+        with transaction.atomic():
+            for mensalidade in divergentes.iterator(chunk_size=options["lote"]):
+                total += 1
+                self.stdout.write(
+                    f"Mensalidade {mensalidade.id}: gravado R$ {mensalidade.total_pago}, "
+                    f"pagamentos somam R$ {mensalidade.soma}"
+                )
+
+                if not corrigir:
+                    continue
+
+                mensalidade.total_pago = mensalidade.soma
+                lote.append(mensalidade)
+
+                if len(lote) >= options["lote"]:
+                    Mensalidade.objects.bulk_update(lote, ["total_pago"])
+                    lote = []
+
+            if lote:
+                Mensalidade.objects.bulk_update(lote, ["total_pago"])
+
+            if corrigir and total:
+                invalidar_painel()
+
+        if not total:
+            self.stdout.write(self.style.SUCCESS("Todos os saldos conferem."))
+        elif corrigir:
+            self.stdout.write(self.style.SUCCESS(f"{total} mensalidade(s) corrigida(s)."))
+        else:
+            raise CommandError(
+                f"{total} mensalidade(s) divergente(s). Rode com --corrigir para regravar."
+            )
@@ -0,0 +1,67 @@
+import json
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test import override_settings
+
+from alunos.benchmark import executar
+
+
+# Mede o caminho sem cache do painel (o pior caso)
+SEM_CACHE = {"default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}}
+
+
+class Command(BaseCommand):
+    help = (
+        "Mede tempo, consultas SQL e pico de memória das views principais "
+        "(lista de alunos, detalhe, caixa nos dois papéis e exportações) "
+        "com volumes diferentes de dados sintéticos, desfeitos ao final. "
+        "Grava um relatório JSON para comparar entre versões."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--tamanhos",
+            default="100,1000",
+            help="Números de alunos gerados, separados por vírgula."
+        )
+        parser.add_argument("--repeticoes", type=int, default=5)
+        parser.add_argument("--anos", type=int, default=10)
+        parser.add_argument("--semente", type=int, default=42)
+        parser.add_argument(
+            "--saida",
+            help="Arquivo do relatório JSON (padrão: saída padrão)."
+        )
+
+    @override_settings(CACHES=SEM_CACHE, LEMBRETES_AUTOMATICOS=False)
+    def handle(self, *args, **options):
+        try:
+            tamanhos = [int(t) for t in options["tamanhos"].split(",")]
+        except ValueError:
+            raise CommandError("--tamanhos deve ser uma lista de números, ex.: 100,1000.")
+
+        if min(tamanhos) < 1 or options["repeticoes"] < 1:
+            raise CommandError("Use tamanhos e --repeticoes maiores que zero.")
+
+        def progresso(tamanho, nome, medicao):
+            self.stderr.write(
+                f"{tamanho} aluno(s) {nome}: {medicao['tempo_ms']['mediana']} ms, "
+                f"{medicao['consultas']} consulta(s), {medicao['memoria_pico_kb']} KB"
+            )
+
+        relatorio = executar(
+            tamanhos,
+            repeticoes=options["repeticoes"],
+            anos=options["anos"],
+            semente=options["semente"],
+            progresso=progresso,
+        )
+
+        texto = json.dumps(relatorio, indent=2, ensure_ascii=False, sort_keys=True) + "\n"
+
+        if options["saida"]:
+            with open(options["saida"], "w", encoding="utf-8") as arquivo:
+                arquivo.write(texto)
+            self.stderr.write(self.style.SUCCESS(f"Relatório gravado em {options['saida']}."))
+        else:
+            sys.stdout.write(texto)
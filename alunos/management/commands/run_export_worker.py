@@ -0,0 +1,55 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from alunos.models import ExportJob
+from alunos.tarefas import executar_exportacao, limpar_exportacoes_antigas, recuperar_exportacoes_travadas
+
+
+class Command(BaseCommand):
+    help = (
+        "Processa as exportações pendentes (tabela ExportJob). "
+        "Fica em loop consultando a fila, ou roda uma vez com --uma-vez."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--uma-vez",
+            action="store_true",
+            help="Processa o que estiver pendente e termina."
+        )
+        parser.add_argument(
+            "--intervalo",
+            type=float,
+            default=2.0,
+            help="Segundos entre consultas à fila (padrão: 2)."
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            close_old_connections()
+
+            pendentes = list(
+                ExportJob.objects
+                .filter(status="PENDENTE")
+                .order_by("criado_em")
+                .values_list("pk", flat=True)
+            )
+
+            for pk in pendentes:
+                if executar_exportacao(pk):
+                    self.stdout.write(f"Exportação {pk} concluída.")
+
+            interrompidos = recuperar_exportacoes_travadas()
+            if interrompidos:
+                self.stdout.write(f"{interrompidos} exportação(ões) interrompida(s) marcada(s) como erro.")
+
+            removidos = limpar_exportacoes_antigas()
+            if removidos:
+                self.stdout.write(f"{removidos} exportação(ões) antiga(s) removida(s).")
+
+            if options["uma_vez"]:
+                break
+
+            time.sleep(options["intervalo"])
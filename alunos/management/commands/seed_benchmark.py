@@ -0,0 +1,59 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from alunos.benchmark import USUARIOS, criar_usuarios, limpar, semear
+
+
+class Command(BaseCommand):
+    help = (
+        "Gera alunos sintéticos com anos de mensalidades e pagamentos "
+        "(sempre os mesmos para a mesma semente e data), para medir "
+        "desempenho com volumes reais. --limpar apaga os gerados antes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--alunos", type=int, default=500)
+        parser.add_argument("--anos", type=int, default=10)
+        parser.add_argument("--semente", type=int, default=42)
+        parser.add_argument(
+            "--data",
+            type=date.fromisoformat,
+            help="Data de referência (AAAA-MM-DD). Padrão: hoje."
+        )
+        parser.add_argument(
+            "--limpar",
+            action="store_true",
+            help="Apaga os alunos gerados por execuções anteriores."
+        )
+        parser.add_argument(
+            "--senha",
+            help="Cria as contas do teste de carga (bench_admin e bench_funcionaria) com esta senha."
+        )
+
+    def handle(self, *args, **options):
+        if options["alunos"] < 0 or options["anos"] < 1:
+            raise CommandError("Use --alunos >= 0 e --anos >= 1.")
+
+        if options["limpar"]:
+            removidos = limpar()
+            self.stdout.write(f"{removidos} registro(s) gerados anteriormente apagado(s).")
+
+        if options["senha"]:
+            criar_usuarios(options["senha"])
+            self.stdout.write(f"Contas {', '.join(USUARIOS.values())} prontas.")
+
+        if not options["alunos"]:
+            return
+
+        resultado = semear(
+            options["alunos"],
+            anos=options["anos"],
+            semente=options["semente"],
+            hoje=options["data"],
+        )
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{resultado['alunos']} aluno(s), {resultado['mensalidades']} mensalidade(s) "
+            f"e {resultado['pagamentos']} pagamento(s) gerados."
+        ))
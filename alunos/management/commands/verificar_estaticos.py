@@ -0,0 +1,72 @@
+import os
+import re
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.contrib.staticfiles.storage import ManifestFilesMixin, staticfiles_storage
+from django.core.management.base import BaseCommand, CommandError
+
+from alunos.views import ARQUIVOS_PRECACHE
+
+
+# src/href de <script>, <link>, <img> e <source> (links <a> ficam de fora)
+REFERENCIA = re.compile(
+    r"<(?:script|link|img|source)\b[^>]*?\b(?:src|href)\s*=\s*[\"']([^\"']+)[\"']",
+    re.IGNORECASE
+)
+TAG_STATIC = re.compile(r"""\{%\s*static\s+["']([^"']+)["']\s*%\}""")
+EXTERNO = re.compile(r"^(https?:)?//", re.IGNORECASE)
+
+
+def _templates():
+    for pasta in settings.TEMPLATES[0]["DIRS"]:
+        for raiz, _, arquivos in os.walk(pasta):
+            for nome in arquivos:
+                if nome.endswith(".html"):
+                    yield os.path.join(raiz, nome)
+
+
+class Command(BaseCommand):
+    help = (
+        "Verificação do build: falha se algum template carrega arquivo de CDN "
+        "ou de /static/ sem {% static %}, ou se um arquivo estático usado não "
+        "tem nome com hash no manifesto. Rode depois do collectstatic."
+    )
+
+    def handle(self, *args, **options):
+        falhas = []
+        usados = {caminho: "ARQUIVOS_PRECACHE (service worker)" for caminho in ARQUIVOS_PRECACHE}
+
+        for template in _templates():
+            nome = os.path.relpath(template, settings.BASE_DIR)
+
+            with open(template, encoding="utf-8") as arquivo:
+                conteudo = arquivo.read()
+
+            for referencia in REFERENCIA.findall(conteudo):
+                static = TAG_STATIC.search(referencia)
+
+                if static:
+                    usados.setdefault(static.group(1), nome)
+                elif EXTERNO.match(referencia):
+                    falhas.append(f"{nome}: arquivo externo {referencia}.")
+                elif referencia.startswith(settings.STATIC_URL):
+                    falhas.append(f"{nome}: {referencia} sem {{% static %}} (fica sem hash).")
+
+        if not isinstance(staticfiles_storage, ManifestFilesMixin):
+            raise CommandError("STORAGES['staticfiles'] não gera nomes com hash (use um ManifestStaticFilesStorage).")
+
+        manifesto, _ = staticfiles_storage.load_manifest()
+        if not manifesto:
+            raise CommandError("Manifesto dos estáticos não encontrado: rode collectstatic antes.")
+
+        for caminho, origem in sorted(usados.items()):
+            if not finders.find(caminho):
+                falhas.append(f"{origem}: {caminho} não existe em static/.")
+            elif manifesto.get(caminho, caminho) == caminho:
+                falhas.append(f"{origem}: {caminho} não está no manifesto (sem hash).")
+
+        if falhas:
+            raise CommandError("\n".join(falhas))
+
+        self.stdout.write(self.style.SUCCESS(f"{len(usados)} arquivo(s) estático(s) com hash."))
@@ -0,0 +1,217 @@
+import logging
+import os
+import threading
+import time
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+
+
+logger = logging.getLogger(__name__)
+
+
+# ==================================================
+# MÉTRICAS POR VIEW (latência e SQL)
+# ==================================================
+#
+# Os números ficam na memória de cada processo: com vários workers do
+# gunicorn, cada um responde /metrics com o que ele mesmo atendeu.
+
+PREFIXO = "tia_cassia"
+
+# Limites (segundos) do histograma de latência
+FAIXAS_LATENCIA = (0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+# Tamanho máximo do SQL guardado como exemplo de N+1
+TAMANHO_EXEMPLO = 300
+
+SEM_ROTA = "sem_rota"
+
+
+class _Metricas:
+    def __init__(self):
+        self.trava = threading.Lock()
+        self.zerar()
+
+    def zerar(self):
+        with self.trava:
+            self.requisicoes = Counter()
+            self.erros = Counter()
+            self.faixas = defaultdict(lambda: [0] * len(FAIXAS_LATENCIA))
+            self.latencia = Counter()
+            self.consultas = Counter()
+            self.consultas_max = Counter()
+            self.tempo_sql = Counter()
+            self.suspeitas = Counter()
+            self.exemplos = {}
+
+    def registrar(self, view, status, duracao, medicao):
+        with self.trava:
+            self.requisicoes[view] += 1
+            self.latencia[view] += duracao
+
+            if status >= 500:
+                self.erros[view] += 1
+
+            faixas = self.faixas[view]
+            for i, limite in enumerate(FAIXAS_LATENCIA):
+                if duracao <= limite:
+                    faixas[i] += 1
+
+            self.consultas[view] += medicao.total
+            self.consultas_max[view] = max(self.consultas_max[view], medicao.total)
+            self.tempo_sql[view] += medicao.tempo
+
+            if medicao.repetida:
+                self.suspeitas[view] += 1
+                self.exemplos[view] = medicao.repetida
+
+    def texto(self):
+        """Formato de exposição de texto do Prometheus (0.0.4)."""
+        linhas = [f"# processo {os.getpid()}"]
+
+        def serie(nome, tipo, ajuda, valores):
+            linhas.append(f"# HELP {PREFIXO}_{nome} {ajuda}")
+            linhas.append(f"# TYPE {PREFIXO}_{nome} {tipo}")
+            for view in sorted(valores):
+                linhas.append(f'{PREFIXO}_{nome}{{view="{view}"}} {_numero(valores[view])}')
+
+        with self.trava:
+            serie("requisicoes_total", "counter", "Requisições atendidas.", self.requisicoes)
+            serie("erros_total", "counter", "Respostas com status 5xx.", self.erros)
+
+            nome = f"{PREFIXO}_latencia_segundos"
+            linhas.append(f"# HELP {nome} Tempo total da requisição.")
+            linhas.append(f"# TYPE {nome} histogram")
+            for view in sorted(self.requisicoes):
+                for limite, total in zip(FAIXAS_LATENCIA, self.faixas[view]):
+                    linhas.append(f'{nome}_bucket{{view="{view}",le="{limite}"}} {total}')
+                linhas.append(f'{nome}_bucket{{view="{view}",le="+Inf"}} {self.requisicoes[view]}')
+                linhas.append(f'{nome}_sum{{view="{view}"}} {_numero(self.latencia[view])}')
+                linhas.append(f'{nome}_count{{view="{view}"}} {self.requisicoes[view]}')
+
+            serie("consultas_sql_total", "counter", "Consultas SQL executadas.", self.consultas)
+            serie("consultas_sql_max", "gauge", "Maior número de consultas numa requisição.", self.consultas_max)
+            serie("tempo_sql_segundos_total", "counter", "Tempo gasto no banco.", self.tempo_sql)
+            serie(
+                "suspeitas_n_mais_1_total",
+                "counter",
+                "Requisições que repetiram a mesma consulta (possível N+1).",
+                self.suspeitas,
+            )
+
+            for view in sorted(self.exemplos):
+                vezes, sql = self.exemplos[view]
+                linhas.append(f"# n+1 {view}: {vezes}x {sql}")
+
+        return "\n".join(linhas) + "\n"
+
+
+def _numero(valor):
+    return f"{valor:.6f}".rstrip("0").rstrip(".") if isinstance(valor, float) else str(valor)
+
+
+metricas = _Metricas()
+
+
+# -----------------------------------------------
+# Medição das consultas de uma requisição
+# -----------------------------------------------
+class _Medicao:
+    def __init__(self):
+        self.total = 0
+        self.tempo = 0.0
+        self.formatos = Counter()
+        self.repetida = None
+
+    def __call__(self, execute, sql, params, many, context):
+        inicio = time.perf_counter()
+
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.tempo += time.perf_counter() - inicio
+            self.total += 1
+            # Mesmo SQL com parâmetros diferentes = mesmo formato
+            self.formatos[sql] += 1
+
+    def verificar_repeticoes(self, limiar):
+        if not self.formatos:
+            return
+
+        sql, vezes = self.formatos.most_common(1)[0]
+
+        if vezes >= limiar:
+            self.repetida = (vezes, " ".join(sql.split())[:TAMANHO_EXEMPLO])
+
+
+class MetricasMiddleware:
+    """
+    Conta requisições, latência e consultas SQL por nome de rota e
+    devolve o resumo no cabeçalho Server-Timing (só para a equipe ou
+    com DEBUG, para não expor o tempo do banco a qualquer visitante).
+
+    Em StreamingHttpResponse (ex.: o CSV) as consultas rodam enquanto o
+    corpo é enviado: elas entram nas métricas, registradas quando o envio
+    termina, mas não no Server-Timing, que já saiu com os cabeçalhos.
+
+    Com METRICAS_ATIVAS desligado o Django descarta o middleware na
+    inicialização (MiddlewareNotUsed) e não há custo por requisição.
+    """
+
+    def __init__(self, get_response):
+        if not settings.METRICAS_ATIVAS:
+            raise MiddlewareNotUsed
+
+        self.get_response = get_response
+        self.limiar = settings.METRICAS_LIMIAR_REPETICOES
+
+    def __call__(self, request):
+        medicao = _Medicao()
+        inicio = time.perf_counter()
+
+        with connection.execute_wrapper(medicao):
+            response = self.get_response(request)
+
+        duracao = time.perf_counter() - inicio
+
+        correspondencia = getattr(request, "resolver_match", None)
+        view = correspondencia.view_name if correspondencia else SEM_ROTA
+
+        if self.mostrar_tempos(request):
+            response["Server-Timing"] = (
+                f'db;dur={medicao.tempo * 1000:.1f};desc="{medicao.total} consultas", '
+                f"total;dur={duracao * 1000:.1f}"
+            )
+
+        if response.streaming:
+            response.streaming_content = self.medir_envio(
+                response.streaming_content, view, response.status_code, inicio, medicao
+            )
+        else:
+            self.registrar(view, response.status_code, duracao, medicao)
+
+        return response
+
+    def mostrar_tempos(self, request):
+        usuario = getattr(request, "user", None)
+        return settings.DEBUG or bool(usuario and usuario.is_staff)
+
+    def medir_envio(self, conteudo, view, status, inicio, medicao):
+        # finally: o servidor fecha o gerador se o cliente desistir no meio
+        try:
+            with connection.execute_wrapper(medicao):
+                yield from conteudo
+        finally:
+            self.registrar(view, status, time.perf_counter() - inicio, medicao)
+
+    def registrar(self, view, status, duracao, medicao):
+        medicao.verificar_repeticoes(self.limiar)
+
+        if medicao.repetida:
+            vezes, sql = medicao.repetida
+            logger.warning("Possível N+1 em %s: %s execuções de %s", view, vezes, sql)
+
+        metricas.registrar(view, status, duracao, medicao)
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.10 on 2026-10-17 15:51
+
+from django.db import migrations, models
+from django.db.models import DecimalField, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+
+def preencher_total_pago(apps, schema_editor):
+    Mensalidade = apps.get_model("alunos", "Mensalidade")
+    Pagamento = apps.get_model("alunos", "Pagamento")
+
+    soma = (
+        Pagamento.objects
+        .filter(mensalidade=OuterRef("pk"))
+        .values("mensalidade")
+        .annotate(total=Sum("valor"))
+        .values("total")
+    )
+
+    Mensalidade.objects.update(
+        total_pago=Coalesce(
+            Subquery(soma),
+            Value(0),
+            output_field=DecimalField(max_digits=10, decimal_places=2)
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('alunos', '0022_aluno_dia_aula_aluno_horario_aula'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='mensalidade',
+            name='total_pago',
+            field=models.DecimalField(decimal_places=2, default=0, editable=False, max_digits=10),
+        ),
+        migrations.RunPython(preencher_total_pago, migrations.RunPython.noop),
+    ]
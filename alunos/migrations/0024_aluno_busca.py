@@ -0,0 +1,45 @@
+# Generated by Django 5.2.10 on 2026-10-17 16:20
+
+from django.db import migrations, models
+
+from alunos.busca import instalar_indice_busca, remover_indice_busca, texto_de_busca
+
+
+def preencher_busca(apps, schema_editor):
+    Aluno = apps.get_model("alunos", "Aluno")
+
+    lote = []
+    for aluno in Aluno.objects.only("id", "nome", "responsavel", "telefone").iterator(chunk_size=500):
+        aluno.busca = texto_de_busca(aluno)
+        lote.append(aluno)
+
+        if len(lote) >= 500:
+            Aluno.objects.bulk_update(lote, ["busca"])
+            lote = []
+
+    Aluno.objects.bulk_update(lote, ["busca"])
+
+
+def criar_indice(apps, schema_editor):
+    instalar_indice_busca(schema_editor.connection)
+
+
+def remover_indice(apps, schema_editor):
+    remover_indice_busca(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('alunos', '0023_mensalidade_total_pago'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='aluno',
+            name='busca',
+            field=models.CharField(blank=True, default='', editable=False, max_length=500),
+        ),
+        migrations.RunPython(preencher_busca, migrations.RunPython.noop),
+        migrations.RunPython(criar_indice, remover_indice),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.10 on 2026-10-17 15:55
+
+from django.db import migrations, models
+from django.db.models.functions import ExtractDay, ExtractMonth
+
+
+def preencher_aniversario(apps, schema_editor):
+    Aluno = apps.get_model("alunos", "Aluno")
+
+    Aluno.objects.filter(data_nascimento__isnull=False).update(
+        aniversario=ExtractMonth("data_nascimento") * 100 + ExtractDay("data_nascimento")
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('alunos', '0024_aluno_busca'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='aluno',
+            name='aniversario',
+            field=models.PositiveSmallIntegerField(blank=True, db_index=True, editable=False, null=True),
+        ),
+        migrations.RunPython(preencher_aniversario, migrations.RunPython.noop),
+    ]
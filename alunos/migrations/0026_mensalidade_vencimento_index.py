@@ -0,0 +1,18 @@
+# Generated by Django 5.2.10 on 2026-10-17 15:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('alunos', '0025_aluno_aniversario'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='mensalidade',
+            name='vencimento',
+            field=models.DateField(db_index=True),
+        ),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 5.2.10 on 2026-10-17 15:57
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def preencher_caixa(apps, schema_editor):
+    CaixaDiario = apps.get_model("alunos", "CaixaDiario")
+    Pagamento = apps.get_model("alunos", "Pagamento")
+
+    agregado = (
+        Pagamento.objects
+        .values("data_pagamento", "forma")
+        .annotate(qtd=Count("id"), soma=Sum("valor"))
+        .order_by()
+    )
+
+    CaixaDiario.objects.bulk_create(
+        (
+            CaixaDiario(
+                data=linha["data_pagamento"],
+                forma=linha["forma"],
+                quantidade=linha["qtd"],
+                total=linha["soma"],
+            )
+            for linha in agregado.iterator()
+        ),
+        batch_size=500
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('alunos', '0026_mensalidade_vencimento_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CaixaDiario',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('data', models.DateField()),
+                ('forma', models.CharField(choices=[('PIX', 'PIX'), ('DINHEIRO', 'Dinheiro'), ('CARTAO', 'Cartão')], max_length=20)),
+                ('quantidade', models.IntegerField(default=0)),
+                ('total', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+            ],
+            options={
+                'ordering': ['data', 'forma'],
+                'constraints': [models.UniqueConstraint(fields=('data', 'forma'), name='caixadiario_data_forma_unica')],
+            },
+        ),
+        migrations.RunPython(preencher_caixa, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,63 @@
+# Generated by Django 5.2.10 on 2026-10-17 16:04
+
+from django.db import migrations, models
+from django.db.models import Count, Min, Sum
+
+
+def unificar_duplicadas(apps, schema_editor):
+    # Mensalidades repetidas (mesmo aluno e vencimento) são unificadas na
+    # mais antiga: os pagamentos passam para ela antes de apagar as demais.
+    # Só vale para cópias idênticas; se o valor diverge não há como saber
+    # qual é a certa, então a migração para e lista as mensalidades.
+    Mensalidade = apps.get_model("alunos", "Mensalidade")
+    Pagamento = apps.get_model("alunos", "Pagamento")
+
+    grupos = list(
+        Mensalidade.objects
+        .values("aluno_id", "vencimento")
+        .annotate(qtd=Count("id"), manter=Min("id"), valores=Count("valor", distinct=True))
+        .filter(qtd__gt=1)
+    )
+
+    conflitos = [grupo for grupo in grupos if grupo["valores"] > 1]
+    if conflitos:
+        linhas = []
+        for grupo in conflitos:
+            mensalidades = Mensalidade.objects.filter(
+                aluno_id=grupo["aluno_id"],
+                vencimento=grupo["vencimento"]
+            ).order_by("id")
+            descricao = ", ".join(f"#{m.id} R$ {m.valor}" for m in mensalidades)
+            linhas.append(f"aluno {grupo['aluno_id']}, vencimento {grupo['vencimento']}: {descricao}")
+
+        raise RuntimeError(
+            "Mensalidades duplicadas com valores diferentes; corrija-as antes de migrar:\n"
+            + "\n".join(linhas)
+        )
+
+    for grupo in grupos:
+        duplicadas = Mensalidade.objects.filter(
+            aluno_id=grupo["aluno_id"],
+            vencimento=grupo["vencimento"]
+        ).exclude(id=grupo["manter"])
+
+        Pagamento.objects.filter(mensalidade__in=duplicadas).update(mensalidade_id=grupo["manter"])
+        duplicadas.delete()
+
+        total = Pagamento.objects.filter(mensalidade_id=grupo["manter"]).aggregate(t=Sum("valor"))["t"]
+        Mensalidade.objects.filter(id=grupo["manter"]).update(total_pago=total or 0)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('alunos', '0028_exportjob'),
+    ]
+
+    operations = [
+        migrations.RunPython(unificar_duplicadas, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='mensalidade',
+            constraint=models.UniqueConstraint(fields=('aluno', 'vencimento'), name='mensalidade_aluno_vencimento_unica'),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.10 on 2026-10-17 16:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('alunos', '0029_mensalidade_aluno_vencimento_unica'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='aluno',
+            index=models.Index(fields=['nome', 'id'], name='aluno_nome_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='pagamento',
+            index=models.Index(fields=['data_pagamento'], name='pagamento_data_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='aluno',
+            constraint=models.CheckConstraint(condition=models.Q(('valor_mensalidade__gte', 0)), name='aluno_valor_mensalidade_positivo'),
+        ),
+        migrations.AddConstraint(
+            model_name='aluno',
+            constraint=models.CheckConstraint(condition=models.Q(('dia_vencimento__gte', 1), ('dia_vencimento__lte', 31)), name='aluno_dia_vencimento_valido'),
+        ),
+        migrations.AddConstraint(
+            model_name='mensalidade',
+            constraint=models.CheckConstraint(condition=models.Q(('valor__gte', 0)), name='mensalidade_valor_positivo'),
+        ),
+        migrations.AddConstraint(
+            model_name='pagamento',
+            constraint=models.CheckConstraint(condition=models.Q(('valor__gte', 0)), name='pagamento_valor_positivo'),
+        ),
+    ]
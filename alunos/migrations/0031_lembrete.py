@@ -0,0 +1,38 @@
+# Generated by Django 5.2.10 on 2026-10-17 16:14
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('alunos', '0030_indices_e_restricoes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Lembrete',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tipo', models.CharField(choices=[('VENCIMENTO', 'Vencimento'), ('ANIVERSARIO', 'Aniversário')], max_length=20)),
+                ('data', models.DateField()),
+                ('destinatario', models.CharField(blank=True, max_length=20)),
+                ('mensagem', models.TextField()),
+                ('link', models.TextField(blank=True)),
+                ('status', models.CharField(choices=[('PENDENTE', 'Pendente'), ('ENVIADO', 'Enviado')], default='PENDENTE', max_length=20)),
+                ('criado_em', models.DateTimeField(auto_now_add=True)),
+                ('enviado_em', models.DateTimeField(blank=True, null=True)),
+                ('aluno', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='lembretes', to='alunos.aluno')),
+                ('enviado_por', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='lembretes_enviados', to=settings.AUTH_USER_MODEL)),
+                ('mensalidade', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='lembretes', to='alunos.mensalidade')),
+            ],
+            options={
+                'ordering': ['data', 'id'],
+                'indexes': [models.Index(fields=['tipo', 'status', 'data'], name='lembrete_tipo_status_data_idx')],
+                'constraints': [models.UniqueConstraint(fields=('tipo', 'aluno', 'data'), name='lembrete_tipo_aluno_data_unico')],
+            },
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.10 on 2026-10-17 16:40
+
+from django.db import migrations, models
+
+from alunos.telefone import normalizar_telefone
+
+
+def preencher_telefone_e164(apps, schema_editor):
+    Aluno = apps.get_model("alunos", "Aluno")
+
+    lote = []
+    for aluno in Aluno.objects.exclude(telefone="").exclude(telefone__isnull=True).only("id", "telefone").iterator(chunk_size=500):
+        aluno.telefone_e164 = normalizar_telefone(aluno.telefone)
+        lote.append(aluno)
+
+        if len(lote) >= 500:
+            Aluno.objects.bulk_update(lote, ["telefone_e164"])
+            lote = []
+
+    Aluno.objects.bulk_update(lote, ["telefone_e164"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('alunos', '0031_lembrete'),
+    ]
+
+    operations = [
+        # Coluna sem índice, preenchimento em lotes e só então o índice
+        migrations.AddField(
+            model_name='aluno',
+            name='telefone_e164',
+            field=models.CharField(blank=True, default='', editable=False, max_length=16),
+        ),
+        migrations.RunPython(preencher_telefone_e164, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='aluno',
+            name='telefone_e164',
+            field=models.CharField(blank=True, db_index=True, default='', editable=False, max_length=16),
+        ),
+    ]
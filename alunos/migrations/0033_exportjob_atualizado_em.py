@@ -0,0 +1,18 @@
+# Generated by Django 5.2.10 on 2026-10-17 16:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('alunos', '0032_aluno_telefone_e164'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='exportjob',
+            name='atualizado_em',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -1,10 +1,77 @@
-from django.db import models
+from django.conf import settings
+from django.db import models, transaction
+from django.db.models import BooleanField, Case, Count, ExpressionWrapper, F, IntegerField, Q, Sum, Value, When
+from django.db.models.functions import ExtractMonth
 from django.utils import timezone
-from django.db.models import Sum
 from django.core.validators import MinValueValidator, MaxValueValidator
+import calendar
+import re
 import urllib.parse
+from datetime import date, datetime, timedelta
+from decimal import Decimal
 from urllib.parse import quote
 
+from .busca import texto_de_busca
+from .telefone import normalizar_telefone, variantes_telefone
+
+
+CENTAVO = Decimal("0.01")
+
+
+# ==================================================
+# ANIVERSÁRIO (chave MMDD indexada)
+# ==================================================
+def chave_aniversario(data):
+    return data.month * 100 + data.day
+
+
+def chaves_aniversario(inicio, dias):
+    """
+    Devolve {chave MMDD: dias a partir de inicio} para inicio .. inicio + dias.
+
+    Em anos não bissextos, quem nasceu em 29/02 comemora em 28/02.
+    """
+    chaves = {}
+
+    for i in range(dias + 1):
+        data = inicio + timedelta(days=i)
+        chaves[chave_aniversario(data)] = i
+
+        if (data.month, data.day) == (2, 28) and not calendar.isleap(data.year):
+            chaves[229] = i
+
+    return chaves
+
+
+class AlunoQuerySet(models.QuerySet):
+
+    def com_aniversario_hoje(self, hoje=None):
+        hoje = hoje or timezone.now().date()
+
+        return self.annotate(aniversario_hoje=ExpressionWrapper(
+            Q(aniversario__in=list(chaves_aniversario(hoje, 0))),
+            output_field=BooleanField()
+        ))
+
+    def por_telefone(self, numero):
+        """Busca exata pelo telefone normalizado (aceita com ou sem o nono dígito)."""
+        return self.filter(telefone_e164__in=variantes_telefone(numero))
+
+    def aniversariantes(self, dias=7, hoje=None):
+        """Aniversários de hoje até hoje + dias, já ordenados (uma consulta)."""
+        hoje = hoje or timezone.now().date()
+        chaves = chaves_aniversario(hoje, dias)
+
+        return (
+            self.filter(aniversario__in=list(chaves))
+            .com_aniversario_hoje(hoje)
+            .annotate(dias_para_aniversario=Case(
+                *[When(aniversario=chave, then=Value(d)) for chave, d in chaves.items()],
+                output_field=IntegerField()
+            ))
+            .order_by("dias_para_aniversario", "nome")
+        )
+
 
 # ==================================================
 # ALUNO
@@ -21,8 +88,25 @@ class Aluno(models.Model):
         help_text="Digite DDD + Número (Ex: 11999998888)"
     )
 
+    # telefone em E.164 ("+5511999998888"), mantido por save() (ver telefone.py)
+    telefone_e164 = models.CharField(
+        max_length=16,
+        blank=True,
+        default="",
+        editable=False,
+        db_index=True
+    )
+
     data_nascimento = models.DateField(null=True, blank=True)
 
+    # Mês e dia do nascimento (MMDD), para buscar aniversários por índice
+    aniversario = models.PositiveSmallIntegerField(
+        null=True,
+        blank=True,
+        editable=False,
+        db_index=True
+    )
+
     atipico = models.BooleanField(default=False)
     tipo_atipico = models.CharField(
         "Condição",
@@ -65,77 +149,121 @@ class Aluno(models.Model):
         help_text="Dia fixo para vencimento (Ex: 5, 10, 15)"
     )
 
+    # Nome, responsável e telefone sem acentos (ver busca.py)
+    busca = models.CharField(
+        max_length=500,
+        blank=True,
+        default="",
+        editable=False
+    )
+
+    objects = AlunoQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # Listagem paginada por (nome, id), com ou sem filtro de ativos
+            models.Index(fields=["nome", "id"], name="aluno_nome_id_idx"),
+        ]
+        constraints = [
+            models.CheckConstraint(
+                condition=Q(valor_mensalidade__gte=0),
+                name="aluno_valor_mensalidade_positivo"
+            ),
+            models.CheckConstraint(
+                condition=Q(dia_vencimento__gte=1, dia_vencimento__lte=31),
+                name="aluno_dia_vencimento_valido"
+            ),
+        ]
+
     def __str__(self):
         return self.nome
 
+    def preencher_campos_derivados(self):
+        # Chamado por save(); bulk_create precisa chamar direto
+        self.busca = texto_de_busca(self)
+        self.telefone_e164 = normalizar_telefone(self.telefone)
+        self.aniversario = (
+            chave_aniversario(self.data_nascimento)
+            if self.data_nascimento else None
+        )
+
+    def save(self, *args, **kwargs):
+        self.preencher_campos_derivados()
+
+        if kwargs.get("update_fields") is not None:
+            kwargs["update_fields"] = {*kwargs["update_fields"], "busca", "telefone_e164", "aniversario"}
+
+        super().save(*args, **kwargs)
+
     # -----------------------------------------------
     # Utilitário interno para gerar link WhatsApp
     # -----------------------------------------------
+    @property
+    def telefone_whatsapp(self):
+        # wa.me recebe só os dígitos, com o código do país. Número que não
+        # deu para normalizar (ex.: salvo sem DDD) vai como foi digitado.
+        return self.telefone_e164.lstrip("+") or re.sub(r"\D", "", self.telefone or "") or None
+
     def _gerar_link_whatsapp(self, texto):
-        if not self.telefone:
+        fone = self.telefone_whatsapp
+
+        if not fone:
             return None
 
         msg = urllib.parse.quote(texto)
 
-        fone_limpo = "".join(filter(str.isdigit, self.telefone))
-
-        if not fone_limpo.startswith("55"):
-            fone_limpo = f"55{fone_limpo}"
-
-        return f"https://wa.me/{fone_limpo}?text={msg}"
+        return f"https://wa.me/{fone}?text={msg}"
 
     @property
-    def msg_aniversario_whatsapp(self):
-        texto = (
+    def texto_aniversario(self):
+        return (
             f"Ola {self.nome}!\n\n"
             "A Tia Cassia e toda a equipe do Studio desejam um feliz aniversario!\n\n"
             "Muita saude e otimas bracadas na natacao."
         )
 
-        return self._gerar_link_whatsapp(texto)
-
-    @property
-    def e_aniversario(self):
-        if not self.data_nascimento:
-            return False
-
-        hoje = timezone.now().date()
-
-        return (
-            self.data_nascimento.day == hoje.day and
-            self.data_nascimento.month == hoje.month
-        )
-
-      # -----------------------------------------------
-    # Link de aniversário
-    # -----------------------------------------------
     @property
     def msg_aniversario_whatsapp(self):
-        texto = (
-            f"Ola {self.nome}!\n\n"
-            "A Tia Cassia e toda a equipe do Studio desejam um feliz aniversario!\n\n"
-            "Muita saude e otimas bracadas na natacao."
-        )
-
-        return self._gerar_link_whatsapp(texto)
+        return self._gerar_link_whatsapp(self.texto_aniversario)
 
     # -----------------------------------------------
     # Propriedade: é aniversário hoje?
     # -----------------------------------------------
     @property
     def e_aniversario(self):
-        if not self.data_nascimento:
+        # Reaproveita a anotação de AlunoQuerySet quando existir
+        if hasattr(self, "aniversario_hoje"):
+            return self.aniversario_hoje
+
+        if not self.aniversario:
             return False
-        hoje = timezone.now().date()
-        return (
-            self.data_nascimento.day == hoje.day and
-            self.data_nascimento.month == hoje.month
-        )
+
+        return self.aniversario in chaves_aniversario(timezone.now().date(), 0)
 
 
 # ==================================================
 # MENSALIDADE
 # ==================================================
+class MensalidadeQuerySet(models.QuerySet):
+
+    def em_aberto(self):
+        return self.filter(valor__gt=F("total_pago"))
+
+    def vencendo(self, dias=1, hoje=None):
+        """Mensalidades não quitadas de alunos ativos que vencem de hoje até hoje + dias."""
+        hoje = hoje or timezone.now().date()
+
+        return (
+            self.em_aberto()
+            .filter(
+                vencimento__range=(hoje, hoje + timedelta(days=dias)),
+                aluno__ativo=True
+            )
+            .select_related("aluno")
+            .order_by("vencimento", "aluno__nome")
+        )
+
+
 class Mensalidade(models.Model):
     aluno = models.ForeignKey(
         Aluno,
@@ -149,9 +277,31 @@ class Mensalidade(models.Model):
         validators=[MinValueValidator(0)]
     )
 
-    vencimento = models.DateField()
+    vencimento = models.DateField(db_index=True)
     criada_em = models.DateTimeField(auto_now_add=True)
 
+    # Soma dos pagamentos, mantida pelos sinais de Pagamento (ver signals.py)
+    total_pago = models.DecimalField(
+        max_digits=10,
+        decimal_places=2,
+        default=0,
+        editable=False
+    )
+
+    objects = MensalidadeQuerySet.as_manager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["aluno", "vencimento"],
+                name="mensalidade_aluno_vencimento_unica"
+            ),
+            models.CheckConstraint(
+                condition=Q(valor__gte=0),
+                name="mensalidade_valor_positivo"
+            ),
+        ]
+
     def __str__(self):
         return f"{self.aluno.nome} - {self.vencimento.strftime('%m/%Y')}"
 
@@ -160,18 +310,15 @@ class Mensalidade(models.Model):
     # -----------------------------------------------
     @property
     def em_aberto(self):
-        total_pago = self.pagamentos.aggregate(
-            total=Sum("valor")
-        )["total"] or 0
-
-        resultado = self.valor - total_pago
+        resultado = self.valor - self.total_pago
         return max(resultado, 0)
 
     # -----------------------------------------------
     # Link lembrete de vencimento
     # -----------------------------------------------
-    def link_lembrete_vencimento(self):
-        texto = (
+    @property
+    def texto_lembrete_vencimento(self):
+        return (
             f"Olá! 😊\n\n"
             f"A mensalidade de natação de {self.aluno.nome} "
             f"vence em {self.vencimento.strftime('%d/%m/%Y')}.\n\n"
@@ -179,7 +326,8 @@ class Mensalidade(models.Model):
             "Caso já tenha pago, desconsidere esta mensagem. 🙏"
         )
 
-        return self.aluno._gerar_link_whatsapp(texto)
+    def link_lembrete_vencimento(self):
+        return self.aluno._gerar_link_whatsapp(self.texto_lembrete_vencimento)
 
 
 # ==================================================
@@ -208,9 +356,32 @@ class Pagamento(models.Model):
     forma = models.CharField(max_length=20, choices=FORMAS)
     data_pagamento = models.DateField(default=timezone.now)
 
+    class Meta:
+        indexes = [
+            # Filtros por período (exportações, fechamento, rollup do caixa)
+            models.Index(fields=["data_pagamento"], name="pagamento_data_idx"),
+        ]
+        constraints = [
+            models.CheckConstraint(
+                condition=Q(valor__gte=0),
+                name="pagamento_valor_positivo"
+            ),
+        ]
+
     def __str__(self):
         return f"Pagamento: {self.mensalidade.aluno.nome} - R$ {self.valor}"
 
+    # -----------------------------------------------
+    # Gravação atômica (total_pago é atualizado junto)
+    # -----------------------------------------------
+    def save(self, *args, **kwargs):
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            return super().delete(*args, **kwargs)
+
     # -----------------------------------------------
     # Link comprovante
     # -----------------------------------------------
@@ -225,4 +396,284 @@ class Pagamento(models.Model):
             "Muito obrigado! 🙏"
         )
 
-        return self.mensalidade.aluno._gerar_link_whatsapp(texto)
\ No newline at end of file
+        return self.mensalidade.aluno._gerar_link_whatsapp(texto)
+
+
+# ==================================================
+# CAIXA DIÁRIO (resumo de Pagamento por dia e forma)
+# ==================================================
+class CaixaDiarioQuerySet(models.QuerySet):
+
+    def resumo_financeiro(self, hoje=None):
+        """
+        Totais de hoje, do mês e do ano e a receita de cada mês do ano,
+        numa única consulta agrupada por mês (valores em Decimal).
+        Lê no máximo uma linha por dia e forma de pagamento.
+        """
+        hoje = hoje or timezone.now().date()
+
+        por_mes = (
+            self.filter(data__range=(date(hoje.year, 1, 1), date(hoje.year, 12, 31)))
+            .annotate(mes=ExtractMonth("data"))
+            .values("mes")
+            .annotate(
+                soma=Sum("total"),
+                soma_hoje=Sum("total", filter=Q(data=hoje))
+            )
+            .order_by("mes")
+        )
+
+        meses = [Decimal("0.00")] * 12
+        total_hoje = Decimal("0.00")
+
+        for linha in por_mes:
+            meses[linha["mes"] - 1] = Decimal(linha["soma"]).quantize(CENTAVO)
+            total_hoje += linha["soma_hoje"] or 0
+
+        return {
+            "total_hoje": Decimal(total_hoje).quantize(CENTAVO),
+            "total_mes": meses[hoje.month - 1],
+            "total_ano": sum(meses, Decimal("0.00")),
+            "meses": meses,
+        }
+
+
+    def totais_por_forma(self):
+        totais = {forma: Decimal("0.00") for forma, _ in Pagamento.FORMAS}
+        quantidade = 0
+
+        for linha in self.values("forma").annotate(soma=Sum("total"), qtd=Sum("quantidade")).order_by():
+            totais[linha["forma"]] = Decimal(linha["soma"]).quantize(CENTAVO)
+            quantidade += linha["qtd"]
+
+        return totais, quantidade
+
+
+class CaixaDiario(models.Model):
+    data = models.DateField()
+    forma = models.CharField(max_length=20, choices=Pagamento.FORMAS)
+    quantidade = models.IntegerField(default=0)
+    total = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+
+    objects = CaixaDiarioQuerySet.as_manager()
+
+    class Meta:
+        ordering = ["data", "forma"]
+        constraints = [
+            models.UniqueConstraint(fields=["data", "forma"], name="caixadiario_data_forma_unica"),
+        ]
+
+    def __str__(self):
+        return f"{self.data.strftime('%d/%m/%Y')} - {self.forma}: R$ {self.total}"
+
+    # -----------------------------------------------
+    # Soma (ou subtrai) pagamentos do dia; roda na
+    # transação do Pagamento (ver signals.py)
+    # -----------------------------------------------
+    @classmethod
+    def somar(cls, data, forma, quantidade, valor):
+        if isinstance(data, datetime):
+            data = data.date()
+
+        linha, _ = cls.objects.get_or_create(data=data, forma=forma)
+
+        cls.objects.filter(pk=linha.pk).update(
+            quantidade=F("quantidade") + quantidade,
+            total=F("total") + valor
+        )
+
+    # -----------------------------------------------
+    # Recalcula um período a partir dos pagamentos
+    # -----------------------------------------------
+    @classmethod
+    def reconstruir(cls, inicio=None, fim=None):
+        periodo = {}
+        if inicio:
+            periodo["gte"] = inicio
+        if fim:
+            periodo["lte"] = fim
+
+        pagamentos = Pagamento.objects.filter(
+            **{f"data_pagamento__{op}": data for op, data in periodo.items()}
+        )
+        linhas = cls.objects.filter(
+            **{f"data__{op}": data for op, data in periodo.items()}
+        )
+
+        agregado = (
+            pagamentos
+            .values("data_pagamento", "forma")
+            .annotate(qtd=Count("id"), soma=Sum("valor"))
+            .order_by()
+        )
+
+        with transaction.atomic():
+            removidas, _ = linhas.delete()
+
+            criadas = cls.objects.bulk_create(
+                (
+                    cls(
+                        data=linha["data_pagamento"],
+                        forma=linha["forma"],
+                        quantidade=linha["qtd"],
+                        total=linha["soma"],
+                    )
+                    for linha in agregado.iterator()
+                ),
+                batch_size=500
+            )
+
+        return removidas, len(criadas)
+
+
+# ==================================================
+# EXPORTAÇÕES EM SEGUNDO PLANO
+# ==================================================
+class ExportJob(models.Model):
+
+    TIPOS = (
+        ("EXCEL", "Excel"),
+        ("PDF", "PDF"),
+    )
+
+    STATUS = (
+        ("PENDENTE", "Pendente"),
+        ("PROCESSANDO", "Processando"),
+        ("CONCLUIDO", "Concluído"),
+        ("ERRO", "Erro"),
+    )
+
+    tipo = models.CharField(max_length=10, choices=TIPOS)
+    filtros = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS, default="PENDENTE", db_index=True)
+
+    total = models.PositiveIntegerField(default=0)
+    processados = models.PositiveIntegerField(default=0)
+
+    arquivo = models.CharField(max_length=255, blank=True)
+    erro = models.TextField(blank=True)
+
+    criado_por = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        related_name="exportacoes",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True
+    )
+    criado_em = models.DateTimeField(auto_now_add=True)
+    concluido_em = models.DateTimeField(null=True, blank=True)
+
+    # Sinal de vida do PROCESSANDO: atualizado na reserva e a cada bloco lido
+    atualizado_em = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["-criado_em"]
+
+    def __str__(self):
+        return f"{self.get_tipo_display()} #{self.pk} ({self.get_status_display()})"
+
+    @property
+    def progresso(self):
+        if self.status == "CONCLUIDO":
+            return 100
+        if not self.total:
+            return 0
+        return min(99, self.processados * 100 // self.total)
+
+    @property
+    def nome_download(self):
+        extensao = "xlsx" if self.tipo == "EXCEL" else "pdf"
+        return f"fluxo_caixa_{self.pk}.{extensao}"
+
+    # -----------------------------------------------
+    # Reserva atômica: só um worker processa cada job
+    # -----------------------------------------------
+    @classmethod
+    def reservar(cls, pk):
+        return cls.objects.filter(pk=pk, status="PENDENTE").update(
+            status="PROCESSANDO",
+            atualizado_em=timezone.now()
+        ) == 1
+
+
+# ==================================================
+# LEMBRETES (caixa de saída do WhatsApp)
+# ==================================================
+class LembreteQuerySet(models.QuerySet):
+
+    def pendentes(self, tipo, hoje=None):
+        """Lembretes a enviar de hoje em diante; some quando a mensalidade é quitada."""
+        hoje = hoje or timezone.now().date()
+
+        return (
+            self.filter(tipo=tipo, status="PENDENTE", data__gte=hoje, aluno__ativo=True)
+            .filter(Q(mensalidade__isnull=True) | Q(mensalidade__valor__gt=F("mensalidade__total_pago")))
+            .select_related("aluno", "mensalidade")
+            .order_by("data", "aluno__nome", "id")
+        )
+
+
+class Lembrete(models.Model):
+    """
+    Mensagem de WhatsApp já montada (texto e link), gerada uma vez por dia
+    pelo comando build_lembretes. Os painéis só leem e paginam esta tabela.
+    """
+
+    TIPOS = (
+        ("VENCIMENTO", "Vencimento"),
+        ("ANIVERSARIO", "Aniversário"),
+    )
+
+    STATUS = (
+        ("PENDENTE", "Pendente"),
+        ("ENVIADO", "Enviado"),
+    )
+
+    tipo = models.CharField(max_length=20, choices=TIPOS)
+
+    aluno = models.ForeignKey(
+        Aluno,
+        related_name="lembretes",
+        on_delete=models.CASCADE
+    )
+
+    mensalidade = models.ForeignKey(
+        Mensalidade,
+        related_name="lembretes",
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True
+    )
+
+    # Dia do vencimento ou do aniversário
+    data = models.DateField()
+
+    destinatario = models.CharField(max_length=20, blank=True)
+    mensagem = models.TextField()
+    link = models.TextField(blank=True)
+
+    status = models.CharField(max_length=20, choices=STATUS, default="PENDENTE")
+    criado_em = models.DateTimeField(auto_now_add=True)
+    enviado_em = models.DateTimeField(null=True, blank=True)
+
+    enviado_por = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        related_name="lembretes_enviados",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True
+    )
+
+    objects = LembreteQuerySet.as_manager()
+
+    class Meta:
+        ordering = ["data", "id"]
+        indexes = [
+            models.Index(fields=["tipo", "status", "data"], name="lembrete_tipo_status_data_idx"),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=["tipo", "aluno", "data"], name="lembrete_tipo_aluno_data_unico"),
+        ]
+
+    def __str__(self):
+        return f"{self.get_tipo_display()}: {self.aluno.nome} ({self.data:%d/%m})"
@@ -0,0 +1,51 @@
+import base64
+import json
+
+from django.db.models import Q
+
+
+# ==================================================
+# PAGINAÇÃO POR CURSOR (KEYSET) EM (nome, id)
+# ==================================================
+TAMANHO_PAGINA = 50
+
+
+def codificar_cursor(nome, pk):
+    bruto = json.dumps([nome, pk]).encode()
+    return base64.urlsafe_b64encode(bruto).decode().rstrip("=")
+
+
+def decodificar_cursor(cursor):
+    if not cursor:
+        return None
+
+    try:
+        bruto = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        nome, pk = json.loads(bruto)
+        return str(nome), int(pk)
+    except (ValueError, TypeError):
+        return None
+
+
+def paginar_por_nome(queryset, cursor=None, tamanho=TAMANHO_PAGINA):
+    """
+    Devolve (itens, proximo_cursor) ordenando por (nome, id).
+
+    O cursor só guarda a última chave vista, então continua válido
+    mesmo que a busca mude ou alunos sejam incluídos no meio.
+    """
+    queryset = queryset.order_by("nome", "id")
+
+    chave = decodificar_cursor(cursor)
+    if chave:
+        nome, pk = chave
+        queryset = queryset.filter(Q(nome__gt=nome) | Q(nome=nome, id__gt=pk))
+
+    itens = list(queryset[:tamanho + 1])
+
+    proximo = None
+    if len(itens) > tamanho:
+        itens = itens[:tamanho]
+        proximo = codificar_cursor(itens[-1].nome, itens[-1].id)
+
+    return itens, proximo
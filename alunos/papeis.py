@@ -0,0 +1,71 @@
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+
+# ==================================================
+# PAPÉIS (grupos do usuário) SEM CONSULTA POR REQUEST
+# ==================================================
+#
+# Os nomes dos grupos do usuário são lidos uma vez por request e, com
+# PAPEIS_NA_SESSAO, guardados na sessão junto com uma versão global.
+# Mudar os grupos de alguém (ou renomear/excluir um grupo) troca a
+# versão (ver signals.py) e todas as sessões recarregam na próxima vez.
+
+CHAVE_VERSAO = "papeis:versao"
+CHAVE_SESSAO = "papeis"
+ATRIBUTO_REQUEST = "_grupos_usuario"
+
+
+def versao_papeis():
+    versao = cache.get(CHAVE_VERSAO)
+
+    if versao is None:
+        cache.add(CHAVE_VERSAO, time.time_ns(), timeout=None)
+        versao = cache.get(CHAVE_VERSAO)
+
+    return versao
+
+
+def invalidar_papeis():
+    transaction.on_commit(lambda: cache.set(CHAVE_VERSAO, time.time_ns(), timeout=None))
+
+
+def _carregar_grupos(request):
+    usuario = request.user
+
+    if not usuario.is_authenticated:
+        return frozenset()
+
+    sessao = getattr(request, "session", None) if settings.PAPEIS_NA_SESSAO else None
+    versao = versao_papeis() if sessao is not None else None
+
+    if sessao is not None:
+        salvo = sessao.get(CHAVE_SESSAO)
+
+        if salvo and salvo.get("usuario") == usuario.pk and salvo.get("versao") == versao:
+            return frozenset(salvo["grupos"])
+
+    grupos = frozenset(usuario.groups.values_list("name", flat=True))
+
+    if sessao is not None:
+        sessao[CHAVE_SESSAO] = {"usuario": usuario.pk, "versao": versao, "grupos": sorted(grupos)}
+
+    return grupos
+
+
+def grupos_do_usuario(request):
+    if not hasattr(request, ATRIBUTO_REQUEST):
+        setattr(request, ATRIBUTO_REQUEST, _carregar_grupos(request))
+
+    return getattr(request, ATRIBUTO_REQUEST)
+
+
+def tem_papel(request, *nomes_grupos):
+    if request.user.is_superuser:
+        return True
+
+    return not grupos_do_usuario(request).isdisjoint(nomes_grupos)
+
@@ -0,0 +1,25 @@
+from django.contrib.messages import get_messages
+from django.utils.cache import patch_cache_control
+
+
+# ==================================================
+# PÁGINAS GUARDADAS PELO SERVICE WORKER (templates/pwa/sw.js)
+# ==================================================
+class MensagensSemCacheMiddleware:
+    """
+    Página que exibiu mensagens ("Pagamento registrado!") sai com
+    Cache-Control: no-store. O service worker não guarda essa cópia para
+    o modo offline, senão a mensagem reapareceria a cada abertura.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+
+        # used: o template percorreu as mensagens desta requisição
+        if getattr(get_messages(request), "used", False):
+            patch_cache_control(response, private=True, no_store=True)
+
+        return response
@@ -0,0 +1,103 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
+from django.db.models import F
+from django.db.models.signals import m2m_changed, pre_save, post_save, post_delete
+from django.dispatch import receiver
+
+from .cache import invalidar_painel
+from .papeis import invalidar_papeis
+from .models import Aluno, CaixaDiario, Mensalidade, Pagamento
+
+
+# ==================================================
+# TOTAL PAGO DA MENSALIDADE
+# ==================================================
+def _somar_total_pago(mensalidade_id, delta):
+    if not delta:
+        return
+
+    Mensalidade.objects.filter(pk=mensalidade_id).update(
+        total_pago=F("total_pago") + delta
+    )
+
+
+@receiver(pre_save, sender=Pagamento)
+def guardar_pagamento_original(sender, instance, raw=False, **kwargs):
+    instance._original = None
+
+    if raw or instance.pk is None:
+        return
+
+    instance._original = (
+        Pagamento.objects
+        .filter(pk=instance.pk)
+        .values("mensalidade_id", "valor", "data_pagamento", "forma")
+        .first()
+    )
+
+
+@receiver(post_save, sender=Pagamento)
+def atualizar_total_pago_ao_salvar(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+
+    original = getattr(instance, "_original", None)
+
+    if original:
+        _somar_total_pago(original["mensalidade_id"], -original["valor"])
+
+    _somar_total_pago(instance.mensalidade_id, instance.valor)
+
+
+@receiver(post_delete, sender=Pagamento)
+def atualizar_total_pago_ao_excluir(sender, instance, **kwargs):
+    _somar_total_pago(instance.mensalidade_id, -instance.valor)
+
+
+# ==================================================
+# CAIXA DIÁRIO
+# ==================================================
+@receiver(post_save, sender=Pagamento)
+def atualizar_caixa_ao_salvar(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+
+    original = getattr(instance, "_original", None)
+
+    if original:
+        CaixaDiario.somar(original["data_pagamento"], original["forma"], -1, -original["valor"])
+
+    CaixaDiario.somar(instance.data_pagamento, instance.forma, 1, instance.valor)
+
+
+@receiver(post_delete, sender=Pagamento)
+def atualizar_caixa_ao_excluir(sender, instance, **kwargs):
+    CaixaDiario.somar(instance.data_pagamento, instance.forma, -1, -instance.valor)
+
+
+# ==================================================
+# CACHE DO PAINEL
+# ==================================================
+@receiver(post_save, sender=Aluno)
+@receiver(post_delete, sender=Aluno)
+@receiver(post_save, sender=Mensalidade)
+@receiver(post_delete, sender=Mensalidade)
+@receiver(post_save, sender=Pagamento)
+@receiver(post_delete, sender=Pagamento)
+def invalidar_cache_painel(sender, **kwargs):
+    invalidar_painel()
+
+
+# ==================================================
+# PAPÉIS EM CACHE NA SESSÃO
+# ==================================================
+@receiver(m2m_changed, sender=get_user_model().groups.through)
+def invalidar_papeis_ao_mudar_grupos(sender, action, **kwargs):
+    if action in ("post_add", "post_remove", "post_clear"):
+        invalidar_papeis()
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def invalidar_papeis_ao_mudar_grupo(sender, **kwargs):
+    invalidar_papeis()
@@ -0,0 +1,170 @@
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.utils import timezone
+
+from .exportacao import filtrar_pagamentos, gerar_excel, gerar_pdf, ler_filtros
+from .models import ExportJob
+
+logger = logging.getLogger(__name__)
+
+
+# ==================================================
+# EXPORTAÇÕES EM SEGUNDO PLANO
+# ==================================================
+#
+# Sem broker: o job fica na tabela ExportJob e é executado por uma
+# thread do próprio processo web (EXPORT_THREADS) ou pelo comando
+# run_export_worker. ExportJob.reservar() impede execução em dobro.
+#
+# A fila das threads fica na memória: se o worker do gunicorn reinicia,
+# recuperar_exportacoes_travadas() devolve à fila os PENDENTE perdidos e
+# marca como ERRO os PROCESSANDO sem sinal de vida há EXPORT_TIMEOUT.
+
+# PENDENTE fora da fila deste processo há mais que isso é considerado perdido
+ESPERA_NA_FILA = timedelta(minutes=1)
+
+_executor = None
+_na_fila = set()
+_trava_fila = threading.Lock()
+
+
+def _pool():
+    global _executor
+
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.EXPORT_THREADS,
+            thread_name_prefix="exportacao"
+        )
+
+    return _executor
+
+
+def _enfileirar(pk):
+    with _trava_fila:
+        if pk in _na_fila:
+            return
+        _na_fila.add(pk)
+
+    _pool().submit(_executar_em_thread, pk)
+
+
+def agendar_exportacao(job):
+    limpar_exportacoes_antigas()
+    recuperar_exportacoes_travadas()
+
+    if settings.EXPORT_THREADS:
+        _enfileirar(job.pk)
+
+
+def _executar_em_thread(pk):
+    try:
+        executar_exportacao(pk)
+    finally:
+        with _trava_fila:
+            _na_fila.discard(pk)
+        close_old_connections()
+
+
+def recuperar_exportacoes_travadas(jobs=None):
+    """
+    Marca como ERRO os jobs PROCESSANDO sem progresso há EXPORT_TIMEOUT
+    segundos (o processo que os rodava morreu) e, com EXPORT_THREADS,
+    põe na fila deste processo os PENDENTE que ficaram sem ninguém.
+    jobs: restringe a varredura (ex.: só o job consultado pela tela).
+    """
+    jobs = ExportJob.objects.all() if jobs is None else jobs
+    agora = timezone.now()
+
+    travados = jobs.filter(
+        status="PROCESSANDO",
+        atualizado_em__lt=agora - timedelta(seconds=settings.EXPORT_TIMEOUT)
+    ).update(
+        status="ERRO",
+        erro="A exportação foi interrompida. Tente de novo.",
+        concluido_em=agora
+    )
+
+    if travados:
+        logger.warning("%s exportação(ões) interrompida(s) marcada(s) como erro", travados)
+
+    if settings.EXPORT_THREADS:
+        perdidos = jobs.filter(status="PENDENTE", criado_em__lt=agora - ESPERA_NA_FILA)
+
+        for pk in perdidos.values_list("pk", flat=True):
+            _enfileirar(pk)
+
+    return travados
+
+
+def caminho_arquivo(job):
+    return os.path.join(settings.EXPORT_ROOT, job.nome_download)
+
+
+def executar_exportacao(pk):
+    if not ExportJob.reservar(pk):
+        return False
+
+    temporario = None
+
+    def progresso(lidas):
+        ExportJob.objects.filter(pk=pk).update(processados=lidas, atualizado_em=timezone.now())
+
+    # Tudo depois da reserva fica no try: uma falha aqui não pode deixar o
+    # job em PROCESSANDO com a tela consultando para sempre
+    try:
+        job = ExportJob.objects.get(pk=pk)
+        os.makedirs(settings.EXPORT_ROOT, exist_ok=True)
+
+        filtros = ler_filtros(job.filtros)
+        pagamentos = filtrar_pagamentos(filtros)
+
+        ExportJob.objects.filter(pk=pk).update(total=pagamentos.count())
+
+        destino = caminho_arquivo(job)
+        temporario = f"{destino}.parcial"
+
+        with open(temporario, "wb") as arquivo:
+            if job.tipo == "EXCEL":
+                gerar_excel(pagamentos, arquivo, progresso=progresso)
+            else:
+                gerar_pdf(pagamentos, arquivo, filtros, progresso=progresso)
+
+        os.replace(temporario, destino)
+    except Exception as erro:
+        logger.exception("Falha na exportação %s", pk)
+
+        if temporario and os.path.exists(temporario):
+            os.remove(temporario)
+
+        ExportJob.objects.filter(pk=pk).update(
+            status="ERRO",
+            erro=str(erro),
+            concluido_em=timezone.now()
+        )
+        return False
+
+    ExportJob.objects.filter(pk=pk).update(
+        status="CONCLUIDO",
+        arquivo=destino,
+        concluido_em=timezone.now()
+    )
+    return True
+
+
+def limpar_exportacoes_antigas(dias=None):
+    dias = settings.EXPORT_RETENCAO_DIAS if dias is None else dias
+    antigos = ExportJob.objects.filter(criado_em__lt=timezone.now() - timedelta(days=dias))
+
+    for arquivo in antigos.exclude(arquivo="").values_list("arquivo", flat=True):
+        if os.path.exists(arquivo):
+            os.remove(arquivo)
+
+    removidos, _ = antigos.delete()
+    return removidos
@@ -0,0 +1,63 @@
+import re
+
+
+# ==================================================
+# TELEFONE NORMALIZADO (E.164)
+# ==================================================
+#
+# Aluno.telefone continua como a recepção digitou; Aluno.telefone_e164
+# guarda "+5581999998888", indexado, para os links do WhatsApp e para
+# achar o aluno pelo número que chega do WhatsApp.
+
+CODIGO_BRASIL = "55"
+
+
+def normalizar_telefone(valor):
+    """
+    "(81) 99999-8888" -> "+5581999998888". Sem "+", números de 10 ou 11
+    dígitos (DDD + número) ganham o 55. Devolve "" se não der para
+    interpretar.
+    """
+    if not valor:
+        return ""
+
+    valor = str(valor).strip()
+    digitos = re.sub(r"\D", "", valor)
+
+    # "+1 555 ..." já vem com o código do país
+    if valor.startswith("+"):
+        return f"+{digitos}" if 8 <= len(digitos) <= 15 else ""
+
+    # Prefixo de longa distância ("0 81 ...")
+    digitos = digitos.lstrip("0")
+
+    if len(digitos) in (10, 11):
+        digitos = CODIGO_BRASIL + digitos
+
+    if digitos.startswith(CODIGO_BRASIL) and len(digitos) in (12, 13):
+        return f"+{digitos}"
+
+    return ""
+
+
+def variantes_telefone(valor):
+    """
+    Formas E.164 equivalentes de um celular brasileiro: com e sem o nono
+    dígito (o WhatsApp às vezes envia contas antigas sem ele).
+    """
+    numero = normalizar_telefone(valor)
+
+    if not numero:
+        return []
+
+    variantes = [numero]
+
+    if numero.startswith(f"+{CODIGO_BRASIL}"):
+        ddd, local = numero[3:5], numero[5:]
+
+        if len(local) == 9 and local[0] == "9":
+            variantes.append(f"+{CODIGO_BRASIL}{ddd}{local[1:]}")
+        elif len(local) == 8 and local[0] in "6789":
+            variantes.append(f"+{CODIGO_BRASIL}{ddd}9{local}")
+
+    return variantes
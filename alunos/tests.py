@@ -0,0 +1,948 @@
+import json
+import re
+import tempfile
+from io import BytesIO, StringIO
+from datetime import date, timedelta
+from decimal import Decimal
+from unittest import mock, skipUnless
+
+from django.contrib import messages
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
+from django.contrib.messages.middleware import MessageMiddleware
+from django.contrib.sessions.middleware import SessionMiddleware
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from openpyxl import Workbook
+
+from alunos import views
+from alunos.forms import PagamentoLoteFormSet
+from alunos.importacao import ErroImportacao, importar_planilha
+from alunos.lembretes import garantir_lembretes, gerar_lembretes
+from alunos.metricas import metricas
+from alunos.models import Aluno, CaixaDiario, ExportJob, Lembrete, Mensalidade, Pagamento
+from alunos.paginacao import codificar_cursor
+from alunos.papeis import grupos_do_usuario
+from alunos.pwa import MensagensSemCacheMiddleware
+from alunos.tarefas import agendar_exportacao, executar_exportacao, recuperar_exportacoes_travadas
+
+
+# Mede as consultas reais, sem o cache do painel
+SEM_CACHE = {"default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}}
+
+# Cache em memória, limpo a cada teste (versão dos dados, chaves de controle)
+CACHE_LOCAL = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "testes"}}
+
+# Os templates renderizam sem precisar do manifesto do collectstatic
+SEM_MANIFESTO = {
+    "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
+}
+
+
+def criar_aluno_com_historico(anos, nome=None):
+    aluno = Aluno.objects.create(
+        nome=nome or f"Aluno {anos} ano(s)",
+        responsavel="Responsável",
+        telefone="11999998888",
+        valor_mensalidade=Decimal("150.00"),
+    )
+
+    ano_inicial = date.today().year - anos + 1
+
+    mensalidades = Mensalidade.objects.bulk_create([
+        Mensalidade(
+            aluno=aluno,
+            valor=aluno.valor_mensalidade,
+            vencimento=date(ano, mes, aluno.dia_vencimento),
+            total_pago=aluno.valor_mensalidade,
+        )
+        for ano in range(ano_inicial, ano_inicial + anos)
+        for mes in range(1, 13)
+    ])
+
+    # Duas parcelas por mensalidade para exercitar o loop de recibos
+    Pagamento.objects.bulk_create([
+        Pagamento(
+            mensalidade=mensalidade,
+            valor=aluno.valor_mensalidade / 2,
+            forma=forma,
+            data_pagamento=mensalidade.vencimento,
+        )
+        for mensalidade in mensalidades
+        for forma in ("PIX", "DINHEIRO")
+    ])
+
+    # bulk_create não dispara os sinais que mantêm o caixa diário
+    CaixaDiario.reconstruir(mensalidades[0].vencimento, mensalidades[-1].vencimento)
+
+    return aluno
+
+
+class PaginasTestCase(TestCase):
+    """Chama as views direto, com a sessão dos papéis já aquecida."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = get_user_model().objects.create_superuser("admin_teste", password=None)
+        cls.funcionaria = get_user_model().objects.create_user("funcionaria_teste", password=None)
+
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.sessoes = {}
+
+    def requisicao(self, usuario=None, **parametros):
+        request = self.factory.get("/", parametros)
+        request.user = usuario or self.admin
+
+        # Sessão com os papéis já em cache, como numa navegação normal
+        request.session = self.sessoes.setdefault(request.user.pk, {})
+        grupos_do_usuario(request)
+
+        return request
+
+
+# ==================================================
+# SALDO DA MENSALIDADE (total_pago)
+# ==================================================
+class TotalPagoTests(TestCase):
+    """total_pago acompanha os pagamentos em toda gravação e exclusão."""
+
+    def setUp(self):
+        self.aluno = Aluno.objects.create(nome="Aluno Teste", responsavel="Responsável")
+        self.janeiro = Mensalidade.objects.create(aluno=self.aluno, valor=Decimal("150.00"), vencimento=date(2026, 1, 10))
+        self.fevereiro = Mensalidade.objects.create(aluno=self.aluno, valor=Decimal("150.00"), vencimento=date(2026, 2, 10))
+
+    def total_pago(self, mensalidade):
+        mensalidade.refresh_from_db(fields=["total_pago"])
+        return mensalidade.total_pago
+
+    def test_criar_e_editar_pagamento(self):
+        pagamento = Pagamento.objects.create(mensalidade=self.janeiro, valor=Decimal("50.00"), forma="PIX")
+        Pagamento.objects.create(mensalidade=self.janeiro, valor=Decimal("30.00"), forma="DINHEIRO")
+        self.assertEqual(self.total_pago(self.janeiro), Decimal("80.00"))
+
+        pagamento.valor = Decimal("120.00")
+        pagamento.save()
+        self.assertEqual(self.total_pago(self.janeiro), Decimal("150.00"))
+        self.assertFalse(Mensalidade.objects.em_aberto().filter(pk=self.janeiro.pk).exists())
+
+    def test_mover_pagamento_para_outra_mensalidade(self):
+        pagamento = Pagamento.objects.create(mensalidade=self.janeiro, valor=Decimal("150.00"), forma="PIX")
+
+        pagamento.mensalidade = self.fevereiro
+        pagamento.save()
+
+        self.assertEqual(self.total_pago(self.janeiro), Decimal("0.00"))
+        self.assertEqual(self.total_pago(self.fevereiro), Decimal("150.00"))
+
+    def test_excluir_pagamento(self):
+        pagamento = Pagamento.objects.create(mensalidade=self.janeiro, valor=Decimal("150.00"), forma="PIX")
+        Pagamento.objects.create(mensalidade=self.janeiro, valor=Decimal("20.00"), forma="PIX")
+
+        pagamento.delete()
+
+        self.assertEqual(self.total_pago(self.janeiro), Decimal("20.00"))
+
+    def test_exclusao_em_cascata(self):
+        Pagamento.objects.create(mensalidade=self.janeiro, valor=Decimal("150.00"), forma="PIX")
+        Pagamento.objects.create(mensalidade=self.fevereiro, valor=Decimal("40.00"), forma="PIX")
+
+        # Os sinais dos pagamentos apagados em cascata não podem falhar nem
+        # mexer nas mensalidades que ficaram
+        self.janeiro.delete()
+
+        self.assertFalse(Pagamento.objects.filter(mensalidade_id=self.janeiro.pk).exists())
+        self.assertEqual(self.total_pago(self.fevereiro), Decimal("40.00"))
+
+        self.aluno.delete()
+        self.assertFalse(Pagamento.objects.exists())
+
+    def test_reconciliar_saldos(self):
+        Pagamento.objects.create(mensalidade=self.janeiro, valor=Decimal("150.00"), forma="PIX")
+        Mensalidade.objects.filter(pk=self.janeiro.pk).update(total_pago=Decimal("10.00"))
+
+        saida = StringIO()
+        with self.assertRaises(CommandError):
+            call_command("reconciliar_saldos", stdout=saida)
+        self.assertIn(f"Mensalidade {self.janeiro.pk}", saida.getvalue())
+        self.assertEqual(self.total_pago(self.janeiro), Decimal("10.00"))
+
+        call_command("reconciliar_saldos", "--corrigir", stdout=StringIO())
+        self.assertEqual(self.total_pago(self.janeiro), Decimal("150.00"))
+
+
+# ==================================================
+# ANIVERSARIANTES
+# ==================================================
+class AniversariantesTests(TestCase):
+
+    def criar(self, nome, nascimento, **campos):
+        return Aluno.objects.create(nome=nome, responsavel="Responsável", data_nascimento=nascimento, **campos)
+
+    def aniversariantes(self, hoje, dias=7):
+        return [(a.nome, a.dias_para_aniversario) for a in Aluno.objects.aniversariantes(dias=dias, hoje=hoje)]
+
+    def test_virada_do_ano(self):
+        self.criar("Janeiro 2", date(2015, 1, 2))
+        self.criar("Dezembro 31", date(2014, 12, 31))
+        self.criar("Dezembro 30", date(2016, 12, 30))
+        self.criar("Janeiro 10", date(2015, 1, 10))
+        self.criar("Dezembro 28", date(2015, 12, 28))
+
+        self.assertEqual(
+            self.aniversariantes(date(2026, 12, 29)),
+            [("Dezembro 30", 1), ("Dezembro 31", 2), ("Janeiro 2", 4)],
+        )
+
+    def test_29_de_fevereiro_em_ano_nao_bissexto(self):
+        self.criar("Bissexto", date(2016, 2, 29))
+
+        # 2026 não é bissexto: comemora em 28/02
+        self.assertEqual(self.aniversariantes(date(2026, 2, 25)), [("Bissexto", 3)])
+
+        # e_aniversario reaproveita a anotação do queryset
+        aluno = Aluno.objects.com_aniversario_hoje(date(2026, 2, 28)).get()
+        self.assertTrue(aluno.e_aniversario)
+        self.assertFalse(Aluno.objects.com_aniversario_hoje(date(2026, 3, 1)).get().aniversario_hoje)
+
+    def test_29_de_fevereiro_em_ano_bissexto(self):
+        self.criar("Bissexto", date(2016, 2, 29))
+        self.criar("Fevereiro 28", date(2017, 2, 28))
+
+        self.assertEqual(
+            self.aniversariantes(date(2028, 2, 27), dias=3),
+            [("Fevereiro 28", 1), ("Bissexto", 2)],
+        )
+        self.assertFalse(Aluno.objects.com_aniversario_hoje(date(2028, 2, 28)).get(nome="Bissexto").aniversario_hoje)
+
+    def test_inativos_e_sem_data_ficam_de_fora_do_painel(self):
+        hoje = date(2026, 6, 10)
+        self.criar("Ativo", date(2015, 6, 11))
+        self.criar("Inativo", date(2015, 6, 11), ativo=False)
+        self.criar("Sem data", None)
+
+        self.assertEqual(
+            [a.nome for a in Aluno.objects.filter(ativo=True).aniversariantes(hoje=hoje)],
+            ["Ativo"],
+        )
+
+    def test_chave_acompanha_a_data_de_nascimento(self):
+        aluno = self.criar("Aluno", date(2015, 3, 5))
+        self.assertEqual(aluno.aniversario, 305)
+
+        aluno.data_nascimento = None
+        aluno.save()
+        aluno.refresh_from_db()
+        self.assertIsNone(aluno.aniversario)
+
+
+# ==================================================
+# CAIXA DIÁRIO
+# ==================================================
+class CaixaDiarioTests(TestCase):
+    """O resumo por dia e forma acompanha os pagamentos e pode ser recalculado."""
+
+    def setUp(self):
+        aluno = Aluno.objects.create(nome="Aluno Teste", responsavel="Responsável")
+        self.mensalidade = Mensalidade.objects.create(aluno=aluno, valor=Decimal("500.00"), vencimento=date(2026, 3, 10))
+
+    def pagar(self, valor, forma="PIX", data=date(2026, 3, 5)):
+        return Pagamento.objects.create(mensalidade=self.mensalidade, valor=Decimal(valor), forma=forma, data_pagamento=data)
+
+    def caixa(self):
+        return {
+            (linha.data, linha.forma): (linha.quantidade, linha.total)
+            for linha in CaixaDiario.objects.all()
+            if linha.quantidade
+        }
+
+    def test_gravacoes_e_exclusoes(self):
+        pagamento = self.pagar("100.00")
+        self.pagar("50.00")
+        self.pagar("20.00", forma="DINHEIRO")
+
+        self.assertEqual(self.caixa(), {
+            (date(2026, 3, 5), "PIX"): (2, Decimal("150.00")),
+            (date(2026, 3, 5), "DINHEIRO"): (1, Decimal("20.00")),
+        })
+
+        # Mudar valor, dia e forma tira da linha antiga e soma na nova
+        pagamento.valor = Decimal("80.00")
+        pagamento.forma = "CARTAO"
+        pagamento.data_pagamento = date(2026, 3, 6)
+        pagamento.save()
+
+        self.assertEqual(self.caixa(), {
+            (date(2026, 3, 5), "PIX"): (1, Decimal("50.00")),
+            (date(2026, 3, 5), "DINHEIRO"): (1, Decimal("20.00")),
+            (date(2026, 3, 6), "CARTAO"): (1, Decimal("80.00")),
+        })
+
+        pagamento.delete()
+        self.mensalidade.delete()
+
+        self.assertEqual(self.caixa(), {})
+
+    def test_resumo_financeiro(self):
+        self.pagar("100.00", data=date(2026, 1, 15))
+        self.pagar("40.00", data=date(2026, 3, 5))
+        self.pagar("10.00", forma="DINHEIRO", data=date(2026, 3, 5))
+        self.pagar("999.00", data=date(2025, 12, 31))
+
+        resumo = CaixaDiario.objects.resumo_financeiro(date(2026, 3, 5))
+
+        self.assertEqual(resumo["total_hoje"], Decimal("50.00"))
+        self.assertEqual(resumo["total_mes"], Decimal("50.00"))
+        self.assertEqual(resumo["total_ano"], Decimal("150.00"))
+        self.assertEqual(resumo["meses"][0], Decimal("100.00"))
+
+    def test_reconstruir_so_o_periodo(self):
+        self.pagar("100.00", data=date(2026, 3, 5))
+        self.pagar("70.00", data=date(2026, 4, 5))
+
+        CaixaDiario.objects.update(quantidade=9, total=Decimal("1.00"))
+        CaixaDiario.reconstruir(date(2026, 3, 1), date(2026, 3, 31))
+
+        self.assertEqual(self.caixa(), {
+            (date(2026, 3, 5), "PIX"): (1, Decimal("100.00")),
+            (date(2026, 4, 5), "PIX"): (9, Decimal("1.00")),
+        })
+
+        call_command("rebuild_caixa", stdout=StringIO())
+
+        self.assertEqual(self.caixa(), {
+            (date(2026, 3, 5), "PIX"): (1, Decimal("100.00")),
+            (date(2026, 4, 5), "PIX"): (1, Decimal("70.00")),
+        })
+
+    def test_rebuild_caixa_recusa_periodo_invertido(self):
+        with self.assertRaises(CommandError):
+            call_command("rebuild_caixa", "--inicio", "2026-04-01", "--fim", "2026-03-01", stdout=StringIO())
+
+
+# ==================================================
+# CSV PARA A CONTABILIDADE
+# ==================================================
+@override_settings(CACHES=CACHE_LOCAL, METRICAS_ATIVAS=False)
+class ExportarCaixaCsvTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.funcionaria = get_user_model().objects.create_user("funcionaria_teste", password=None)
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.funcionaria)
+
+        self.aluno = Aluno.objects.create(nome="Ana Teste", responsavel="Maria")
+        mensalidade = Mensalidade.objects.create(aluno=self.aluno, valor=Decimal("1500.00"), vencimento=date(2026, 3, 10))
+
+        for valor, dia in (("1234.50", 5), ("265.50", 20)):
+            Pagamento.objects.create(mensalidade=mensalidade, valor=Decimal(valor), forma="PIX", data_pagamento=date(2026, 3, dia))
+
+        self.url = reverse("exportar_caixa_csv")
+        self.periodo = {"since": "2026-03-01", "until": "2026-03-10"}
+
+    def baixar(self, **cabecalhos):
+        response = self.client.get(self.url, self.periodo, **cabecalhos)
+        corpo = b"".join(response.streaming_content).decode() if response.streaming else ""
+        return response, corpo
+
+    def test_conteudo_do_periodo(self):
+        response, corpo = self.baixar()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            corpo.splitlines(),
+            ["\ufeffData;Aluno;Responsável;Forma;Valor;Mensalidade", "05/03/2026;Ana Teste;Maria;PIX;1234,50;03/2026"],
+        )
+
+    def test_etag_sem_mudanca_responde_304_sem_ler_pagamentos(self):
+        response, _ = self.baixar()
+        etag = response["ETag"]
+
+        with CaptureQueriesContext(connection) as consultas:
+            response, corpo = self.baixar(HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(corpo, "")
+        self.assertFalse([c for c in consultas if '"alunos_pagamento"' in c["sql"]])
+
+    def test_etag_muda_depois_de_uma_edicao(self):
+        response, _ = self.baixar()
+        etag = response["ETag"]
+
+        # Mudança que não altera os totais do caixa: vale a versão dos dados
+        with self.captureOnCommitCallbacks(execute=True):
+            self.aluno.nome = "Ana Souza"
+            self.aluno.save()
+
+        response, corpo = self.baixar(HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+        self.assertIn("Ana Souza", corpo)
+
+
+# ==================================================
+# IMPORTAÇÃO DE ALUNOS
+# ==================================================
+class ImportacaoTests(TestCase):
+
+    def importar_csv(self, texto, encoding="utf-8", relatorio=None):
+        return importar_planilha(BytesIO(texto.encode(encoding)), "alunos.csv", relatorio)
+
+    def test_csv_com_ponto_e_virgula_e_decimal_brasileiro(self):
+        resultado = self.importar_csv(
+            "Nome do aluno;Responsável;Valor da mensalidade;Dia de vencimento\n"
+            "Ana Souza;Maria Souza;1.234,50;5\n"
+        )
+
+        self.assertEqual(resultado["importados"], 1)
+        aluno = Aluno.objects.get()
+        self.assertEqual(aluno.valor_mensalidade, Decimal("1234.50"))
+        self.assertEqual(aluno.dia_vencimento, 5)
+
+    def test_csv_salvo_pelo_excel_em_cp1252(self):
+        resultado = self.importar_csv(
+            "Nome,Responsável,Valor,Vencimento,Observações\n"
+            "João Conceição,Inês Araújo,150,10,Alérgico a amendoim\n",
+            encoding="cp1252"
+        )
+
+        self.assertEqual(resultado["importados"], 1)
+        aluno = Aluno.objects.get()
+        self.assertEqual((aluno.nome, aluno.responsavel), ("João Conceição", "Inês Araújo"))
+        self.assertEqual(aluno.observacoes, "Alérgico a amendoim")
+
+    def test_xlsx(self):
+        planilha = Workbook()
+        planilha.active.append(["Nome", "Responsável", "Valor", "Vencimento", "Nascimento", "Ativo"])
+        planilha.active.append(["Ana Souza", "Maria Souza", 180.5, 10, date(2018, 2, 3), "Não"])
+        arquivo = BytesIO()
+        planilha.save(arquivo)
+        arquivo.seek(0)
+
+        resultado = importar_planilha(arquivo, "alunos.xlsx")
+
+        self.assertEqual(resultado["importados"], 1)
+        aluno = Aluno.objects.get()
+        self.assertEqual(aluno.valor_mensalidade, Decimal("180.50"))
+        self.assertEqual(aluno.data_nascimento, date(2018, 2, 3))
+        self.assertFalse(aluno.ativo)
+
+    def test_relatorio_lista_as_linhas_recusadas(self):
+        Aluno.objects.create(nome="Ana Souza", responsavel="Maria Souza")
+        relatorio = StringIO()
+
+        resultado = self.importar_csv(
+            "Nome;Responsável;Valor;Vencimento;Ativo\n"
+            "Bruno Lima;Carla Lima;150;10;sim\n"
+            ";Sem Nome;150;10;sim\n"
+            "ana souza;MARIA SOUZA;150;10;\n"
+            "Davi Reis;Elisa Reis;150;10;talvez\n",
+            relatorio=relatorio
+        )
+
+        self.assertEqual((resultado["importados"], resultado["com_erro"]), (1, 3))
+        self.assertEqual([numero for numero, _ in resultado["amostra"]], [3, 4, 5])
+
+        linhas = relatorio.getvalue().lstrip("\ufeff").splitlines()
+        self.assertEqual(linhas[0], "Linha;Erros;Nome;Responsável;Valor;Vencimento;Ativo")
+        self.assertEqual([linha.split(";")[0] for linha in linhas[1:]], ["3", "4", "5"])
+        self.assertIn("Use Sim ou Não.", linhas[3])
+        self.assertTrue(linhas[3].endswith(";Davi Reis;Elisa Reis;150;10;talvez"))
+
+    def test_colunas_obrigatorias(self):
+        with self.assertRaisesMessage(ErroImportacao, "responsavel"):
+            self.importar_csv("Nome;Telefone\nAna Souza;11999998888\n")
+
+    def test_xlsx_corrompido(self):
+        for conteudo in (b"nao e uma planilha", BytesIO().getvalue()):
+            with self.subTest(conteudo=conteudo):
+                with self.assertRaises(ErroImportacao):
+                    importar_planilha(BytesIO(conteudo), "alunos.xlsx")
+
+    def test_xlsx_corrompido_na_tela_vira_mensagem(self):
+        admin = get_user_model().objects.create_superuser("admin_teste", password=None)
+        self.client.force_login(admin)
+
+        with tempfile.TemporaryDirectory() as pasta, override_settings(EXPORT_ROOT=pasta, STORAGES=SEM_MANIFESTO):
+            response = self.client.post(reverse("importar_alunos"), {
+                "arquivo": SimpleUploadedFile("alunos.xlsx", b"nao e uma planilha"),
+            })
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [m.level for m in response.context["messages"]],
+            [messages.ERROR]
+        )
+
+
+# ==================================================
+# NÚMERO DE CONSULTAS POR PÁGINA
+# ==================================================
+# Lembretes são gerados à parte (build_lembretes), fora da contagem
+@override_settings(CACHES=SEM_CACHE, STORAGES=SEM_MANIFESTO, LEMBRETES_AUTOMATICOS=False)
+class ConsultasPorPaginaTests(PaginasTestCase):
+    """As páginas críticas fazem o mesmo número de consultas com qualquer histórico."""
+
+    # Máximo de consultas SQL permitido por página
+    ORCAMENTO = 3
+
+    def assertOrcamento(self, view, *args, usuario=None):
+        request = self.requisicao(usuario)
+
+        with self.assertNumQueries(self.ORCAMENTO):
+            response = view(request, *args)
+
+        self.assertEqual(response.status_code, 200)
+
+    def test_aluno_detalhe(self):
+        for anos in (1, 10):
+            with self.subTest(anos=anos):
+                aluno = criar_aluno_com_historico(anos)
+                self.assertOrcamento(views.aluno_detalhe, aluno.id)
+
+    def test_relatorio_caixa(self):
+        for novos_alunos in (0, 20):
+            for i in range(novos_alunos):
+                criar_aluno_com_historico(10, nome=f"Aluno extra {i:02d}")
+
+            for usuario in (self.admin, self.funcionaria):
+                with self.subTest(alunos_extras=novos_alunos, usuario=usuario.username):
+                    self.assertOrcamento(views.relatorio_caixa, usuario=usuario)
+
+
+# ==================================================
+# ÍNDICES DAS CONSULTAS CRÍTICAS
+# ==================================================
+# "SCAN tabela" sem "USING ..." é leitura completa da tabela
+VARREDURA_COMPLETA = re.compile(r"\bSCAN (\w+)$", re.MULTILINE)
+
+ORDENACAO_TEMPORARIA = "USE TEMP B-TREE FOR ORDER BY"
+
+
+@skipUnless(connection.vendor == "sqlite", "Lê o EXPLAIN QUERY PLAN do SQLite.")
+@override_settings(CACHES=SEM_CACHE, STORAGES=SEM_MANIFESTO, LEMBRETES_AUTOMATICOS=False)
+class IndicesTests(PaginasTestCase):
+    """
+    Roda EXPLAIN QUERY PLAN nas consultas que as próprias views fazem
+    (capturadas na requisição) e falha se alguma ler a tabela inteira,
+    deixar de usar o índice esperado ou ordenar em memória.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.aluno = criar_aluno_com_historico(2, nome="Ana Teste")
+        gerar_lembretes()
+
+    def planos(self, view, *args, usuario=None, **parametros):
+        request = self.requisicao(usuario, **parametros)
+
+        with CaptureQueriesContext(connection) as consultas:
+            response = view(request, *args)
+
+            # No CSV as consultas só rodam ao consumir o corpo
+            if response.streaming:
+                b"".join(response.streaming_content)
+
+        self.assertEqual(response.status_code, 200)
+
+        planos = []
+        with connection.cursor() as cursor:
+            for consulta in consultas:
+                if consulta["sql"].startswith("SELECT"):
+                    cursor.execute(f"EXPLAIN QUERY PLAN {consulta['sql']}")
+                    planos.append((consulta["sql"], "\n".join(linha[-1] for linha in cursor.fetchall())))
+
+        return planos
+
+    def assertUsaIndices(self, view, *args, indices=(), ordena_em_memoria=(), usuario=None, **parametros):
+        """
+        indices: trechos de nomes de índice que precisam aparecer nos planos.
+        ordena_em_memoria: tabelas em que ORDER BY sem índice é aceitável.
+        """
+        planos = self.planos(view, *args, usuario=usuario, **parametros)
+        self.assertTrue(planos)
+
+        for sql, plano in planos:
+            with self.subTest(sql=sql):
+                self.assertIsNone(VARREDURA_COMPLETA.search(plano), f"Leitura completa de tabela:\n{plano}")
+
+                if ORDENACAO_TEMPORARIA in plano:
+                    self.assertTrue(
+                        any(f'FROM "{tabela}"' in sql for tabela in ordena_em_memoria),
+                        f"Ordena em memória em vez de usar o índice:\n{plano}"
+                    )
+
+        todos = "\n".join(plano for _, plano in planos)
+        for indice in indices:
+            self.assertIn(indice, todos)
+
+    def test_lista_alunos(self):
+        self.assertUsaIndices(views.lista_alunos, indices=["aluno_nome_id_idx"])
+
+    def test_lista_alunos_ativos_com_cursor(self):
+        self.assertUsaIndices(
+            views.lista_alunos_pagina,
+            indices=["aluno_nome_id_idx"],
+            ativos="1",
+            cursor=codificar_cursor("M", 1),
+        )
+
+    def test_lista_alunos_busca(self):
+        self.assertUsaIndices(views.lista_alunos, ordena_em_memoria=["alunos_aluno"], q="ana")
+
+    def test_busca_por_telefone(self):
+        self.assertUsaIndices(
+            views.buscar_aluno_por_telefone,
+            indices=["telefone_e164"],
+            ordena_em_memoria=["alunos_aluno"],
+            numero="11999998888",
+        )
+
+    def test_aluno_detalhe(self):
+        self.assertUsaIndices(
+            views.aluno_detalhe,
+            self.aluno.id,
+            # UniqueConstraint (aluno, vencimento) vira índice automático no SQLite
+            indices=["sqlite_autoindex_alunos_mensalidade"],
+            ordena_em_memoria=["alunos_pagamento"],
+        )
+
+    def test_relatorio_caixa(self):
+        self.assertUsaIndices(
+            views.relatorio_caixa,
+            indices=["sqlite_autoindex_alunos_caixadiario", "lembrete_tipo_status_data_idx"],
+        )
+
+    def test_relatorio_caixa_funcionaria(self):
+        self.assertUsaIndices(
+            views.relatorio_caixa,
+            indices=["aluno_nome_id_idx", "lembrete_tipo_status_data_idx"],
+            usuario=self.funcionaria,
+        )
+
+    def test_fechamento_mensal(self):
+        self.assertUsaIndices(views.fechamento_mensal, indices=["pagamento_data_idx"])
+
+    def test_exportar_caixa_csv(self):
+        hoje = date.today()
+
+        self.assertUsaIndices(
+            views.exportar_caixa_csv,
+            indices=["pagamento_data_idx"],
+            inicio=hoje.replace(day=1).isoformat(),
+            fim=hoje.isoformat(),
+        )
+
+
+# ==================================================
+# PARÂMETROS DA QUERY STRING
+# ==================================================
+class ParametrosTests(PaginasTestCase):
+    """Valores fora da faixa na URL caem no padrão em vez de dar erro 500."""
+
+    def test_buscar_alunos_json_limite_fora_da_faixa(self):
+        for nome in ("Ana Um", "Ana Dois"):
+            Aluno.objects.create(nome=nome, responsavel="Responsável")
+
+        for limite, esperado in (("-1", 1), ("0", 1), ("999", 2)):
+            with self.subTest(limite=limite):
+                response = views.buscar_alunos_json(self.requisicao(q="ana", limite=limite))
+
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(len(json.loads(response.content)["resultados"]), esperado)
+
+    def test_gerar_mensalidades_ano_fora_da_janela(self):
+        aluno = Aluno.objects.create(
+            nome="Aluno Teste",
+            responsavel="Responsável",
+            valor_mensalidade=Decimal("150.00"),
+        )
+        self.client.force_login(self.admin)
+        url = reverse("gerar_mensalidades_ano", args=[aluno.id])
+
+        for ano in ("0", "99999", "abc"):
+            with self.subTest(ano=ano):
+                response = self.client.get(url, {"ano": ano})
+
+                self.assertRedirects(response, reverse("aluno_detalhe", args=[aluno.id]), fetch_redirect_response=False)
+                self.assertFalse(aluno.mensalidades.exclude(vencimento__year=date.today().year).exists())
+
+        self.assertEqual(aluno.mensalidades.count(), 12)
+
+    @override_settings(STORAGES=SEM_MANIFESTO)
+    def test_criar_mensalidade_com_vencimento_repetido(self):
+        aluno = Aluno.objects.create(
+            nome="Aluno Teste",
+            responsavel="Responsável",
+            valor_mensalidade=Decimal("150.00"),
+        )
+        Mensalidade.objects.create(aluno=aluno, valor=Decimal("150.00"), vencimento=date(2026, 3, 10))
+        self.client.force_login(self.admin)
+
+        response = self.client.post(
+            reverse("criar_mensalidade", args=[aluno.id]),
+            {"valor": "150,00", "vencimento": "2026-03-10"},
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("vencimento", response.context["form"].errors)
+        self.assertEqual(aluno.mensalidades.count(), 1)
+
+
+# ==================================================
+# PAGAMENTOS EM LOTE
+# ==================================================
+class PagamentoLoteFormSetTests(TestCase):
+
+    def test_validar_linhas_nao_consulta_o_banco(self):
+        linhas = 20
+        dados = {"form-TOTAL_FORMS": str(linhas), "form-INITIAL_FORMS": str(linhas)}
+
+        for i in range(linhas):
+            dados.update({f"form-{i}-mensalidade": str(i + 1), f"form-{i}-valor": "1.234,50", f"form-{i}-forma": "PIX"})
+
+        formset = PagamentoLoteFormSet(dados)
+
+        with self.assertNumQueries(0):
+            self.assertTrue(formset.is_valid())
+
+        self.assertEqual(formset.forms[0].cleaned_data["valor"], Decimal("1234.50"))
+
+    def test_valor_negativo_continua_invalido(self):
+        formset = PagamentoLoteFormSet({
+            "form-TOTAL_FORMS": "1",
+            "form-INITIAL_FORMS": "1",
+            "form-0-mensalidade": "1",
+            "form-0-valor": "-10",
+            "form-0-forma": "PIX",
+        })
+
+        self.assertFalse(formset.is_valid())
+
+
+# ==================================================
+# WHATSAPP
+# ==================================================
+class TelefoneWhatsappTests(TestCase):
+
+    def test_numero_normalizado(self):
+        aluno = Aluno.objects.create(nome="Aluno Teste", responsavel="Responsável", telefone="(81) 99999-8888")
+
+        self.assertEqual(aluno.telefone_whatsapp, "5581999998888")
+
+    def test_numero_sem_ddd_usa_os_digitos(self):
+        aluno = Aluno.objects.create(nome="Aluno Teste", responsavel="Responsável", telefone="99999-8888")
+
+        self.assertEqual(aluno.telefone_e164, "")
+        self.assertEqual(aluno.telefone_whatsapp, "999998888")
+        self.assertTrue(aluno.msg_aniversario_whatsapp.startswith("https://wa.me/999998888?"))
+
+    def test_sem_telefone(self):
+        self.assertIsNone(Aluno(telefone="").telefone_whatsapp)
+
+
+# ==================================================
+# MÉTRICAS
+# ==================================================
+@override_settings(METRICAS_ATIVAS=True)
+class MetricasMiddlewareTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = get_user_model().objects.create_superuser("admin_teste", password=None)
+        cls.funcionaria = get_user_model().objects.create_user("funcionaria_teste", password=None)
+
+    def setUp(self):
+        metricas.zerar()
+
+    def test_server_timing_so_para_a_equipe(self):
+        url = reverse("buscar_alunos_json")
+
+        self.client.force_login(self.funcionaria)
+        self.assertNotIn("Server-Timing", self.client.get(url, {"q": "ana"}))
+
+        self.client.force_login(self.admin)
+        self.assertIn("Server-Timing", self.client.get(url, {"q": "ana"}))
+
+    def test_csv_conta_as_consultas_do_envio(self):
+        criar_aluno_com_historico(1)
+        self.client.force_login(self.funcionaria)
+
+        response = self.client.get(reverse("exportar_caixa_csv"))
+        self.assertEqual(metricas.requisicoes["exportar_caixa_csv"], 0)
+
+        linhas = b"".join(response.streaming_content).decode().splitlines()
+        response.close()
+
+        self.assertEqual(len(linhas), 1 + 24)
+        self.assertEqual(metricas.requisicoes["exportar_caixa_csv"], 1)
+        self.assertGreaterEqual(metricas.consultas["exportar_caixa_csv"], 1)
+
+
+# ==================================================
+# EXPORTAÇÕES EM SEGUNDO PLANO
+# ==================================================
+@override_settings(EXPORT_THREADS=0, EXPORT_TIMEOUT=300)
+class ExportacaoTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.funcionaria = get_user_model().objects.create_user("funcionaria_teste", password=None)
+
+    def criar_job(self, idade=timedelta(0), **campos):
+        job = ExportJob.objects.create(tipo="EXCEL", criado_por=self.funcionaria, **campos)
+        ExportJob.objects.filter(pk=job.pk).update(criado_em=timezone.now() - idade)
+        return job
+
+    def test_falha_antes_de_gerar_o_arquivo_vira_erro(self):
+        job = self.criar_job()
+
+        with mock.patch("alunos.tarefas.filtrar_pagamentos", side_effect=RuntimeError("banco fora")):
+            with self.assertLogs("alunos.tarefas", "ERROR"):
+                self.assertFalse(executar_exportacao(job.pk))
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, "ERRO")
+        self.assertEqual(job.erro, "banco fora")
+
+    def test_grupo_admin_nao_ve_exportacao_de_outro_usuario(self):
+        job = self.criar_job()
+        gerente = get_user_model().objects.create_user("gerente_teste", password=None)
+        gerente.groups.add(Group.objects.create(name="ADMIN"))
+        self.client.force_login(gerente)
+
+        response = self.client.get(reverse("exportacao_status", args=[job.pk]))
+
+        self.assertEqual(response.status_code, 404)
+
+    def test_status_marca_processando_sem_progresso_como_erro(self):
+        ativo = self.criar_job(status="PROCESSANDO", atualizado_em=timezone.now())
+        parado = self.criar_job(status="PROCESSANDO", atualizado_em=timezone.now() - timedelta(minutes=10))
+        self.client.force_login(self.funcionaria)
+
+        with self.assertLogs("alunos.tarefas", "WARNING"):
+            for job, status in ((ativo, "PROCESSANDO"), (parado, "ERRO")):
+                with self.subTest(status=status):
+                    response = self.client.get(reverse("exportacao_status", args=[job.pk]))
+                    self.assertEqual(json.loads(response.content)["status"], status)
+
+    @override_settings(EXPORT_THREADS=1)
+    def test_pendente_perdido_volta_para_a_fila(self):
+        self.criar_job()
+        perdido = self.criar_job(idade=timedelta(minutes=5))
+
+        with mock.patch("alunos.tarefas._enfileirar") as enfileirar:
+            recuperar_exportacoes_travadas()
+
+        enfileirar.assert_called_once_with(perdido.pk)
+
+    def test_agendar_apaga_exportacoes_antigas(self):
+        antigo = self.criar_job(idade=timedelta(days=30), status="CONCLUIDO")
+        novo = self.criar_job()
+
+        agendar_exportacao(novo)
+
+        self.assertFalse(ExportJob.objects.filter(pk=antigo.pk).exists())
+        self.assertTrue(ExportJob.objects.filter(pk=novo.pk).exists())
+
+
+# ==================================================
+# LEMBRETES
+# ==================================================
+@override_settings(CACHES=CACHE_LOCAL, LEMBRETES_AUTOMATICOS=True)
+class LembretesTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.hoje = date.today()
+
+        self.aluno = Aluno.objects.create(
+            nome="Aluno Teste",
+            responsavel="Responsável",
+            telefone="81999998888",
+        )
+        Mensalidade.objects.create(aluno=self.aluno, valor=Decimal("150.00"), vencimento=self.hoje)
+
+    def test_gerados_conta_so_os_novos(self):
+        primeira = gerar_lembretes(self.hoje)
+        segunda = gerar_lembretes(self.hoje)
+
+        self.assertEqual((primeira["gerados"], primeira["atualizados"]), (1, 0))
+        self.assertEqual((segunda["gerados"], segunda["atualizados"]), (0, 1))
+
+    def test_descarta_pendentes_que_sairam_da_janela(self):
+        aniversario = self.hoje + timedelta(days=3)
+        self.aluno.data_nascimento = aniversario.replace(year=aniversario.year - 8)
+        self.aluno.save()
+        gerar_lembretes(self.hoje)
+        self.assertEqual(Lembrete.objects.filter(status="PENDENTE").count(), 2)
+
+        # Data de nascimento corrigida e mensalidade paga
+        self.aluno.data_nascimento = None
+        self.aluno.save()
+        Mensalidade.objects.update(total_pago=Decimal("150.00"))
+
+        resultado = gerar_lembretes(self.hoje)
+
+        self.assertEqual(resultado["descartados"], 2)
+        self.assertFalse(Lembrete.objects.exists())
+
+    def test_falha_nao_bloqueia_nova_tentativa(self):
+        with mock.patch("alunos.lembretes.gerar_lembretes", side_effect=RuntimeError("banco fora")) as gerar:
+            with self.assertLogs("alunos.lembretes", "ERROR"):
+                garantir_lembretes(self.hoje)
+            self.assertEqual(gerar.call_count, 1)
+
+        garantir_lembretes(self.hoje)
+        self.assertTrue(Lembrete.objects.filter(tipo="VENCIMENTO").exists())
+
+    def test_gera_uma_vez_ate_os_dados_mudarem(self):
+        with mock.patch("alunos.lembretes.gerar_lembretes") as gerar:
+            garantir_lembretes(self.hoje)
+            garantir_lembretes(self.hoje)
+            self.assertEqual(gerar.call_count, 1)
+
+            # Aluno novo no meio do dia: a versão do painel muda no commit
+            with self.captureOnCommitCallbacks(execute=True):
+                Aluno.objects.create(nome="Aluno Novo", responsavel="Responsável")
+
+            garantir_lembretes(self.hoje)
+            self.assertEqual(gerar.call_count, 2)
+
+
+# ==================================================
+# SERVICE WORKER
+# ==================================================
+class MensagensSemCacheMiddlewareTests(TestCase):
+
+    def responder(self, exibir):
+        def view(request):
+            messages.success(request, "Pagamento registrado!")
+            if exibir:
+                list(messages.get_messages(request))
+            return HttpResponse()
+
+        request = RequestFactory().get("/")
+        SessionMiddleware(lambda r: None).process_request(request)
+        MessageMiddleware(lambda r: None).process_request(request)
+
+        return MensagensSemCacheMiddleware(view)(request)
+
+    def test_pagina_com_mensagens_nao_vai_para_o_cache(self):
+        self.assertIn("no-store", self.responder(exibir=True)["Cache-Control"])
+
+    def test_pagina_sem_mensagens_exibidas(self):
+        self.assertFalse(self.responder(exibir=False).has_header("Cache-Control"))
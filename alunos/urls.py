@@ -14,11 +14,17 @@ urlpatterns = [
     
     # Esta é a rota para onde o LOGIN_REDIRECT_URL enviará a funcionária
     path('alunos/', views.lista_alunos, name='lista_alunos'),
+    path('alunos/pagina/', views.lista_alunos_pagina, name='lista_alunos_pagina'),
+    path('alunos/buscar/', views.buscar_alunos_json, name='buscar_alunos_json'),
+    path('alunos/telefone/', views.buscar_aluno_por_telefone, name='buscar_aluno_por_telefone'),
+    path('alunos/importar/', views.importar_alunos, name='importar_alunos'),
+    path('alunos/importar/relatorio/<str:token>/', views.importar_alunos_relatorio, name='importar_alunos_relatorio'),
 
     # MENSALIDADES (Controle de Cobranças)
     path("aluno/<int:aluno_id>/mensalidade/nova/", views.criar_mensalidade, name="criar_mensalidade"),
     path("aluno/<int:aluno_id>/gerar-mensalidades/", views.gerar_mensalidades_ano, name="gerar_mensalidades_ano"),
     path("mensalidade/<int:mensalidade_id>/pagar/", views.pagar_mensalidade, name="pagar_mensalidade"),
+    path("pagamentos/lote/", views.pagamentos_lote, name="pagamentos_lote"),
     
     # Apenas ADMIN pode excluir mensalidades
     path("mensalidade/<int:mensalidade_id>/excluir/", views.excluir_mensalidade, name="excluir_mensalidade"),
@@ -27,6 +33,17 @@ urlpatterns = [
     # Rotas restritas ao grupo ADMIN para proteger o faturamento total
     path("", views.relatorio_caixa, name="relatorio_caixa"),
     path("caixa/fechamento/", views.fechamento_mensal, name="fechamento_mensal"),
+    path("caixa/cache/", views.estatisticas_cache_painel, name="estatisticas_cache_painel"),
+    path("metrics", views.metricas, name="metricas"),
+
+    # PWA: o service worker precisa ficar na raiz para controlar todas as páginas
+    path("sw.js", views.service_worker, name="service_worker"),
+    path("offline/", views.offline, name="offline"),
+    path("lembretes/enviados/", views.lembretes_enviados, name="lembretes_enviados"),
     path("caixa/exportar/", views.exportar_caixa_excel, name="exportar_caixa_excel"),
     path("caixa/exportar/pdf/", views.exportar_caixa_pdf, name="exportar_caixa_pdf"),
+    path("caixa/exportar/csv/", views.exportar_caixa_csv, name="exportar_caixa_csv"),
+    path("caixa/exportacoes/", views.exportacao_nova, name="exportacao_nova"),
+    path("caixa/exportacoes/<int:job_id>/", views.exportacao_status, name="exportacao_status"),
+    path("caixa/exportacoes/<int:job_id>/download/", views.exportacao_download, name="exportacao_download"),
 ]
\ No newline at end of file
@@ -1,20 +1,46 @@
+from django.conf import settings
 from django.shortcuts import render, redirect, get_object_or_404
-from django.http import HttpResponse
+from django.template.loader import get_template, render_to_string
+from django.templatetags.static import static
+from django.urls import reverse
+from django.http import FileResponse, Http404, HttpResponse, JsonResponse, StreamingHttpResponse
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from django.contrib.admin.views.decorators import staff_member_required
 from django.utils import timezone
-from django.db.models import Sum, Value, DecimalField
-from django.db.models.functions import ExtractMonth, Coalesce
+from django.db.models import Prefetch, Sum
+from django.views.decorators.http import condition
 
 from decimal import Decimal
 from datetime import date, timedelta  
 import calendar
-from openpyxl import Workbook
-from reportlab.pdfgen import canvas
-
-from .models import Aluno, Mensalidade, Pagamento
-from .forms import AlunoForm, MensalidadeForm, PagamentoForm
+import hashlib
+import json
+import os
+import re
+import uuid
+
+from urllib.parse import urlencode
+
+from .models import Aluno, CaixaDiario, ExportJob, Mensalidade, Pagamento
+from .forms import AlunoForm, DataLoteForm, MensalidadeForm, PagamentoForm, PagamentoLoteFormSet
+from .paginacao import paginar_por_nome
+from .tarefas import agendar_exportacao, recuperar_exportacoes_travadas
+from .busca import buscar_alunos, LIMITE_SUGESTOES
+from .cobranca import gerar_mensalidades, registrar_pagamentos
+from .importacao import ErroImportacao, importar_planilha, limpar_relatorios_antigos, pasta_relatorios
+from .lembretes import garantir_lembretes, marcar_enviados, pagina_lembretes
+from .cache import contexto_painel, estatisticas_painel, versao_painel
+from .metricas import metricas as registro_metricas
+from .exportacao import (
+    CONTENT_TYPE_EXCEL,
+    arquivo_temporario,
+    filtrar_pagamentos,
+    gerar_excel,
+    gerar_pdf,
+    ler_filtros,
+    linhas_csv,
+)
 
 
 # ===============================
@@ -49,7 +75,19 @@ def aluno_editar(request, aluno_id):
 @login_required
 def aluno_detalhe(request, aluno_id):
     aluno = get_object_or_404(Aluno, id=aluno_id)
-    mensalidades = aluno.mensalidades.all().order_by("-vencimento")
+
+    # 3 consultas fixas: aluno, mensalidades e pagamentos (prefetch).
+    # O saldo vem de total_pago e o recibo reaproveita o aluno em cache.
+    mensalidades = (
+        aluno.mensalidades
+        .order_by("-vencimento")
+        .prefetch_related(
+            Prefetch(
+                "pagamentos",
+                queryset=Pagamento.objects.order_by("data_pagamento", "id")
+            )
+        )
+    )
 
     return render(request, "aluno_detalhe.html", {
         "aluno": aluno,
@@ -58,17 +96,143 @@ def aluno_detalhe(request, aluno_id):
     })
 
 
+# Colunas exibidas na tabela de alunos (lista e painel da funcionária)
+COLUNAS_TABELA_ALUNOS = ("id", "nome", "telefone", "telefone_e164", "atipico", "aniversario")
+
+
+def _pagina_alunos(request, somente_ativos=False):
+    busca = request.GET.get("q", "")
+    cursor = request.GET.get("cursor")
+
+    alunos = Aluno.objects.only(*COLUNAS_TABELA_ALUNOS).com_aniversario_hoje()
+
+    if somente_ativos:
+        alunos = alunos.filter(ativo=True)
+
+    if busca:
+        alunos = buscar_alunos(alunos, busca)
+
+    alunos, proximo = paginar_por_nome(alunos, cursor)
+
+    proxima_pagina = None
+    if proximo:
+        parametros = {"q": busca, "cursor": proximo}
+        if somente_ativos:
+            parametros["ativos"] = "1"
+        proxima_pagina = f"{reverse('lista_alunos_pagina')}?{urlencode(parametros)}"
+
+    return {
+        "alunos": alunos,
+        "busca": busca,
+        "proxima_pagina": proxima_pagina,
+    }
+
+
 @login_required
 def lista_alunos(request):
+    return render(request, "lista_alunos.html", _pagina_alunos(request))
+
+
+@login_required
+def lista_alunos_pagina(request):
+    # Fragmento (só as linhas) para a rolagem infinita
+    contexto = _pagina_alunos(
+        request,
+        somente_ativos=request.GET.get("ativos") == "1"
+    )
+
+    return render(request, "lista_alunos_linhas.html", contexto)
+
+
+@login_required
+def buscar_alunos_json(request):
+    # Sugestões para o campo de busca da recepção
     busca = request.GET.get("q", "")
 
+    try:
+        limite = max(1, min(int(request.GET.get("limite", LIMITE_SUGESTOES)), 50))
+    except ValueError:
+        limite = LIMITE_SUGESTOES
+
+    if not busca.strip():
+        return JsonResponse({"resultados": []})
+
     alunos = (
-        Aluno.objects.filter(nome__icontains=busca).order_by("nome")
-        if busca else
-        Aluno.objects.all().order_by("nome")
+        buscar_alunos(Aluno.objects.all(), busca)
+        .order_by("nome", "id")
+        .values("id", "nome", "responsavel", "telefone")[:limite]
     )
 
-    return render(request, "lista_alunos.html", {"alunos": alunos})
+    resultados = [
+        {**aluno, "url": reverse("aluno_detalhe", args=[aluno["id"]])}
+        for aluno in alunos
+    ]
+
+    return JsonResponse({"resultados": resultados})
+
+
+@staff_member_required
+def importar_alunos(request):
+    resultado = None
+    relatorio_url = None
+
+    if request.method == "POST" and request.FILES.get("arquivo"):
+        arquivo = request.FILES["arquivo"]
+
+        limpar_relatorios_antigos()
+        token = uuid.uuid4().hex
+        caminho = os.path.join(pasta_relatorios(), f"{token}.csv")
+
+        try:
+            with open(caminho, "w", encoding="utf-8", newline="") as relatorio:
+                resultado = importar_planilha(arquivo, arquivo.name, relatorio)
+        except ErroImportacao as erro:
+            messages.error(request, str(erro))
+
+        if resultado and resultado["com_erro"]:
+            relatorio_url = reverse("importar_alunos_relatorio", args=[token])
+        elif os.path.exists(caminho):
+            os.remove(caminho)
+
+        if resultado:
+            messages.success(request, f"{resultado['importados']} aluno(s) importado(s).")
+
+    return render(request, "importar_alunos.html", {
+        "resultado": resultado,
+        "relatorio_url": relatorio_url,
+    })
+
+
+@staff_member_required
+def importar_alunos_relatorio(request, token):
+    caminho = os.path.join(pasta_relatorios(), f"{token}.csv")
+
+    if not re.fullmatch(r"[0-9a-f]{32}", token) or not os.path.exists(caminho):
+        raise Http404
+
+    return FileResponse(
+        open(caminho, "rb"),
+        as_attachment=True,
+        filename="erros_importacao.csv"
+    )
+
+
+@login_required
+def buscar_aluno_por_telefone(request):
+    # Busca exata pelo número (ex.: o remetente de uma mensagem do WhatsApp)
+    alunos = (
+        Aluno.objects
+        .por_telefone(request.GET.get("numero", ""))
+        .order_by("nome", "id")
+        .values("id", "nome", "responsavel", "telefone", "telefone_e164", "ativo")
+    )
+
+    resultados = [
+        {**aluno, "url": reverse("aluno_detalhe", args=[aluno["id"]])}
+        for aluno in alunos
+    ]
+
+    return JsonResponse({"resultados": resultados})
 
 
 # ===============================
@@ -80,11 +244,9 @@ def criar_mensalidade(request, aluno_id):
     aluno = get_object_or_404(Aluno, id=aluno_id)
 
     if request.method == "POST":
-        form = MensalidadeForm(request.POST)
+        form = MensalidadeForm(request.POST, instance=Mensalidade(aluno=aluno))
         if form.is_valid():
-            mensalidade = form.save(commit=False)
-            mensalidade.aluno = aluno
-            mensalidade.save()
+            form.save()
             messages.success(request, "Mensalidade criada.")
             return redirect("aluno_detalhe", aluno_id=aluno.id)
     else:
@@ -93,26 +255,32 @@ def criar_mensalidade(request, aluno_id):
     return render(request, "mensalidade_form.html", {"form": form, "aluno": aluno})
 
 
+# Anos antes/depois do atual aceitos em gerar_mensalidades_ano
+ANOS_GERACAO_MENSALIDADES = 5
+
+
 @login_required
 def gerar_mensalidades_ano(request, aluno_id):
     aluno = get_object_or_404(Aluno, id=aluno_id)
-    ano = timezone.now().year
+
+    ano_atual = timezone.now().year
+
+    try:
+        ano = int(request.GET.get("ano", ano_atual))
+    except ValueError:
+        ano = ano_atual
+
+    # date() não aceita ano 0 nem acima de 9999; fora da janela usa o ano atual
+    if abs(ano - ano_atual) > ANOS_GERACAO_MENSALIDADES:
+        ano = ano_atual
 
     if not aluno.valor_mensalidade or not aluno.dia_vencimento:
         messages.error(request, "Configure valor e dia de vencimento.")
         return redirect("aluno_editar", aluno_id=aluno.id)
 
-    for mes in range(1, 13):
-        ultimo_dia = calendar.monthrange(ano, mes)[1]
-        vencimento = date(ano, mes, min(aluno.dia_vencimento, ultimo_dia))
-
-        Mensalidade.objects.get_or_create(
-            aluno=aluno,
-            vencimento=vencimento,
-            defaults={"valor": aluno.valor_mensalidade}
-        )
+    resultado = gerar_mensalidades(ano, alunos=Aluno.objects.filter(id=aluno.id))
 
-    messages.success(request, "Mensalidades geradas.")
+    messages.success(request, f"{resultado['criadas']} mensalidade(s) gerada(s) para {ano}.")
     return redirect("aluno_detalhe", aluno_id=aluno.id)
 
 
@@ -156,120 +324,196 @@ def pagar_mensalidade(request, mensalidade_id):
     return render(request, "pagamento_form.html", {"mensalidade": mensalidade})
 
 
+def _mensalidades_do_lote(formset, mensalidades):
+    # Associa cada linha da grade à sua mensalidade (para exibir aluno/vencimento)
+    for form in formset:
+        pk = form["mensalidade"].value()
+        form.parcela = mensalidades.get(int(pk)) if str(pk).isdigit() else None
+
+
+@login_required
+def pagamentos_lote(request):
+    hoje = timezone.now().date()
+
+    try:
+        ate = date.fromisoformat(request.GET.get("ate", ""))
+    except ValueError:
+        ate = hoje.replace(day=calendar.monthrange(hoje.year, hoje.month)[1])
+
+    if request.method == "POST":
+        form_data = DataLoteForm(request.POST)
+        formset = PagamentoLoteFormSet(request.POST)
+
+        ids = [
+            valor for chave, valor in request.POST.items()
+            if chave.endswith("-mensalidade") and valor.isdigit()
+        ]
+        mensalidades = Mensalidade.objects.select_related("aluno").in_bulk(ids)
+        _mensalidades_do_lote(formset, mensalidades)
+
+        if form_data.is_valid() and formset.is_valid():
+            itens = []
+
+            for form in formset:
+                if not form.preenchido:
+                    continue
+                if form.parcela is None:
+                    form.add_error(None, "Mensalidade não encontrada.")
+                    continue
+
+                itens.append((form.parcela.id, form.cleaned_data["valor"], form.cleaned_data["forma"]))
+
+            if all(form.is_valid() for form in formset):
+                pagamentos = registrar_pagamentos(itens, form_data.cleaned_data["data_pagamento"])
+
+                total = sum((p.valor for p in pagamentos), Decimal("0.00"))
+                messages.success(request, f"{len(pagamentos)} pagamento(s) registrado(s), total R$ {total:.2f}.")
+                return redirect(f"{reverse('pagamentos_lote')}?ate={ate.isoformat()}")
+
+        messages.error(request, "Corrija as linhas destacadas; nada foi gravado.")
+
+    else:
+        mensalidades = {
+            m.id: m for m in
+            Mensalidade.objects.em_aberto()
+            .filter(aluno__ativo=True, vencimento__lte=ate)
+            .select_related("aluno")
+            .order_by("vencimento", "aluno__nome")
+        }
+
+        form_data = DataLoteForm(initial={"data_pagamento": hoje})
+        formset = PagamentoLoteFormSet(initial=[{"mensalidade": pk} for pk in mensalidades])
+        _mensalidades_do_lote(formset, mensalidades)
+
+    return render(request, "pagamentos_lote.html", {
+        "formset": formset,
+        "form_data": form_data,
+        "ate": ate,
+    })
+
+
 # ===============================
 # RELATÓRIO FINANCEIRO
 # ===============================
 
-@login_required
-def relatorio_caixa(request):
+def _contexto_painel(hoje, admin):
 
-    hoje = timezone.now().date()
+    contexto = {
+        "dias_aviso_vencimento": settings.DIAS_AVISO_VENCIMENTO,
+        "today": hoje,
+        "amanha": hoje + timedelta(days=1),
+    }
+
+    if not admin:
+        return contexto
 
     # ===============================
-    # 🎂 ANIVERSARIANTES
+    # 👑 ADMIN
     # ===============================
-    fim_semana = hoje + timedelta(days=7)
+    resumo = CaixaDiario.objects.resumo_financeiro(hoje)
 
-    aniversariantes = []
+    return {
+        **contexto,
+        "total_recebido_mes": resumo["total_mes"],
+        "total_recebido_ano": resumo["total_ano"],
+        "total_hoje": resumo["total_hoje"],
+        # Chart.js recebe a lista direto no template
+        "grafico_meses": [float(total) for total in resumo["meses"]],
+    }
 
-    for aluno in Aluno.objects.filter(ativo=True):
 
-        if aluno.data_nascimento:
+def _pagina(request, parametro):
+    try:
+        return max(int(request.GET.get(parametro, 1)), 1)
+    except ValueError:
+        return 1
 
-            aniversario_esse_ano = aluno.data_nascimento.replace(year=hoje.year)
 
-            if hoje <= aniversario_esse_ano <= fim_semana:
+def _url_pagina(request, parametro, pagina):
+    parametros = request.GET.copy()
+    parametros[parametro] = pagina
+    return f"?{parametros.urlencode()}"
 
-                aluno.e_hoje = (
-                    aluno.data_nascimento.day == hoje.day and
-                    aluno.data_nascimento.month == hoje.month
-                )
 
-                aniversariantes.append(aluno)
+def _lembretes_painel(request, hoje):
+    # 🎂 Aniversariantes e 💰 vencimentos saem da caixa de saída (lembretes.py)
+    contexto = {}
 
-    # ===============================
-    # 💰 MENSALIDADES VENCENDO
-    # ===============================
-    amanha = hoje + timedelta(days=1)
+    for tipo, nome, parametro in (
+        ("ANIVERSARIO", "aniversariantes", "pa"),
+        ("VENCIMENTO", "mensalidades_vencendo", "pv"),
+    ):
+        pagina = _pagina(request, parametro)
+        itens, tem_proxima = pagina_lembretes(tipo, pagina, hoje)
 
-    mensalidades_vencendo = []
+        contexto[nome] = itens
+        contexto[f"{nome}_anterior"] = _url_pagina(request, parametro, pagina - 1) if pagina > 1 else None
+        contexto[f"{nome}_proxima"] = _url_pagina(request, parametro, pagina + 1) if tem_proxima else None
 
-    for aluno in Aluno.objects.filter(ativo=True):
+    return contexto
 
-        if aluno.dia_vencimento:
 
-            if aluno.dia_vencimento == hoje.day:
+@login_required
+def relatorio_caixa(request):
+
+    hoje = timezone.now().date()
+    admin = request.user.is_superuser
 
-                aluno.vencimento_tipo = "hoje"
-                mensalidades_vencendo.append(aluno)
+    garantir_lembretes(hoje)
 
-            elif aluno.dia_vencimento == amanha.day:
+    contexto = contexto_painel(
+        "admin" if admin else "funcionario",
+        hoje,
+        lambda: _contexto_painel(hoje, admin)
+    )
 
-                aluno.vencimento_tipo = "amanha"
-                mensalidades_vencendo.append(aluno)
+    # Lembretes dependem da página pedida e ficam fora do cache
+    contexto = {**contexto, **_lembretes_painel(request, hoje)}
 
     # ===============================
     # 👩‍💼 FUNCIONÁRIO
     # ===============================
-    if not request.user.is_superuser:
+    if not admin:
 
+        # A lista de alunos depende da página/busca e fica fora do cache
         return render(request, "funcionario_dashboard.html", {
-            "aniversariantes": aniversariantes,
-            "mensalidades_vencendo": mensalidades_vencendo,
-            "alunos": Aluno.objects.filter(ativo=True).order_by("nome"),
+            **contexto,
+            **_pagina_alunos(request, somente_ativos=True),
         })
 
-       # ===============================
-    # 👑 ADMIN
-    # ===============================
-    total_mes = Pagamento.objects.filter(
-        data_pagamento__month=hoje.month,
-        data_pagamento__year=hoje.year
-    ).aggregate(
-        total=Coalesce(
-            Sum("valor"),
-            Value(0),
-            output_field=DecimalField()
-        )
-    )["total"]
-
-    total_ano = Pagamento.objects.filter(
-        data_pagamento__year=hoje.year
-    ).aggregate(
-        total=Coalesce(
-            Sum("valor"),
-            Value(0),
-            output_field=DecimalField()
-        )
-    )["total"]
-
-    total_hoje = Pagamento.objects.filter(
-        data_pagamento=hoje
-    ).aggregate(
-        total=Coalesce(
-            Sum("valor"),
-            Value(0),
-            output_field=DecimalField()
-        )
-    )["total"]
+    return render(request, "relatorio_financeiro.html", contexto)
 
-    grafico_meses = [0] * 12
 
-    for pagamento in Pagamento.objects.filter(
-        data_pagamento__year=hoje.year
-    ):
-        mes = pagamento.data_pagamento.month - 1
-        grafico_meses[mes] += float(pagamento.valor)
+@login_required
+def lembretes_enviados(request):
+    if request.method == "POST":
+        ids = [pk for pk in request.POST.getlist("lembrete") if pk.isdigit()]
+        total = marcar_enviados(ids, request.user)
+
+        if total:
+            messages.success(request, f"{total} lembrete(s) marcado(s) como enviado(s).")
+
+    # Volta para a mesma página do painel (só a query string é aceita)
+    proximo = request.POST.get("proximo", "")
+    return redirect(reverse("relatorio_caixa") + (proximo if proximo.startswith("?") else ""))
+
+
+@staff_member_required
+def estatisticas_cache_painel(request):
+    return JsonResponse(estatisticas_painel())
+
+
+@staff_member_required
+def metricas(request):
+    if not settings.METRICAS_ATIVAS:
+        raise Http404
+
+    return HttpResponse(
+        registro_metricas.texto(),
+        content_type="text/plain; version=0.0.4; charset=utf-8",
+    )
+
 
-    return render(request, "relatorio_financeiro.html", {
-        "total_recebido_mes": total_mes,
-        "total_recebido_ano": total_ano,
-        "total_hoje": total_hoje,
-        "today": hoje,
-        "aniversariantes": aniversariantes,
-        "mensalidades_vencendo": mensalidades_vencendo,
-        "grafico_meses": grafico_meses,
-    })
 # ===============================
 # ROTAS AUXILIARES
 # ===============================
@@ -279,92 +523,226 @@ def relatorio_financeiro(request):
     return relatorio_caixa(request)
 
 
+MESES = (
+    (1, "Janeiro"), (2, "Fevereiro"), (3, "Março"), (4, "Abril"),
+    (5, "Maio"), (6, "Junho"), (7, "Julho"), (8, "Agosto"),
+    (9, "Setembro"), (10, "Outubro"), (11, "Novembro"), (12, "Dezembro"),
+)
+
+
 @login_required
 def fechamento_mensal(request):
 
-    if request.user.is_superuser:
-        return relatorio_caixa(request)
+    if not request.user.is_superuser:
+        return dashboard_funcionario(request)
 
-    return dashboard_funcionario(request)
+    hoje = timezone.now().date()
+
+    try:
+        mes = int(request.GET.get("mes", hoje.month))
+        ano = int(request.GET.get("ano", hoje.year))
+        inicio = date(ano, mes, 1)
+    except ValueError:
+        mes, ano = hoje.month, hoje.year
+        inicio = date(ano, mes, 1)
+
+    fim = date(ano, mes, calendar.monthrange(ano, mes)[1])
+
+    # Totais saem do resumo diário; só a listagem lê os pagamentos do mês
+    totais_forma, quantidade = CaixaDiario.objects.filter(
+        data__range=(inicio, fim)
+    ).totais_por_forma()
+
+    pagamentos = (
+        Pagamento.objects
+        .filter(data_pagamento__range=(inicio, fim))
+        .select_related("mensalidade__aluno")
+        .order_by("data_pagamento", "id")
+    )
+
+    return render(request, "fechamento_mensal.html", {
+        "meses": MESES,
+        "mes": mes,
+        "ano": ano,
+        "anos": range(hoje.year - 3, hoje.year + 2),
+        "total_geral": sum(totais_forma.values()),
+        "totais_forma": totais_forma,
+        "quantidade": quantidade,
+        "pagamentos": pagamentos,
+    })
 
 
 @login_required
 def exportar_caixa_excel(request):
 
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Fluxo de Caixa"
-
-    ws.append([
-        "Data",
-        "Aluno",
-        "Forma de Pagamento",
-        "Valor"
-    ])
-
-    pagamentos = Pagamento.objects.all().order_by("-data_pagamento")
-
-    for p in pagamentos:
-        ws.append([
-            p.data_pagamento.strftime("%d/%m/%Y"),
-            p.mensalidade.aluno.nome,
-            p.forma,
-            float(p.valor)
-        ])
-
-    response = HttpResponse(
-        content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+    pagamentos = filtrar_pagamentos(ler_filtros(request.GET))
+
+    arquivo = arquivo_temporario()
+    gerar_excel(pagamentos, arquivo)
+    arquivo.seek(0)
+
+    # FileResponse envia o arquivo em blocos e fecha ao final
+    return FileResponse(
+        arquivo,
+        as_attachment=True,
+        filename="fluxo_caixa.xlsx",
+        content_type=CONTENT_TYPE_EXCEL
     )
 
-    response["Content-Disposition"] = (
-        'attachment; filename="fluxo_caixa.xlsx"'
+
+@login_required
+def exportar_caixa_pdf(request):
+
+    filtros = ler_filtros(request.GET)
+    pagamentos = filtrar_pagamentos(filtros)
+
+    arquivo = arquivo_temporario()
+    gerar_pdf(pagamentos, arquivo, filtros)
+    arquivo.seek(0)
+
+    return FileResponse(
+        arquivo,
+        as_attachment=True,
+        filename="fluxo_caixa.pdf",
+        content_type="application/pdf"
     )
 
-    wb.save(response)
+# ===============================
+# CSV PARA A CONTABILIDADE
+# ===============================
 
-    return response
+def _filtros_csv(request):
+    # since/until para integrações; inicio/fim quando vem do formulário do painel
+    return ler_filtros({
+        "inicio": request.GET.get("since") or request.GET.get("inicio", ""),
+        "fim": request.GET.get("until") or request.GET.get("fim", ""),
+        "forma": request.GET.get("forma", ""),
+        "aluno": request.GET.get("aluno", ""),
+    })
+
+
+def _etag_csv(request):
+    """
+    ETag sem ler os pagamentos: versão dos dados (a mesma que invalida o
+    painel) + contagem e soma do período no caixa diário.
+    """
+    filtros = _filtros_csv(request)
+
+    caixa = CaixaDiario.objects.all()
+    if filtros["inicio"]:
+        caixa = caixa.filter(data__gte=filtros["inicio"])
+    if filtros["fim"]:
+        caixa = caixa.filter(data__lte=filtros["fim"])
+    if filtros["forma"]:
+        caixa = caixa.filter(forma=filtros["forma"])
+
+    totais = caixa.aggregate(quantidade=Sum("quantidade"), total=Sum("total"))
+
+    base = "|".join(str(parte) for parte in (
+        versao_painel(),
+        *sorted(filtros.items()),
+        totais["quantidade"],
+        totais["total"],
+    ))
+
+    return hashlib.sha256(base.encode()).hexdigest()[:32]
 
 
 @login_required
-def exportar_caixa_pdf(request):
+@condition(etag_func=_etag_csv)
+def exportar_caixa_csv(request):
 
-    response = HttpResponse(content_type='application/pdf')
+    pagamentos = filtrar_pagamentos(_filtros_csv(request))
 
-    response['Content-Disposition'] = (
-        'attachment; filename="fluxo_caixa.pdf"'
+    response = StreamingHttpResponse(
+        linhas_csv(pagamentos),
+        content_type="text/csv; charset=utf-8"
     )
+    response["Content-Disposition"] = 'attachment; filename="fluxo_caixa.csv"'
 
-    pdf = canvas.Canvas(response)
+    return response
 
-    pdf.setFont("Helvetica-Bold", 16)
-    pdf.drawString(50, 800, "Relatório Financeiro")
 
-    pdf.setFont("Helvetica", 12)
+# ===============================
+# EXPORTAÇÃO EM SEGUNDO PLANO
+# ===============================
 
-    y = 760
+def _status_exportacao(job):
+    return {
+        "id": job.pk,
+        "tipo": job.tipo,
+        "status": job.status,
+        "progresso": job.progresso,
+        "processados": job.processados,
+        "total": job.total,
+        "erro": job.erro,
+        "status_url": reverse("exportacao_status", args=[job.pk]),
+        "download_url": (
+            reverse("exportacao_download", args=[job.pk])
+            if job.status == "CONCLUIDO" else None
+        ),
+    }
 
-    pagamentos = Pagamento.objects.all().order_by("-data_pagamento")
 
-    for p in pagamentos:
+def _exportacao_do_usuario(request, job_id):
+    job = get_object_or_404(ExportJob, pk=job_id)
 
-        linha = (
-            f"{p.data_pagamento.strftime('%d/%m/%Y')} | "
-            f"{p.mensalidade.aluno.nome} | "
-            f"{p.forma} | "
-            f"R$ {p.valor}"
-        )
+    if job.criado_por_id != request.user.id and not request.user.is_superuser:
+        raise Http404
 
-        pdf.drawString(50, y, linha)
+    return job
 
-        y -= 20
 
-        if y < 50:
-            pdf.showPage()
-            y = 800
+@login_required
+def exportacao_nova(request):
 
-    pdf.save()
+    if request.method != "POST":
+        return redirect("relatorio_financeiro")
+
+    tipo = request.POST.get("tipo", "").upper()
+
+    if tipo not in dict(ExportJob.TIPOS):
+        return JsonResponse({"erro": "Tipo de exportação inválido."}, status=400)
+
+    job = ExportJob.objects.create(
+        tipo=tipo,
+        filtros={
+            campo: request.POST.get(campo, "")
+            for campo in ("inicio", "fim", "forma", "aluno")
+        },
+        criado_por=request.user
+    )
+
+    agendar_exportacao(job)
+
+    return JsonResponse(_status_exportacao(job), status=202)
+
+
+@login_required
+def exportacao_status(request, job_id):
+    job = _exportacao_do_usuario(request, job_id)
+
+    # A tela consulta até o job terminar: se ele se perdeu, resolve aqui
+    if job.status in ("PENDENTE", "PROCESSANDO"):
+        if recuperar_exportacoes_travadas(ExportJob.objects.filter(pk=job.pk)):
+            job.refresh_from_db()
+
+    return JsonResponse(_status_exportacao(job))
+
+
+@login_required
+def exportacao_download(request, job_id):
+    job = _exportacao_do_usuario(request, job_id)
+
+    if job.status != "CONCLUIDO" or not os.path.exists(job.arquivo):
+        raise Http404
+
+    return FileResponse(
+        open(job.arquivo, "rb"),
+        as_attachment=True,
+        filename=job.nome_download
+    )
 
-    return response
 
 # ===============================
 # DASHBOARD FUNCIONÁRIO
@@ -372,4 +750,55 @@ def exportar_caixa_pdf(request):
 
 @login_required
 def dashboard_funcionario(request):
-    return relatorio_caixa(request)
\ No newline at end of file
+    return relatorio_caixa(request)
+
+# ===============================
+# PWA (service worker)
+# ===============================
+
+# Arquivos guardados na instalação do app (caminhos de STATICFILES_DIRS)
+ARQUIVOS_PRECACHE = (
+    "img/logo.png",
+    "pwa/manifest.json",
+    "vendor/bootstrap/css/bootstrap.min.css",
+    "vendor/bootstrap/js/popper.min.js",
+    "vendor/bootstrap/js/bootstrap.min.js",
+    "vendor/fontawesome/css/icones.css",
+    "vendor/fontawesome/webfonts/fa-solid-900.woff2",
+    "vendor/fontawesome/webfonts/fa-brands-400.woff2",
+    "vendor/poppins/css/poppins.css",
+    "vendor/poppins/webfonts/poppins-300.woff2",
+    "vendor/poppins/webfonts/poppins-400.woff2",
+    "vendor/poppins/webfonts/poppins-600.woff2",
+    "vendor/chartjs/chart.umd.min.js",
+    "js/busca_alunos.js",
+    "js/rolagem_infinita.js",
+    "js/exportacao.js",
+    "js/mascara_dinheiro.js",
+)
+
+
+def service_worker(request):
+    # Servido na raiz para controlar todas as páginas (escopo "/")
+    precache = [
+        reverse("offline"),
+        *(static(caminho) for caminho in ARQUIVOS_PRECACHE),
+    ]
+
+    fonte = get_template("pwa/sw.js").template.source
+    versao = hashlib.sha256("\n".join([fonte, *precache]).encode()).hexdigest()[:12]
+
+    corpo = render_to_string("pwa/sw.js", {
+        "versao": versao,
+        "precache": json.dumps(precache),
+        "pagina_offline": reverse("offline"),
+    })
+
+    response = HttpResponse(corpo, content_type="application/javascript; charset=utf-8")
+    # O navegador sempre confere se há versão nova do service worker
+    response["Cache-Control"] = "no-cache"
+    return response
+
+
+def offline(request):
+    return render(request, "offline.html")
@@ -0,0 +1,60 @@
+// Sugestões da busca de alunos (typeahead).
+// Consulta /alunos/buscar/ enquanto a recepção digita e lista os primeiros resultados.
+(function () {
+  var campo = document.getElementById("busca-alunos");
+  var lista = document.getElementById("sugestoes-alunos");
+  if (!campo || !lista) return;
+
+  var espera = null;
+  var ultimaBusca = "";
+
+  function limpar() {
+    lista.innerHTML = "";
+  }
+
+  function mostrar(resultados) {
+    limpar();
+
+    resultados.forEach(function (aluno) {
+      var item = document.createElement("a");
+      item.className = "list-group-item list-group-item-action";
+      item.href = aluno.url;
+
+      var nome = document.createElement("strong");
+      nome.textContent = aluno.nome;
+      item.appendChild(nome);
+
+      var detalhe = document.createElement("small");
+      detalhe.className = "text-muted ms-2";
+      detalhe.textContent = [aluno.responsavel, aluno.telefone].filter(Boolean).join(" · ");
+      item.appendChild(detalhe);
+
+      lista.appendChild(item);
+    });
+  }
+
+  campo.addEventListener("input", function () {
+    clearTimeout(espera);
+
+    var termo = campo.value.trim();
+    if (!termo) {
+      limpar();
+      return;
+    }
+
+    espera = setTimeout(function () {
+      ultimaBusca = termo;
+
+      fetch(campo.dataset.url + "?q=" + encodeURIComponent(termo), { credentials: "same-origin" })
+        .then(function (resposta) { return resposta.json(); })
+        .then(function (dados) {
+          // Ignora respostas atrasadas de buscas anteriores
+          if (termo === ultimaBusca) mostrar(dados.resultados);
+        });
+    }, 150);
+  });
+
+  document.addEventListener("click", function (evento) {
+    if (!lista.contains(evento.target) && evento.target !== campo) limpar();
+  });
+})();
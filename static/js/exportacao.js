@@ -0,0 +1,65 @@
+// Exportações em segundo plano: cria o job, acompanha o progresso e baixa o arquivo.
+// Sem JavaScript, os botões continuam usando as exportações diretas (formaction).
+(function () {
+  var form = document.getElementById("form-exportacao");
+  var painel = document.getElementById("exportacao-status");
+  if (!form || !painel || !window.fetch) return;
+
+  var barra = painel.querySelector(".progress-bar");
+  var texto = painel.querySelector("small");
+
+  function cookie(nome) {
+    var valor = document.cookie.match("(^|;)\\s*" + nome + "=([^;]+)");
+    return valor ? decodeURIComponent(valor[2]) : "";
+  }
+
+  function mostrar(job) {
+    painel.classList.remove("d-none");
+    barra.style.width = job.progresso + "%";
+
+    if (job.status === "ERRO") {
+      texto.textContent = "Falha ao gerar o arquivo: " + job.erro;
+      barra.classList.add("bg-danger");
+    } else if (job.status === "CONCLUIDO") {
+      texto.textContent = "Arquivo pronto.";
+    } else {
+      texto.textContent = "Gerando arquivo... " + job.processados + " de " + job.total + " pagamentos";
+    }
+  }
+
+  function acompanhar(job) {
+    mostrar(job);
+
+    if (job.status === "CONCLUIDO") {
+      window.location = job.download_url;
+      return;
+    }
+    if (job.status === "ERRO") return;
+
+    setTimeout(function () {
+      fetch(job.status_url, { credentials: "same-origin" })
+        .then(function (resposta) { return resposta.json(); })
+        .then(acompanhar);
+    }, 1000);
+  }
+
+  form.querySelectorAll("button[data-tipo]").forEach(function (botao) {
+    botao.addEventListener("click", function (evento) {
+      evento.preventDefault();
+
+      var dados = new FormData(form);
+      dados.append("tipo", botao.dataset.tipo);
+
+      barra.classList.remove("bg-danger");
+
+      fetch(form.dataset.url, {
+        method: "POST",
+        body: dados,
+        credentials: "same-origin",
+        headers: { "X-CSRFToken": cookie("csrftoken") }
+      })
+        .then(function (resposta) { return resposta.json(); })
+        .then(acompanhar);
+    });
+  });
+})();
@@ -0,0 +1,31 @@
+// Máscara de dinheiro (ex.: 1.220,00) nos campos com data-mascara="dinheiro".
+// Mesmo comportamento do antigo jquery.mask('#.##0,00', {reverse: true}):
+// só dígitos, os dois últimos são os centavos. Antes do envio o valor volta
+// para o formato do Django (1220.00).
+(function () {
+  function formatar(valor) {
+    var digitos = valor.replace(/\D/g, "");
+    if (digitos.length <= 2) return digitos;
+
+    var inteiro = digitos.slice(0, -2).replace(/^0+(?=\d)/, "");
+    return inteiro.replace(/\B(?=(\d{3})+(?!\d))/g, ".") + "," + digitos.slice(-2);
+  }
+
+  function limpar(valor) {
+    return valor.replace(/\./g, "").replace(",", ".");
+  }
+
+  document.querySelectorAll('input[data-mascara="dinheiro"]').forEach(function (campo) {
+    campo.value = formatar(campo.value);
+
+    campo.addEventListener("input", function () {
+      campo.value = formatar(campo.value);
+    });
+
+    if (campo.form) {
+      campo.form.addEventListener("submit", function () {
+        if (campo.value) campo.value = limpar(campo.value);
+      });
+    }
+  });
+})();
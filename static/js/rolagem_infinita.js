@@ -0,0 +1,26 @@
+// Rolagem infinita das tabelas de alunos.
+// A última linha de cada página (.carregar-mais) traz a URL do próximo
+// fragmento; quando ela aparece na tela, buscamos e trocamos pelas novas linhas.
+(function () {
+  function observar(linha) {
+    var observer = new IntersectionObserver(function (entradas) {
+      if (!entradas[0].isIntersecting) return;
+      observer.disconnect();
+
+      fetch(linha.dataset.url, { credentials: "same-origin" })
+        .then(function (resposta) { return resposta.text(); })
+        .then(function (html) {
+          var tbody = linha.parentNode;
+          linha.insertAdjacentHTML("afterend", html);
+          tbody.removeChild(linha);
+
+          var proxima = tbody.querySelector("tr.carregar-mais");
+          if (proxima) observar(proxima);
+        });
+    }, { rootMargin: "200px" });
+
+    observer.observe(linha);
+  }
+
+  document.querySelectorAll("tr.carregar-mais").forEach(observar);
+})();
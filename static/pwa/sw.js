@@ -1,3 +0,0 @@
-self.addEventListener("install", function (event) {
-  console.log("Service Worker instalado");
-});
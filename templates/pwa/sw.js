@@ -0,0 +1,100 @@
+// Service worker do app (servido por views.service_worker em /sw.js).
+// A versão muda sozinha quando este arquivo ou a lista de arquivos do
+// precache muda; ao ativar, os caches de versões anteriores são apagados.
+var VERSAO = "{{ versao }}";
+var PREFIXO = "tia-cassia-";
+var CACHE_APP = PREFIXO + "app-" + VERSAO;
+var CACHE_PAGINAS = PREFIXO + "paginas-" + VERSAO;
+
+var PRECACHE = {{ precache|safe }};
+var PAGINA_OFFLINE = "{{ pagina_offline }}";
+
+// lista_alunos e aluno_detalhe (alunos/urls.py): sempre vêm da rede; a
+// última cópia guardada só aparece quando a rede falha (sem conexão)
+var PAGINAS_OFFLINE = [/^\/alunos\/$/, /^\/aluno\/\d+\/$/];
+
+self.addEventListener("install", function (event) {
+  event.waitUntil(
+    caches.open(CACHE_APP)
+      .then(function (cache) { return cache.addAll(PRECACHE); })
+      .then(function () { return self.skipWaiting(); })
+  );
+});
+
+self.addEventListener("activate", function (event) {
+  event.waitUntil(
+    caches.keys()
+      .then(function (nomes) {
+        return Promise.all(nomes.map(function (nome) {
+          if (nome.indexOf(PREFIXO) === 0 && nome !== CACHE_APP && nome !== CACHE_PAGINAS) {
+            return caches.delete(nome);
+          }
+        }));
+      })
+      .then(function () { return self.clients.claim(); })
+  );
+});
+
+function guardavel(resposta) {
+  // Redirecionamento (ex.: sessão expirada -> login) não vai para o cache,
+  // nem página com mensagens ("Pagamento registrado!"): o Django manda
+  // no-store nelas (alunos/pwa.py)
+  return resposta && resposta.ok && !resposta.redirected && resposta.type === "basic" &&
+    (resposta.headers.get("Cache-Control") || "").indexOf("no-store") === -1;
+}
+
+function redeComCopiaOffline(event) {
+  var request = event.request;
+
+  return fetch(request)
+    .then(function (resposta) {
+      if (guardavel(resposta)) {
+        var copia = resposta.clone();
+        event.waitUntil(caches.open(CACHE_PAGINAS).then(function (cache) {
+          return cache.put(request, copia);
+        }));
+      }
+      return resposta;
+    })
+    .catch(function () {
+      return caches.open(CACHE_PAGINAS)
+        .then(function (cache) { return cache.match(request); })
+        .then(function (emCache) { return emCache || caches.match(PAGINA_OFFLINE); });
+    });
+}
+
+function redeComFallback(request) {
+  return fetch(request).catch(function () { return caches.match(PAGINA_OFFLINE); });
+}
+
+function cacheComRede(request) {
+  // Arquivos estáticos: os do precache nunca mudam dentro de uma versão
+  return caches.match(request).then(function (emCache) {
+    return emCache || fetch(request);
+  });
+}
+
+self.addEventListener("fetch", function (event) {
+  var request = event.request;
+  var url = new URL(request.url);
+
+  if (request.method !== "GET") {
+    // Formulário enviado (pagamento, edição, logout...): as cópias guardadas
+    // ficaram velhas e não podem reaparecer nem sem conexão
+    if (url.origin === self.location.origin) {
+      event.waitUntil(caches.delete(CACHE_PAGINAS));
+    }
+    return;
+  }
+
+  if (request.mode === "navigate" && url.origin === self.location.origin) {
+    var offline = !url.search && PAGINAS_OFFLINE.some(function (padrao) { return padrao.test(url.pathname); });
+
+    event.respondWith(offline ? redeComCopiaOffline(event) : redeComFallback(request));
+    return;
+  }
+
+  if (PRECACHE.indexOf(url.origin === self.location.origin ? url.pathname : request.url) !== -1) {
+    event.respondWith(cacheComRede(request));
+  }
+});
@@ -1,5 +1,6 @@
 from pathlib import Path
 import os
+import tempfile
 import dj_database_url
 
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -29,11 +30,13 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
+    'alunos.metricas.MetricasMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
+    'alunos.pwa.MensagensSemCacheMiddleware',
 ]
 
 ROOT_URLCONF = 'tia_cassia.urls'
@@ -73,6 +76,28 @@ if "DATABASE_URL" in os.environ:
         'sslmode': 'require',
     }
 
+# ==============================
+# CACHE
+# ==============================
+
+# Arquivo em disco por padrão: os workers do gunicorn compartilham as
+# entradas e a versão do painel (o LocMemCache é separado por processo)
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv(
+            "CACHE_BACKEND",
+            'django.core.cache.backends.filebased.FileBasedCache'
+        ),
+        'LOCATION': os.getenv(
+            "CACHE_LOCATION",
+            os.path.join(tempfile.gettempdir(), 'tia_cassia_cache')
+        ),
+    }
+}
+
+# Validade máxima (segundos) do contexto do painel em cache
+CACHE_PAINEL_TIMEOUT = int(os.getenv("CACHE_PAINEL_TIMEOUT", "600"))
+
 # ==============================
 # INTERNACIONALIZAÇÃO
 # ==============================
@@ -95,7 +120,62 @@ STATICFILES_DIRS = [
     BASE_DIR / 'static',
 ]
 
-STATICFILES_STORAGE = 'whitenoise.storage.CompressedStaticFilesStorage'
+# Nomes com hash do conteúdo (bootstrap.3f2a1c.css) + versões .gz/.br geradas
+# no collectstatic; o WhiteNoise serve os arquivos com hash com cache
+# "immutable" de um ano. Depois do collectstatic, rode verificar_estaticos.
+STORAGES = {
+    "default": {
+        "BACKEND": "django.core.files.storage.FileSystemStorage",
+    },
+    "staticfiles": {
+        "BACKEND": "whitenoise.storage.CompressedManifestStaticFilesStorage",
+    },
+}
+
+# ==============================
+# PAINEL
+# ==============================
+
+# Janela (em dias a partir de hoje) do aviso "Mensalidades vencendo"
+DIAS_AVISO_VENCIMENTO = int(os.getenv("DIAS_AVISO_VENCIMENTO", "1"))
+
+# Gera os lembretes na visita ao painel (no primeiro acesso do dia e depois
+# de mudanças em alunos, mensalidades ou pagamentos). Desligue quando
+# "manage.py build_lembretes" estiver agendado (cron), para o painel não
+# gravar no banco.
+LEMBRETES_AUTOMATICOS = os.getenv("LEMBRETES_AUTOMATICOS", "1") == "1"
+
+# Guarda os grupos do usuário na sessão (ver alunos/papeis.py)
+PAPEIS_NA_SESSAO = True
+
+# ==============================
+# MÉTRICAS (ver alunos/metricas.py)
+# ==============================
+
+# Latência e consultas SQL por view em /metrics e no cabeçalho Server-Timing
+# (desligado por padrão; o cabeçalho só vai para a equipe ou com DEBUG)
+METRICAS_ATIVAS = os.getenv("METRICAS_ATIVAS", "0") == "1"
+
+# A mesma consulta repetida este número de vezes numa requisição é
+# registrada como suspeita de N+1
+METRICAS_LIMIAR_REPETICOES = int(os.getenv("METRICAS_LIMIAR_REPETICOES", "10"))
+
+# ==============================
+# EXPORTAÇÕES EM SEGUNDO PLANO
+# ==============================
+
+# Pasta onde os arquivos gerados ficam até o download
+EXPORT_ROOT = os.getenv("EXPORT_ROOT", str(BASE_DIR / 'exportacoes'))
+
+# Threads por processo web para gerar exportações (0 = só o run_export_worker)
+EXPORT_THREADS = int(os.getenv("EXPORT_THREADS", "1"))
+
+# Dias até o arquivo e o registro da exportação serem apagados
+EXPORT_RETENCAO_DIAS = int(os.getenv("EXPORT_RETENCAO_DIAS", "7"))
+
+# Segundos sem progresso até uma exportação em andamento ser dada como
+# interrompida (ex.: o worker do gunicorn reiniciou no meio)
+EXPORT_TIMEOUT = int(os.getenv("EXPORT_TIMEOUT", "300"))
 
 # ==============================
 # AUTH